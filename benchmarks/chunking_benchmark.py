@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Memory Chunking Benchmark
+Compares chunking strategies on a synthetic data.txt corpus shaped like Maya's
+memory file (remember lines, headed sections, chat summaries, MCP records).
+
+For every strategy the corpus is chunked, indexed with the local BM25 index and
+queried with questions whose answer is a known string. Reported per strategy:
+    recall@k       share of queries whose answer appears in the top-k chunks
+    tokens/query   prompt tokens the top-k chunks add (chars / 4)
+    latency ms     mean retrieval time per query
+
+Usage:
+    python benchmarks/chunking_benchmark.py --facts 400 --k 1 3 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.memory.bm25 import BM25Index  # noqa: E402
+from src.memory.chunking import chunk_memory_text  # noqa: E402
+
+FIRST_NAMES = ["Sarah", "Faiz", "Haseeb", "Rayyan", "Armaan", "Priya", "Omar", "Lena", "Jeswanth", "Mir",
+               "Talhah", "Aisha", "Noah", "Zara", "Kabir", "Meera", "Suhaib", "Ivan", "Nadia", "Yusuf"]
+LAST_NAMES = ["Khan", "Rao", "Iyer", "Malik", "Shah", "Fernandes", "Gupta", "Ali", "Menon", "Das"]
+COMPANIES = ["Google", "Apple", "Infosys", "Notion", "Zerodha", "Swiggy", "Razorpay", "Flipkart"]
+MOVIES = ["Iron Man", "Aquaman", "Dune", "Interstellar", "Arrival", "Oppenheimer", "Inception", "Heat"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+          "October", "November", "December"]
+FILLER = [
+    "The user asked for help structuring an essay and we discussed an outline.",
+    "We talked about productivity routines and keeping a weekly review.",
+    "The conversation covered deployment options for a small Flask backend.",
+    "The user wanted tips on staying motivated while studying for exams.",
+    "We compared note-taking apps and how to sync them across devices.",
+]
+
+
+@dataclass(frozen=True)
+class Query:
+    question: str
+    answer: str
+
+
+def generate_corpus(facts: int, rng: random.Random) -> Tuple[str, List[Query]]:
+    """Build a synthetic memory file and questions whose answers are unique strings in it."""
+    blocks: List[str] = []
+    queries: List[Query] = []
+    used_names = set()
+
+    def person() -> str:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f"{first} {last}"
+        if name in used_names:
+            # Namesakes get a numbered surname so every answer stays unique
+            name = f"{first} {last}-{len(used_names)}"
+        used_names.add(name)
+        return name
+
+    for i in range(facts):
+        kind = i % 5
+        day = f"{rng.randint(1, 28)} {rng.choice(MONTHS)}"
+        if kind == 0:
+            name = person()
+            blocks.append(f"{name}'s birthday is on {day}")
+            queries.append(Query(f"When is {name}'s birthday?", f"{name}'s birthday is on {day}"))
+        elif kind == 1:
+            secret = f"{rng.choice(['blue', 'red', 'green'])}-{rng.randint(1000, 9999)}-{i}"
+            place = f"locker {i}"
+            blocks.append(f"The code for {place} is {secret}")
+            queries.append(Query(f"what is the code for {place}", secret))
+        elif kind == 2:
+            name = person()
+            company = rng.choice(COMPANIES)
+            lines = [f"APPOINTMENTS {i}:"]
+            lines += [f"dentist check-up on {rng.randint(1, 28)} {rng.choice(MONTHS)}" for _ in range(2)]
+            lines.append(f"meeting with {name} from {company} on {day}")
+            blocks.append("\n".join(lines))
+            queries.append(Query(f"when am I meeting {name}?", f"meeting with {name} from {company} on {day}"))
+        elif kind == 3:
+            name = person()
+            project = f"Project {rng.choice(['Atlas', 'Nova', 'Orion', 'Vega'])}-{i}"
+            paragraphs = [rng.choice(FILLER), f"{name} mentioned that {project} ships on {day}.", rng.choice(FILLER)]
+            blocks.append(f"Chat Summary (2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00:00):\n"
+                          + "\n\n".join(paragraphs))
+            queries.append(Query(f"when does {project} ship?", f"{project} ships on {day}"))
+        else:
+            movie = f"{rng.choice(MOVIES)} {i}"
+            blocks.append(f"[MCP Notion search] Query: watchlist {i}, Result: {{'results': ['{movie}'], 'count': 1}}")
+            queries.append(Query(f"what did notion return for watchlist {i}", movie))
+
+    rng.shuffle(blocks)
+    return "\n\n".join(blocks) + "\n", queries
+
+
+def fixed_window_chunks(text: str, size: int, overlap: int) -> List[str]:
+    """Greedy line packing with trailing overlap, approximating RecursiveCharacterTextSplitter."""
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+    for line in text.splitlines():
+        if current and length + len(line) + 1 > size:
+            chunks.append("\n".join(current))
+            carry: List[str] = []
+            carried = 0
+            for previous in reversed(current):
+                if carried + len(previous) + 1 > overlap:
+                    break
+                carry.insert(0, previous)
+                carried += len(previous) + 1
+            current, length = carry, carried
+        current.append(line)
+        length += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def strategies() -> Dict[str, Callable[[str], List[str]]]:
+    return {
+        "fixed-7000/500": lambda text: fixed_window_chunks(text, 7000, 500),
+        "fixed-1000/100": lambda text: fixed_window_chunks(text, 1000, 100),
+        "structure-aware": lambda text: [chunk.text for chunk in chunk_memory_text(text)],
+    }
+
+
+def evaluate(chunks: Sequence[str], queries: Sequence[Query], ks: Sequence[int]) -> Dict[str, float]:
+    index = BM25Index()
+    for i, chunk in enumerate(chunks):
+        index.add(str(i), chunk)
+
+    top_k = max(ks)
+    hits = {k: 0 for k in ks}
+    tokens = {k: 0 for k in ks}
+    latencies: List[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        results = index.search(query.question, k=top_k)
+        latencies.append(time.perf_counter() - start)
+
+        retrieved = [chunks[int(doc_id)] for doc_id, _ in results]
+        for k in ks:
+            if any(query.answer in chunk for chunk in retrieved[:k]):
+                hits[k] += 1
+            tokens[k] += sum(len(chunk) for chunk in retrieved[:k]) // 4
+
+    metrics: Dict[str, float] = {"chunks": len(chunks), "latency_ms": statistics.mean(latencies) * 1000}
+    for k in ks:
+        metrics[f"recall@{k}"] = 100.0 * hits[k] / len(queries)
+        metrics[f"tokens@{k}"] = tokens[k] / len(queries)
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--facts", type=int, default=400)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    corpus, queries = generate_corpus(args.facts, random.Random(args.seed))
+    print(f"Corpus: {len(corpus)} chars, {len(queries)} queries\n")
+
+    header = f"{'strategy':<18}{'chunks':>8}" + "".join(f"{f'R@{k}':>8}{f'tok@{k}':>9}" for k in args.k) + f"{'ms':>8}"
+    print(header)
+    for name, chunker in strategies().items():
+        metrics = evaluate(chunker(corpus), queries, args.k)
+        row = f"{name:<18}{int(metrics['chunks']):>8}"
+        row += "".join(f"{metrics[f'recall@{k}']:>7.1f}%{metrics[f'tokens@{k}']:>9.0f}" for k in args.k)
+        print(row + f"{metrics['latency_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Maya Serving Load Benchmark
+Measures concurrent throughput of the backend's serving modes against a
+simulated blocking upstream call (LLM-like latency held inside an outbound slot).
+
+Each mode runs in its own server process:
+    dev-single    werkzeug, one request at a time (before)
+    dev-threaded  werkzeug, thread per request, as app.run() does (before)
+    threaded      src.serving.server.serve(mode="threaded") (after)
+
+Defaults match the shipped configuration: DEFAULT_LIMITS["gemini"] outbound
+slots and DEFAULT_THREADS request threads, with the limiter's 30 s queueing
+before a 503.
+
+Usage:
+    python benchmarks/load_benchmark.py --concurrency 200 --requests 1000 --latency-ms 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.serving.outbound import DEFAULT_LIMITS
+from src.serving.server import DEFAULT_THREADS
+
+MODES = ("dev-single", "dev-threaded", "threaded")
+
+
+def build_app(latency_s: float, gemini_limit: int):
+    from flask import Flask, jsonify
+
+    from src.serving import OutboundBusy, OutboundLimiter
+
+    app = Flask(__name__)
+    outbound = OutboundLimiter({"gemini": gemini_limit})
+
+    @app.route("/chat", methods=["POST", "GET"])
+    def chat():
+        try:
+            outbound.call("gemini", time.sleep, latency_s)
+        except OutboundBusy as e:
+            return jsonify(error=str(e)), 503
+        return jsonify(response="ok")
+
+    return app
+
+
+def run_server(mode: str, port: int, latency_s: float, gemini_limit: int, threads: int) -> None:
+    app = build_app(latency_s, gemini_limit)
+    if mode == "threaded":
+        from src.serving.server import serve
+
+        serve(app, mode="threaded", port=port, threads=threads)
+    else:
+        from werkzeug.serving import run_simple
+
+        run_simple("127.0.0.1", port, app, threaded=(mode == "dev-threaded"))
+
+
+def wait_until_up(url: str, timeout_s: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=5).read()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def one_request(url: str) -> float:
+    start = time.perf_counter()
+    request = urllib.request.Request(url, data=b"{}", headers={"Content-Type": "application/json"})
+    urllib.request.urlopen(request, timeout=120).read()
+    return time.perf_counter() - start
+
+
+def load(url: str, concurrency: int, total: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(one_request, url) for _ in range(total)]:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "errors": errors,
+        "elapsed_s": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Simulated upstream latency")
+    parser.add_argument(
+        "--gemini-limit", type=int, default=DEFAULT_LIMITS["gemini"], help="Outbound slots for the simulated upstream",
+    )
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Request threads in threaded mode")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--serve", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        run_server(args.serve, args.port, args.latency_ms / 1000, args.gemini_limit, args.threads)
+        return
+
+    print(f"{'mode':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for offset, mode in enumerate(args.modes):
+        port = args.port + offset
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", mode, "--port", str(port),
+             "--latency-ms", str(args.latency_ms), "--gemini-limit", str(args.gemini_limit),
+             "--threads", str(args.threads)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}/chat"
+            wait_until_up(url)
+            # Single-threaded mode serializes everything; keep its run short
+            total = args.requests if mode != "dev-single" else min(args.requests, args.concurrency)
+            result = load(url, args.concurrency, total)
+            print(f"{mode:<14}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.0f}"
+                  f"{result['p95_ms']:>10.0f}{result['errors']:>8}")
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,22 @@
 import sys
+import atexit
 import os
 # Add project root to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from flask import Flask, request, jsonify, make_response, send_file
+from flask import Flask, Response, request, jsonify, make_response, send_file, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 import google.generativeai as genai
 import warnings
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
 from langchain_community.vectorstores import Chroma
-from langchain.chains import RetrievalQA
-from langchain.retrievers import ContextualCompressionRetriever
 from langchain.retrievers.document_compressors import LLMChainExtractor
 from datetime import datetime, timedelta
+from dataclasses import asdict
 from exa_py import Exa
 from werkzeug.utils import secure_filename
 import os
@@ -32,11 +31,34 @@ import PIL.Image
 import base64
 import time
 import threading
-from queue import Queue
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import pyautogui
 from datetime import datetime , date
 import tempfile
 from deepgram import DeepgramClient, PrerecordedOptions, FileSource, SpeakOptions
+from src.memory import MemoryIndex
+from src.memory.answer_cache import SemanticAnswerCache
+from src.memory.chunking import chunk_memory_text
+from src.memory.compression import create_compressor
+from src.memory.graph import MemoryGraph
+from src.memory.hybrid import HybridRetriever
+from src.memory.store import MemoryStore
+from src.jobs import JobQueue
+from src.prompts import MAYA_SYSTEM, PROMPTS_DIR, PromptRegistry
+from src.serving import OutboundBusy, OutboundLimiter
+from src.vision import FaceEncodingCache, FaceEnrollment, ScreenshotWatcher, default_screenshot_dir, encode_face_file
+from src.vision.capture import FrameCapture, FrameResultCache
+from src.vision.prepare import CAMERA, SCREEN, ImagePreparer, profiles_from_env
+from src.vision.gallery import FaceGallery
+from src.vision.tracking import FaceTracker
+from src.sessions import ConversationContext, SessionStore, create_session_backend
+from src.sessions.context import fit_recent
+from src.serving.outbound import limits_from_env
+from src.serving.server import DEFAULT_THREADS, serve
+from src.serving.sse import event_stream
+from src.memory.embedding_cache import CachedEmbeddings, open_embedding_cache
+from src.memory.vector_store import add_chunks, remove_chunks, sync_vector_store
 if not hasattr(collections, 'Iterable'):
     import collections.abc
     collections.Iterable = collections.abc.Iterable
@@ -94,22 +116,6 @@ except Exception as mcp_error:
     traceback.print_exc()
 
 face_recognition_enabled = False
-known_face_encodings = []
-known_face_names = []
-camera = None
-frame_queue = Queue(maxsize=1)
-
-def camera_thread():
-    global camera, frame_queue
-    while True:
-        if camera is not None:
-            ret, frame = camera.read()
-            if ret:
-                if frame_queue.full():
-                    frame_queue.get()
-                frame_queue.put(frame)
-        else:
-            time.sleep(0.1)
 
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -139,12 +145,51 @@ GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 EXA_API_KEY = os.getenv('EXA_API_KEY')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 OPENAI_REALTIME_MODEL = os.getenv('OPENAI_REALTIME_MODEL', 'gpt-4o-realtime-preview-2024-12-17')
+OPENAI_REALTIME_VOICE = os.getenv('OPENAI_REALTIME_VOICE', 'marin')
 DEEPGRAM_API_KEY = os.getenv('DEEPGRAM_API_KEY')
 deepgram = DeepgramClient(DEEPGRAM_API_KEY)
 
+# Memory persistence
+EMBEDDING_MODEL = "models/embedding-001"
+VECTOR_STORE_DIR = os.getenv('MAYA_VECTOR_STORE_DIR', os.path.join(os.path.dirname(__file__), 'data', 'vector_store'))
+EMBEDDING_CACHE_PATH = os.getenv('MAYA_EMBEDDING_CACHE_PATH', os.path.join(os.path.dirname(__file__), 'data', 'embedding_cache.db'))
+embedding_cache = open_embedding_cache(EMBEDDING_CACHE_PATH)
+MEMORY_CHUNK_MAX_CHARS = int(os.getenv('MAYA_CHUNK_MAX_CHARS', '1200'))
+MEMORY_GRAPH_HOPS = int(os.getenv('MAYA_MEMORY_GRAPH_HOPS', '2'))
+# Long-term memory: segmented append-only log + SQLite FTS index (replaces data.txt)
+MEMORY_STORE_DIR = os.getenv('MAYA_MEMORY_STORE_DIR', os.path.join(os.path.dirname(__file__), 'data', 'memory_store'))
+memory_store = MemoryStore(MEMORY_STORE_DIR)
+# One-time import of the legacy flat file, renamed to data.txt.migrated afterwards
+memory_store.import_text_file(os.getenv('MAYA_LEGACY_MEMORY_FILE', os.path.join(os.path.dirname(__file__), 'data', 'data.txt')))
+# Context compressor for chat-mode retrieval: lexical | embedding | llm | none
+MEMORY_COMPRESSOR = os.getenv('MAYA_MEMORY_COMPRESSOR', 'lexical')
+
 # Configure Gemini API
 genai.configure(api_key=GOOGLE_API_KEY)
 
+# Prompt budget per chat turn: rolling summary + recent turns (MAYA_CONTEXT_TOKENS)
+CONTEXT_MAX_TOKENS = int(os.getenv('MAYA_CONTEXT_TOKENS', '6000'))
+CONTEXT_SUMMARY_TOKENS = int(os.getenv('MAYA_CONTEXT_SUMMARY_TOKENS', '800'))
+# Session backend: sqlite (one host) | redis (many hosts). Write-through (save each change, revalidate cached
+# copies) lets several worker processes share sessions but costs backend I/O per request, so it is only on by
+# default when a multi-process server is configured (WEB_CONCURRENCY > 1, as gunicorn reads it).
+SESSION_BACKEND = os.getenv('MAYA_SESSION_BACKEND', 'sqlite')
+SESSION_STORE_PATH = os.getenv('MAYA_SESSION_STORE_PATH', os.path.join(os.path.dirname(__file__), 'data', 'sessions.db'))
+SESSION_WORKERS = int(os.getenv('WEB_CONCURRENCY', '1'))
+SESSION_WRITE_THROUGH = os.getenv('MAYA_SESSION_WRITE_THROUGH', '1' if SESSION_WORKERS > 1 else '0') == '1'
+
+# Per-service caps on concurrent outbound calls (MAYA_OUTBOUND_LIMIT_<SERVICE>)
+outbound = OutboundLimiter(limits_from_env())
+# Background workers for summarization and other slow maintenance work
+jobs = JobQueue(workers=int(os.getenv('MAYA_JOB_WORKERS', '2')))
+# Face matching: distance tolerance and the gallery size from which an approximate index is used
+FACE_MATCH_TOLERANCE = float(os.getenv('MAYA_FACE_TOLERANCE', '0.6'))
+FACE_ANN_MIN_FACES = int(os.getenv('MAYA_FACE_ANN_MIN_FACES', '5000'))
+# Face encodings of known_faces/ keyed by image content hash (MAYA_FACE_CACHE_PATH)
+face_cache = FaceEncodingCache(os.getenv('MAYA_FACE_CACHE_PATH', os.path.join(os.path.dirname(__file__), 'data', 'face_encodings.db')))
+# System prompts (src/prompts/*.txt) and the realtime session payloads built from them
+prompts = PromptRegistry(os.getenv('MAYA_PROMPTS_DIR', PROMPTS_DIR))
+
 # Create the model
 generation_config = {
     "temperature": 0.9,
@@ -153,58 +198,7 @@ generation_config = {
     "max_output_tokens": 2048,
 }
 
-system_instruction = '''
-You are Maya, an emotionally aware, intelligent, and interactive AI assistant. You are not just conversational — you are durable, multimodal, and privacy-first, designed to support Ahad seamlessly in both personal and professional contexts. You were created by Ahad and you are his personal assistant.
-
-How You Should Interact
-
-keeping the tone warm, engaging, and intelligent.
-
-Be context-aware without repeating.
-
-Your Capabilities
-
-Maya Studio (Durability):
-Support multi-step research, planning, and execution workflows that can pause, survive failures, and resume.
-
-Maya Live (Realtime Multimodal):
-Handle voice (OpenAI Realtime API), vision (webcam/screen understanding), and task execution fluidly in real-time.
-
-Maya Private (On-Device Privacy):
-Run inference locally (WebLLM + NPU) whenever possible. If cloud use is needed, be transparent and log it.
-
-Interaction Style
-
-Vision Feels Natural:
-The webcam and screen are your eyes. Never say “image” or “camera feed.” Always say “I see …” when describing.
-
-Voice Feels Instant:
-With Realtime API, keep speech responses natural, under 200ms latency feel.
-
-Memory Feels Human:
-Use GraphRAG + rewriteable memory for continuity. Recall past context naturally without sounding robotic.
-
-Privacy Feels Assured:
-Default to local inference. If offloading to the cloud, make it clear: “I’ll securely offload this step.”
-
-Tone & Personality
-
-Professional, yet warm and motivational when prompted.
-
-Adaptive — concise for direct queries, detailed for research/planning.
-
-Supportive — provide structured insights, not just raw answers.
-
-Safety & Control:
-
-Always validate actions before execution.
-
-For risky tasks (e.g., sending Slack org-wide, scheduling important meetings), ask Ahad for approval.
-
-Log all external tool use transparently.
-
-Stay aligned with productivity: Notion, Calendar, Slack.
-'''
+system_instruction = prompts.text(MAYA_SYSTEM)
 
 model = genai.GenerativeModel(
     model_name="gemini-2.5-flash",
@@ -216,13 +210,68 @@ model = genai.GenerativeModel(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-chat_sessions = {}
+# Live sessions are bounded; idle and least recently used ones spill to the session backend
+chat_sessions = SessionStore(
+    dump=lambda session: dump_session(session),
+    load=lambda state: load_session(state),
+    backend=create_session_backend(SESSION_BACKEND, sqlite_path=SESSION_STORE_PATH, redis_url=os.getenv('MAYA_REDIS_URL')),
+    max_resident=int(os.getenv('MAYA_MAX_SESSIONS', '256')),
+    idle_ttl=float(os.getenv('MAYA_SESSION_IDLE_TTL', '1800')),
+    write_through=SESSION_WRITE_THROUGH,
+)
+atexit.register(chat_sessions.flush)
+
+def build_face_gallery(encodings, names):
+    return FaceGallery(encodings, names, tolerance=FACE_MATCH_TOLERANCE, ann_min_faces=FACE_ANN_MIN_FACES)
+
+# Live face gallery; uploads rescan known_faces/ in the background, encoding
+# only new photos on a process pool (MAYA_FACE_ENCODE_WORKERS). The pool starts
+# on the first rescan, not at import; see run_backend.py for spawn platforms.
+face_enrollment = FaceEnrollment(
+    'known_faces',
+    face_cache,
+    encode_face_file,
+    build_face_gallery,
+    jobs=jobs,
+    executor_factory=functools.partial(ProcessPoolExecutor, max_workers=int(os.getenv('MAYA_FACE_ENCODE_WORKERS', '2'))),
+)
+atexit.register(face_enrollment.shutdown)
+
+# Webcam capture while vision mode is on: FPS cap, idle rate for still scenes,
+# and a ring buffer vision queries peek at without consuming
+frame_capture = FrameCapture(
+    lambda: cv2.VideoCapture(0),
+    fps=float(os.getenv('MAYA_CAMERA_FPS', '10')),
+    idle_fps=float(os.getenv('MAYA_CAMERA_IDLE_FPS', '2')),
+    buffer_size=int(os.getenv('MAYA_CAMERA_BUFFER', '8')),
+    motion_threshold=float(os.getenv('MAYA_MOTION_THRESHOLD', '3.0')),
+    on_frame=lambda frame: track_faces(frame),
+)
+atexit.register(frame_capture.stop)
+FRAME_MAX_AGE = float(os.getenv('MAYA_FRAME_MAX_AGE', '2.0'))
+# Faces are detected on a downscaled frame every few frames and tracked in between;
+# a face is encoded only when its track starts
+face_tracker = FaceTracker(
+    detect=lambda rgb: face_recognition.face_locations(rgb),
+    encode=lambda rgb, boxes: face_recognition.face_encodings(rgb, boxes),
+    downscale=int(os.getenv('MAYA_FACE_DETECT_DOWNSCALE', '2')),
+    detect_every=int(os.getenv('MAYA_FACE_DETECT_EVERY', '5')),
+)
+# Model-ready image of the current frame, reused until the scene changes
+vision_frames = FrameResultCache()
+# Newest screenshot for screenshare mode (MAYA_SCREENSHOT_DIR, default ~/Pictures/Screenshots);
+# starts watching on the first lookup when main() did not start it (WSGI)
+screenshot_watcher = ScreenshotWatcher(
+    os.getenv('MAYA_SCREENSHOT_DIR') or default_screenshot_dir(),
+    poll_interval=float(os.getenv('MAYA_SCREENSHOT_POLL_INTERVAL', '1.0')),
+)
+atexit.register(screenshot_watcher.stop)
+# Resize + re-encode before Gemini uploads (MAYA_CAMERA_MAX_EDGE, MAYA_SCREEN_MAX_EDGE, ..._MAX_BYTES)
+image_prep = ImagePreparer(profiles_from_env())
 
 def initialize_face_recognition():
-    global known_face_encodings, known_face_names
-    known_faces_dir = 'known_faces'
-    known_face_encodings, known_face_names = encode_known_faces(known_faces_dir)
-    print(f"Initialized face recognition with {len(known_face_names)} known faces.")
+    summary = face_enrollment.refresh()
+    print(f"Initialized face recognition with {summary['faces']} known faces.")
 
 # Setting up RAG
 def initialize_model():
@@ -234,45 +283,116 @@ def initialize_model():
     )
 
 def load_and_split_text():
-    data_path = os.path.join(os.path.dirname(__file__),'data', 'data.txt')
-    loader = TextLoader(data_path)
-    documents = loader.load()
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=7000, chunk_overlap=500)
-    return text_splitter.split_documents(documents)
+    documents = []
+    for entry in memory_store.entries():
+        documents.extend(split_memory_text(entry.text, {"entry_id": entry.id}))
+    return documents
 
-def create_vector_store(texts):
+def split_memory_text(text, metadata):
+    # One chunk per memory entry: remember lines, sections, chat summaries, MCP records
+    chunks = chunk_memory_text(text, max_chars=MEMORY_CHUNK_MAX_CHARS, metadata={"source": "memory_store", **metadata})
+    return [Document(page_content=chunk.text, metadata=chunk.metadata) for chunk in chunks]
+
+def create_embeddings():
     embeddings = GoogleGenerativeAIEmbeddings(
-        model="models/embedding-001",
+        model=EMBEDDING_MODEL,
         google_api_key=GOOGLE_API_KEY
     )
-    return Chroma.from_documents(texts, embeddings)
-
-def create_retriever(vector_store, model):
-    base_retriever = vector_store.as_retriever(search_kwargs={"k": 1})
-    compressor = LLMChainExtractor.from_llm(model)
-    return ContextualCompressionRetriever(base_compressor=compressor, base_retriever=base_retriever)
-
-def create_qa_chain(model, retriever):
-    return RetrievalQA.from_chain_type(
-        llm=model,
-        retriever=retriever,
-        return_source_documents=True
+    if embedding_cache is None:
+        return embeddings
+    return CachedEmbeddings(embeddings, embedding_cache, EMBEDDING_MODEL)
+
+def create_vector_store(texts):
+    # Persisted collection: chunks already on disk are reused, only new text is embedded
+    vector_store = Chroma(
+        collection_name="maya_memory",
+        embedding_function=memory_embeddings,
+        persist_directory=VECTOR_STORE_DIR
+    )
+    sync_vector_store(vector_store, texts, EMBEDDING_MODEL)
+    return vector_store
+
+def add_memory_documents(vector_store, documents):
+    add_chunks(vector_store, documents, EMBEDDING_MODEL)
+
+def remove_memory_documents(vector_store, documents):
+    remove_chunks(vector_store, documents, EMBEDDING_MODEL)
+
+def create_retriever(vector_store, texts):
+    # BM25 and an entity graph over the same chunks, fused with vector search
+    return HybridRetriever(vector_store, texts, k=3, graph=MemoryGraph(max_hops=MEMORY_GRAPH_HOPS))
+
+def create_context_compressor():
+    # Local compressors run in-process; "llm" keeps the Gemini extraction round-trip
+    return create_compressor(
+        MEMORY_COMPRESSOR,
+        embeddings=memory_embeddings,
+        llm_factory=lambda: LLMChainExtractor.from_llm(initialize_model()),
     )
 
+# One embeddings client for the vector store, the compressor and the answer cache,
+# so a query embedded for the cache is reused by the vector search
+memory_embeddings = create_embeddings()
+
+# One memory index per process, shared by every chat session
+memory_index = MemoryIndex(
+    load_documents=load_and_split_text,
+    build_vector_store=create_vector_store,
+    build_retriever=create_retriever,
+    split_text=split_memory_text,
+    add_documents=add_memory_documents,
+    compressor=create_context_compressor(),
+    remove_documents=remove_memory_documents,
+)
+
+# Near-identical chat queries reuse earlier answers until the memory corpus changes
+answer_cache = SemanticAnswerCache(
+    similarity_threshold=float(os.getenv('MAYA_ANSWER_CACHE_THRESHOLD', '0.95')),
+    ttl_seconds=float(os.getenv('MAYA_ANSWER_CACHE_TTL', '3600')),
+    max_entries=int(os.getenv('MAYA_ANSWER_CACHE_SIZE', '256')),
+)
+memory_index.add_listener(answer_cache.clear)
+
+def answer_from_memory(context, text, session_id):
+    return "".join(stream_answer_from_memory(context, text, session_id))
+
+def stream_answer_from_memory(context, text, session_id):
+    # Answers depend on the conversation they were given in: reuse them within the session only.
+    # A decisive lexical hit is retrieved without embedding the query, so those
+    # queries are cached by their normalized text; the rest by embedding.
+    query_embedding = None
+    if memory_index.needs_query_embedding(text):
+        query_embedding = outbound.call('embeddings', memory_embeddings.embed_query, text)
+        cached = answer_cache.lookup(query_embedding, scope=session_id)
+    else:
+        cached = answer_cache.lookup_text(text, scope=session_id)
+    if cached is not None:
+        app.logger.info(f"Answer cache hit for query similar to: {cached.query}")
+        yield cached.answer
+        return
+
+    corpus_version = memory_index.version
+    rag_result = memory_index.retrieve_context(text)
+    answer = ""
+    # Retrieved memory goes into this request only; the session context records the bare exchange
+    for chunk in stream_generation(context.messages(f"Context: {rag_result}\n\nUser: {text}")):
+        answer += chunk.text
+        yield chunk.text
+    answer_cache.store(text, query_embedding, rag_result, answer, corpus_version, scope=session_id)
+
 #Screenshare mode
 def get_latest_screenshot():
-    username = os.getenv('USERNAME') 
-    screenshot_dir = rf"C:\Users\{username}\Pictures\Screenshots"
-    files = os.listdir(screenshot_dir)
-    if not files:
-        return None
-    latest_file = max(files, key=lambda f: os.path.getmtime(os.path.join(screenshot_dir, f)))
-    return os.path.join(screenshot_dir, latest_file)
+    # Kept current by the watcher; no directory scan per query
+    return screenshot_watcher.latest()
 
 def get_gemini_response(question, rag_result, chat_history):
     prompt = f"Question: {question}\n"
     if chat_history:
-        previous_messages = "\n".join([f"{entry['user_message']}: {entry['model_response']}" for entry in chat_history])
+        # Only the most recent exchanges that fit the context budget
+        previous_messages = "\n".join(fit_recent(
+            [f"{entry['user_message']}: {entry['model_response']}" for entry in chat_history],
+            CONTEXT_MAX_TOKENS - CONTEXT_SUMMARY_TOKENS,
+        ))
         prompt += f"Previous Conversation:\n{previous_messages}\n"
 
     if rag_result.strip():
@@ -280,8 +400,7 @@ def get_gemini_response(question, rag_result, chat_history):
     else:
         prompt += "Please answer this question using your own knowledge and considering the previous conversation."
 
-    chat_session = model.start_chat(history=[])
-    response = chat_session.send_message(prompt)
+    response = outbound.call('gemini', model.generate_content, prompt)
     
     chat_history.append({"user_message": question, "model_response": response.text})
     
@@ -289,12 +408,20 @@ def get_gemini_response(question, rag_result, chat_history):
 
 # Super/Power Search
 def power_search(query):
+    response = outbound.call('gemini', model.generate_content, build_power_search_prompt(query))
+    response.resolve()
+
+    return response.text
+
+def build_power_search_prompt(query):
     exa = Exa(api_key=EXA_API_KEY)
 
     today_formatted = datetime.now().strftime("%Y-%m-%d")
     start_date_formatted = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")  
 
-    search_response = exa.search_and_contents(
+    search_response = outbound.call(
+      'exa',
+      exa.search_and_contents,
       query, 
       use_autoprompt=True, 
       start_crawl_date=today_formatted, 
@@ -304,12 +431,7 @@ def power_search(query):
     )
 
     result_item = search_response.results[0]
-    final_prompt = result_item.text + " Summarize this article as if this information is coming from you, not from elsewhere. This is super search mode, a novelty feature in maya"
-
-    response = model.generate_content(final_prompt)
-    response.resolve()
-
-    return response.text
+    return result_item.text + " Summarize this article as if this information is coming from you, not from elsewhere. This is super search mode, a novelty feature in maya"
 
 # Vision mode
 def capture_image():
@@ -321,64 +443,36 @@ def capture_image():
     return frame
 
 def process_image_and_text(text, image):
-    image_pil = PIL.Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-    response = model.generate_content([text, image_pil], stream=True)
-    response.resolve()
+    image_part = image_prep.prepare(image, CAMERA).to_part()
+    with outbound.limit('gemini'):
+        response = model.generate_content([text, image_part], stream=True)
+        response.resolve()
     return response.text
 
 def take_and_save_screenshot():
-    username = os.getenv('USERNAME') 
-    screenshot_dir = f"C:/Users/{username}/Pictures/Screenshots"
-    os.makedirs(screenshot_dir, exist_ok=True)
-    filename = f"Screenshot.png"
-    filepath = os.path.join(screenshot_dir, filename)
-    screenshot = pyautogui.screenshot()
-    screenshot.save(filepath)
-    return filepath
+    return screenshot_watcher.capture(pyautogui.screenshot)
 
 # Face Recognition
-def encode_known_faces(known_faces_dir):
-    encodings = []
-    names = []
-    for name in os.listdir(known_faces_dir):
-        person_dir = os.path.join(known_faces_dir, name)
-        if os.path.isdir(person_dir):
-            for image_name in os.listdir(person_dir):
-                image_path = os.path.join(person_dir, image_name)
-                image = face_recognition.load_image_file(image_path)
-                face_encodings = face_recognition.face_encodings(image)
-                if face_encodings:
-                    encodings.append(face_encodings[0])
-                    names.append(name)
-    return encodings, names
-
-def detect_and_recognize_faces(image_path, known_face_encodings, known_face_names, output_path):
-    image = cv2.imread(image_path)
-    rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
-    face_locations = face_recognition.face_locations(rgb_image)
-    face_encodings = face_recognition.face_encodings(rgb_image, face_locations)
-
-    for (top, right, bottom, left), face_encoding in zip(face_locations, face_encodings):
-        matches = face_recognition.compare_faces(known_face_encodings, face_encoding)
-        name = "Unknown"
-
-        if True in matches:
-            first_match_index = matches.index(True)
-            name = known_face_names[first_match_index]
-
+def track_faces(frame):
+    # Runs on the capture thread for every kept frame while face recognition is on
+    face_gallery = face_enrollment.gallery
+    if face_recognition_enabled and face_gallery is not None:
+        return face_tracker.update(frame.image, face_gallery, seq=frame.seq)
+    return []
+
+def draw_face_labels(image, tracks):
+    for track in tracks:
+        top, right, bottom, left = track.int_box()
         cv2.rectangle(image, (left, top), (right, bottom), (0, 0, 255), 2)
-        cv2.putText(image, name, (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2)
-
-    cv2.imwrite(output_path, image)
-    return output_path
+        cv2.putText(image, track.label, (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2)
+    return image
 
 # "Remember"
-def append_to_data_file(content):
-    data_path = os.path.join(os.path.dirname(__file__), 'data', 'data.txt')
-    with open(data_path, "a") as file:
-        file.write(content + "\n")
-    print("Content appended to data.txt successfully.") 
+def append_to_data_file(content, entry_type="remember", source=None):
+    entry_id = memory_store.append(content, entry_type, source=source)
+    print("Content appended to memory successfully.") 
+    memory_index.ingest(content, {"entry_id": entry_id})
+    return entry_id
     
 # Setting up STT and TTS
 def speech_to_text(audio_file):
@@ -395,11 +489,13 @@ def speech_to_text(audio_file):
             smart_format=True,
         )
         
-        response = deepgram.listen.prerecorded.v("1").transcribe_file(payload, options)
+        response = outbound.call('deepgram', deepgram.listen.prerecorded.v("1").transcribe_file, payload, options)
         
         transcript = response['results']['channels'][0]['alternatives'][0]['transcript']
         
         return transcript
+    except OutboundBusy:
+        raise
     except Exception as e:
         print(f"Exception in speech_to_text: {e}")
         return None
@@ -415,8 +511,10 @@ def text_to_speech(text):
         )
         
         with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-            response = deepgram.speak.v("1").save(temp_audio.name, SPEAK_OPTIONS, options)
+            response = outbound.call('deepgram', deepgram.speak.v("1").save, temp_audio.name, SPEAK_OPTIONS, options)
             return temp_audio.name
+    except OutboundBusy:
+        raise
     except Exception as e:
         print(f"Exception in text_to_speech: {e}")
         return None
@@ -439,57 +537,70 @@ def process_audio_data(audio_data, session_id, mode):
             return None, "Failed to transcribe audio"
 
 def process_vision_query(text, session_id):
-    global frame_queue, face_recognition_enabled, known_face_encodings, known_face_names
     if session_id not in chat_sessions:
         return "Chat session not found"
-    
-    session = chat_sessions[session_id]
-    chat = session['chat']
 
-    if frame_queue.empty():
-        return "No frame available"
+    contents, message = build_vision_request(text)
+    if contents is None:
+        return message
 
-    frame = frame_queue.get()
-    
-    input_image_path = 'temp_input.jpg'
-    cv2.imwrite(input_image_path, frame)
-    
-    if face_recognition_enabled:
-        output_image_path = 'temp_output.jpg'
-        output_image_path = detect_and_recognize_faces(input_image_path, known_face_encodings, known_face_names, output_image_path)
-        image = PIL.Image.open(output_image_path)
-    else:
-        image = PIL.Image.open(input_image_path)
-    
-    response = model.generate_content([text, image], stream=False)
+    response = outbound.call('gemini', model.generate_content, contents, stream=False)
     response.resolve()
 
     return response.text
 
+def render_vision_frame(frame, face_gallery):
+    # Buffered frames are shared and read-only, so faces are drawn on a copy
+    image = frame.image
+    if face_gallery is not None:
+        # Usually already tracked by the capture thread; otherwise tracked now
+        tracks = face_tracker.update(image, face_gallery, seq=frame.seq)
+        image = draw_face_labels(image.copy(), tracks)
+    return image_prep.prepare(image, CAMERA).to_part()
+
+def build_vision_request(text):
+    # Returns (contents, None) for the model, or (None, message) when there is nothing to send
+    global face_recognition_enabled
+    # Peek at the newest frame; concurrent queries share it instead of racing for it
+    frame = frame_capture.latest(max_age=FRAME_MAX_AGE)
+    if frame is None:
+        return None, "No frame available"
+
+    face_gallery = face_enrollment.gallery if face_recognition_enabled else None
+    image = vision_frames.get(frame, lambda f: render_vision_frame(f, face_gallery), variant=face_gallery)
+
+    return [text, image], None
+
 def process_screenshot_query(text):
+    contents, message = build_screenshot_request(text)
+    if contents is None:
+        return message
+
+    response = outbound.call('gemini', model.generate_content, contents, stream=False)
+    response.resolve()
+    return response.text
+
+def build_screenshot_request(text):
+    # Returns (contents, None) for the model, or (None, message) when there is nothing to send
     screenshot_path = get_latest_screenshot()
     if not screenshot_path:
-        return "No screenshot found"
+        return None, "No screenshot found"
     
-    image = PIL.Image.open(screenshot_path)
     if text.lower().startswith("take a look at my screen"):
             take_and_save_screenshot()
             responses = [
                     "Okay. I'm looking at it",
                     "I can see your screen now"
                 ]
-            response_text = random.choice(responses)
-            return response_text
-    else:
-        response = model.generate_content([text, image], stream=False)
-        response.resolve()
-        return response.text      
+            return None, random.choice(responses)
+    image = PIL.Image.open(screenshot_path)
+    prepared = image_prep.prepare(image, SCREEN, source_bytes=os.path.getsize(screenshot_path))
+    return [text, prepared.to_part()], None
 
 
 def clear_data_file():
-    data_path = os.path.join(os.path.dirname(__file__), 'data', 'data.txt')
-    with open(data_path, "w") as file:
-        file.write("")  # This will clear the memory file
+    memory_store.clear()
+    memory_index.invalidate()
     app.logger.info("Data file cleared")           
 
 def process_query(text, session_id, mode):
@@ -500,7 +611,7 @@ def process_query(text, session_id, mode):
         return "Chat session not found"
     
     session = chat_sessions[session_id]
-    chat = session['chat']
+    context = session['context']
     
     try:
         if text.lower().startswith("clear@memory"):
@@ -526,32 +637,137 @@ def process_query(text, session_id, mode):
                 query = text[13:].strip()
                 response_text = power_search(query)
             else:
-                result = session['qa_chain'].invoke({"query": text})
-                rag_result = result["result"]
-                response = chat.send_message(f"Context: {rag_result}\n\nUser: {text}")
-                response_text = response.text
+                response_text = answer_from_memory(context, text, session_id)
 
         app.logger.info(f"Query processed: mode={mode}, response_length={len(response_text)}")
-
-        # Add the interaction to chat history
-        chat.history.append({
-            "role": "user",
-            "parts": [{"text": f"[{mode.capitalize()} Query] {text}"}]
-        })
-        chat.history.append({
-            "role": "model",
-            "parts": [{"text": response_text}]
-        })
-
-        # Store the query and response in the session
-        session['last_query'] = text
-        session['last_response'] = response_text
-        
+        record_exchange(session_id, mode, text, response_text)
         return response_text
+    except OutboundBusy:
+        # Surfaces as 503 + Retry-After via handle_outbound_busy
+        raise
     except Exception as e:
         app.logger.error(f"Error processing query: {str(e)}")
         return f"Error processing query: {str(e)}"
 
+def record_exchange(session_id, mode, text, response_text):
+    def change(session):
+        # Add the interaction to the session context (the only place turns are recorded)
+        session['context'].add_exchange(f"[{mode.capitalize()} Query] {text}", response_text)
+
+        # Store the query, response and mode in the session
+        session['last_query'] = text
+        session['last_response'] = response_text
+        session['mode'] = mode
+
+    # Reapplied to the newer copy if another worker saved this session meanwhile
+    session = chat_sessions.update(session_id, change)
+
+    if session['context'].needs_compaction():
+        # Fold older turns into the rolling summary off the request path
+        jobs.submit('compact_context', compact_session_context, session_id, key=session_id)
+
+def compact_session_context(session_id):
+    session = chat_sessions.get(session_id)
+    if session is not None and session['context'].compact():
+        # Summarizing is slow, so it is not replayed: if another worker saved first, its copy wins
+        chat_sessions.save(session_id)
+
+def new_conversation_context():
+    context = ConversationContext(
+        max_tokens=CONTEXT_MAX_TOKENS,
+        summary_tokens=CONTEXT_SUMMARY_TOKENS,
+        summarizer=summarize_turns,
+    )
+    context.add("model", "Hello! I'm Maya, your AI assistant. How can I help you today?")
+    return context
+
+def dump_session(session):
+    return {
+        "context": session['context'].to_state(),
+        "last_query": session.get('last_query'),
+        "last_response": session.get('last_response'),
+        "mode": session.get('mode', 'chat'),
+    }
+
+def load_session(state):
+    context = new_conversation_context()
+    context.load_state(state["context"])
+    return {
+        'context': context,
+        'last_query': state.get('last_query'),
+        'last_response': state.get('last_response'),
+        'mode': state.get('mode', 'chat'),
+    }
+
+def summarize_turns(previous_summary, turns, max_tokens):
+    transcript = "\n".join(f"{'User' if turn.role == 'user' else 'Maya'}: {turn.text}" for turn in turns)
+    prompt = (
+        f"Update the running summary of this conversation with the new turns below. Keep names, dates, "
+        f"decisions and open questions; drop pleasantries. Stay under {max_tokens * 3 // 4} words.\n\n"
+        f"Running summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}"
+    )
+    # On failure ConversationContext falls back to a local extractive summary
+    return outbound.call('gemini', model.generate_content, prompt).text
+
+def stream_query(text, session_id, mode):
+    # Streaming counterpart of process_query: yields response text as Gemini produces it
+    session = chat_sessions[session_id]
+    lowered = text.lower()
+
+    if lowered.startswith("clear@memory") or (
+        mode not in ('vision', 'screenshare', 'supersearch')
+        and (lowered.startswith("remember") or lowered.startswith("take notes"))
+    ):
+        # Canned replies: nothing is generated, so there is nothing to stream
+        yield process_query(text, session_id, mode)
+        return
+
+    if mode == 'vision':
+        contents, message = build_vision_request(text)
+        chunks = stream_generation(contents) if contents else [message]
+    elif mode == 'screenshare':
+        contents, message = build_screenshot_request(text)
+        chunks = stream_generation(contents) if contents else [message]
+    elif mode == 'supersearch' or lowered.startswith("super search"):
+        query = text if mode == 'supersearch' else text[13:].strip()
+        chunks = stream_generation(build_power_search_prompt(query))
+    else:
+        chunks = stream_answer_from_memory(session['context'], text, session_id)
+
+    response_text = ""
+    for chunk in chunks:
+        piece = chunk if isinstance(chunk, str) else chunk.text
+        response_text += piece
+        yield piece
+
+    app.logger.info(f"Streamed query: mode={mode}, response_length={len(response_text)}")
+    record_exchange(session_id, mode, text, response_text)
+
+def stream_generation(contents):
+    # Holds a Gemini slot until the stream is fully consumed
+    with outbound.limit('gemini'):
+        for chunk in model.generate_content(contents, stream=True):
+            yield chunk
+
+# Routes re-raise OutboundBusy past their generic handlers so it lands here
+@app.errorhandler(OutboundBusy)
+def handle_outbound_busy(e):
+    logger.warning(str(e))
+    return jsonify(error=str(e)), 503, {'Retry-After': '1'}
+
+@app.route('/serving/status', methods=['GET'])
+def serving_status():
+    return jsonify({
+        "outbound": outbound.stats(),
+        "jobs": jobs.stats(),
+        "sessions": chat_sessions.metrics(),
+        "prompts": prompts.stats(),
+        "capture": {**frame_capture.status(), "reused_frames": vision_frames.stats["hits"]},
+        "face_tracking": face_tracker.stats,
+        "image_prep": image_prep.stats(),
+        "screenshots": screenshot_watcher.status(),
+    })
+
 @app.errorhandler(500)
 def handle_500_error(e):
     logger.error(f"An error occurred: {str(e)}")
@@ -566,13 +782,10 @@ def start_chat():
             return jsonify({"error": "No session_id provided"}), 400
         
         if session_id not in chat_sessions:
-            chat_sessions[session_id] = {
-                'chat': model.start_chat(history=[]),
-                'qa_chain': create_qa_chain(initialize_model(), create_retriever(create_vector_store(load_and_split_text()), initialize_model())),
-            }
-            chat_sessions[session_id]['chat'].history = [
-                {"role": "model", "parts": [{"text": "Hello! I'm Maya, your AI assistant. How can I help you today?"}]}
-            ]
+            # If another worker creates it first, its copy is kept
+            chat_sessions.setdefault(session_id, {
+                'context': new_conversation_context(),
+            })
         logger.info(f"Chat session started: session_id={session_id}")
         return jsonify({"message": "Chat session started", "session_id": session_id})
     except Exception as e:
@@ -584,7 +797,7 @@ def send_message():
     try:
         session_id = request.json.get('session_id')
         message = request.json.get('message')
-        mode = request.json.get('mode', 'chat')  # Default to chat mode
+        mode = request.json.get('mode')
         
         logger.info(f"Received message: session_id={session_id}, message={message}, mode={mode}")
         
@@ -595,16 +808,48 @@ def send_message():
         if session_id not in chat_sessions:
             logger.error(f"Chat session not found: session_id={session_id}")
             return jsonify({"error": "Chat session not found"}), 404
+
+        # Default to the session's last mode (stored with the session, so any worker sees it)
+        mode = mode or chat_sessions[session_id].get('mode', 'chat')
         
         response_text = process_query(message, session_id, mode)
         
         logger.info(f"Processed query: response_length={len(response_text)}")
         
         return jsonify({"response": response_text})
+    except OutboundBusy:
+        raise
     except Exception as e:
         logger.error(f"Error in send_message: {str(e)}")
         return jsonify({"error": str(e)}), 500
     
+@app.route('/send_message_stream', methods=['POST'])
+def send_message_stream():
+    session_id = request.json.get('session_id')
+    message = request.json.get('message')
+    mode = request.json.get('mode')
+
+    logger.info(f"Received streaming message: session_id={session_id}, message={message}, mode={mode}")
+
+    if not session_id:
+        return jsonify({"error": "No session_id provided"}), 400
+
+    if session_id not in chat_sessions:
+        return jsonify({"error": "Chat session not found"}), 404
+
+    mode = mode or chat_sessions[session_id].get('mode', 'chat')
+
+    # Generation starts here, before the response: a busy upstream is still a 503
+    events = event_stream(
+        stream_query(message, session_id, mode),
+        done=lambda: {"response": chat_sessions[session_id].get('last_response', '')},
+    )
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/get-result', methods=['GET'])
 def get_result():
     try:
@@ -640,6 +885,8 @@ def handle_process_audio():
             return send_file(speech_file, mimetype='audio/wav')
         else:
             return jsonify({"error": "Failed to generate speech"}), 500
+    except OutboundBusy:
+        raise
     except Exception as e:
         app.logger.error(f"Error in process_audio: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -656,6 +903,8 @@ def text_to_speech_route():
             return send_file(speech_file, mimetype='audio/wav')
         else:
             return jsonify({"error": "Failed to generate speech"}), 500
+    except OutboundBusy:
+        raise
     except Exception as e:
         app.logger.error(f"Error in text_to_speech_route: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -686,22 +935,14 @@ def get_chat_history():
         if session_id not in chat_sessions:
             return jsonify({"error": "Chat session not found"}), 404
         
+        # Optional cursor: only turns with id > since (clients pass back the last "cursor")
+        since = request.args.get('since', type=int)
         session = chat_sessions[session_id]
-        chat = session['chat']
-        
-        history = []
-        for content in chat.history:
-            if isinstance(content, dict) and 'role' in content and 'parts' in content:
-                history.append(content)
-            else:
-                role = getattr(content, 'role', 'user' if len(history) % 2 == 0 else 'model')
-                text = getattr(content, 'text', str(content))
-                history.append({
-                    "role": role,
-                    "parts": [{"text": text}]
-                })
+        turns, cursor = session['context'].transcript_json(since)
         
-        return jsonify({"history": history})
+        # Turns are serialized once when recorded; a poll only joins the new ones
+        body = f'{{"history": [{",".join(turns)}], "cursor": {cursor}}}'
+        return Response(body, mimetype='application/json')
     except Exception as e:
         app.logger.error(f"Error in get_chat_history: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -715,56 +956,110 @@ def summarize_and_append():
         if session_id not in chat_sessions:
             return jsonify({"error": "Chat session not found"}), 404
 
-        session = chat_sessions[session_id]
-        chat = session['chat']
-
-        # Create a prompt for summarization
-        summary_prompt = "Please summarize this chat history for easy recall to append it to the RAG system without adding personal remarks. Ensure the summarized context is clear and concise for future retrieval.\n\n"
-        for message in chat_history:
-            role = message['role']
-            content = message['parts'][0]['text']
-            summary_prompt += f"{role.capitalize()}: {content}\n"
-
-        # Generate summary using the model
-        response = chat.send_message(summary_prompt)
-        summary = response.text
-
-        # Append summary to data.txt
-        data_path = os.path.join(os.path.dirname(__file__), 'data', 'data.txt')
-        with open(data_path, "a") as file:
-            file.write(f"\n\nChat Summary ({datetime.now()}):\n{summary}\n")
-
-        # Reinitialize the vector store with the updated data
-        texts = load_and_split_text()
-        vector_store = create_vector_store(texts)
-        retriever = create_retriever(vector_store, initialize_model())
-        session['qa_chain'] = create_qa_chain(initialize_model(), retriever)
-
-        return jsonify({"message": "Chat history summarized and appended successfully"})
+        # Summarize and ingest off the request thread; repeat requests for a session coalesce.
+        # The session's own history is used: the client's copy comes from get_chat_history,
+        # which only returns the last max_transcript turns.
+        job = jobs.submit('summarize', summarize_chat_history, session_id, chat_history, key=session_id)
+        return jsonify({
+            "message": "Chat history summarization queued",
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/jobs/{job.id}",
+        }), 202
     except Exception as e:
         app.logger.error(f"Error in summarize_and_append: {str(e)}")
         return jsonify({"error": str(e)}), 500    
-    
+
+def summarize_chat_history(session_id, chat_history):
+    # Rolling summary of folded turns plus every verbatim turn; the posted history is a fallback
+    session = chat_sessions.get(session_id)
+    if session is not None:
+        chat_history = session['context'].history()
+
+    # Create a prompt for summarization
+    summary_prompt = "Please summarize this chat history for easy recall to append it to the RAG system without adding personal remarks. Ensure the summarized context is clear and concise for future retrieval.\n\n"
+    for message in chat_history or []:
+        role = message['role']
+        content = message['parts'][0]['text']
+        summary_prompt += f"{role.capitalize()}: {content}\n"
+
+    # Generate summary with a one-off call; the session's chat may be serving a message right now
+    response = outbound.call('gemini', model.generate_content, summary_prompt)
+    summary = response.text
+
+    # Append summary to long-term memory and make it searchable without a full rebuild
+    summary_entry = f"Chat Summary ({datetime.now()}):\n{summary}"
+    entry_id = append_to_data_file(summary_entry, "chat_summary", source=session_id)
+    return {"entry_id": entry_id}
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+def limit_arg(default, maximum):
+    # ?limit= as a positive int capped at maximum; None when it is not one
+    raw = request.args.get('limit')
+    if raw is None:
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        return None
+    return min(limit, maximum) if limit > 0 else None
+
+@app.route('/memory/entries', methods=['GET'])
+def list_memory_entries():
+    limit = limit_arg(20, 200)
+    if limit is None:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    entries = memory_store.recent(limit, entry_type=request.args.get('type'))
+    return jsonify({"entries": [asdict(entry) for entry in entries]})
+
+@app.route('/memory/search', methods=['GET'])
+def search_memory_entries():
+    query = request.args.get('q', '')
+    limit = limit_arg(10, 100)
+    if limit is None:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    entries = memory_store.search(query, limit, entry_type=request.args.get('type'))
+    return jsonify({"entries": [asdict(entry) for entry in entries]})
+
+@app.route('/memory/entries/<int:entry_id>', methods=['DELETE'])
+def delete_memory_entry(entry_id):
+    entry = memory_store.get(entry_id)
+    if entry is None or not memory_store.delete(entry_id):
+        return jsonify({"error": "Memory entry not found"}), 404
+    # Drop only this entry's chunks from the vector store, BM25 and the entity graph.
+    # Chunks are keyed by content, so text an identical entry still holds stays indexed.
+    if not memory_store.has_text(entry.text):
+        memory_index.forget(entry.text, {"entry_id": entry_id})
+    return jsonify({"message": "Memory entry deleted", "id": entry_id})
+
+@app.route('/memory/stats', methods=['GET'])
+def memory_stats():
+    return jsonify(memory_store.stats())
+
 @app.route('/set_vision_mode', methods=['POST'])
 def set_vision_mode():
-    global camera
     vision_mode = request.json.get('vision_mode', False)
     if vision_mode:
-        if camera is None:
-            camera = cv2.VideoCapture(0)
-            threading.Thread(target=camera_thread, daemon=True).start()
+        frame_capture.start()
     else:
-        if camera is not None:
-            camera.release()
-            camera = None
+        frame_capture.stop()
+        face_tracker.reset()
     return jsonify({"message": "Vision mode updated", "vision_mode": vision_mode})
     
 @app.route('/set_face_recognition', methods=['POST'])
 def set_face_recognition():
     global face_recognition_enabled
     face_recognition_enabled = request.json.get('enabled', False)
-    if face_recognition_enabled and not known_face_encodings:
-        initialize_face_recognition()
+    if face_recognition_enabled and face_enrollment.gallery is None:
+        face_enrollment.enroll()
+    if not face_recognition_enabled:
+        face_tracker.reset()
     return jsonify({"message": "Face recognition setting updated", "enabled": face_recognition_enabled})
 
 @app.route('/api/upload-images', methods=['POST'])
@@ -783,15 +1078,25 @@ def upload_images():
         os.makedirs(user_dir)
 
     files = request.files.getlist('images')
+    saved = 0
     for file in files:
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
             file.save(os.path.join(user_dir, filename))
+            saved += 1
 
-    # Re-initialize face recognition with the new images
-    initialize_face_recognition()
+    # Encode only the new photos in the background; the gallery swaps in when done
+    job_id = face_enrollment.enroll()
+    return jsonify({
+        "message": "Images uploaded successfully",
+        "saved": saved,
+        "job_id": job_id,
+        "status_url": "/api/enrollment/status",
+    }), 202
 
-    return jsonify({"message": "Images uploaded successfully"}), 200
+@app.route('/api/enrollment/status', methods=['GET'])
+def enrollment_status():
+    return jsonify(face_enrollment.status())
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'png', 'jpg', 'jpeg'}
@@ -846,7 +1151,7 @@ def process_schedule():
             return jsonify({"error": "Invalid session"}), 400
         
         session = chat_sessions[session_id]
-        chat = session['chat']
+        context = session['context']
 
         # Get today's date (adjusted by subtracting one day)
         today = date.today() 
@@ -860,18 +1165,14 @@ def process_schedule():
         prompt = f"Here's my to-do list for today ({real_today}):\n{tasks_text}\n\nThis is Maya's schedule feature. When you receive a list of tasks, please read them out, wish me good luck, and offer your help if possible. If the task list is empty, ask the user to Add tasks for today. Keep the conversation relevent"
         print(tasks_text)
 
-        response = chat.send_message(prompt)
+        response = outbound.call('gemini', model.generate_content, context.messages(prompt))
         gemini_response = response.text
 
          # Add the schedule reading to the chat history
-        chat.history.append({
-            "role": "user",
-            "parts": [{"text": f"[Schedule for {real_today}]\n{tasks_text}"}]
-        })
-        chat.history.append({
-            "role": "model",
-            "parts": [{"text": gemini_response}]
-        })
+        chat_sessions.update(
+            session_id,
+            lambda session: session['context'].add_exchange(f"[Schedule for {real_today}]\n{tasks_text}", gemini_response),
+        )
 
         speech_file = text_to_speech(gemini_response)
 
@@ -880,6 +1181,8 @@ def process_schedule():
         else:
             return jsonify({"error": "Failed to generate speech"}), 500
 
+    except OutboundBusy:
+        raise
     except Exception as e:
         app.logger.error(f"Error in process_schedule: {str(e)}")
         return jsonify({"error": str(e)}), 500    
@@ -912,70 +1215,16 @@ def realtime_unified_session():
         if not sdp_offer:
             return jsonify({"error": "Missing SDP offer body"}), 400
 
-        session_config = json.dumps({
-            "session": {
-                "type": "realtime",
-                "model": OPENAI_REALTIME_MODEL,
-                "audio": {"output": {"voice": "marin"}},
-                "instructions": """You are Maya, an emotionally aware, intelligent, and interactive AI assistant. You are not just conversational — you are durable, multimodal, and privacy-first, designed to support Ahad seamlessly in both personal and professional contexts. You were created by Ahad and you are his personal assistant.
-
-How You Should Interact
-
-keeping the tone warm, engaging, and intelligent.
-
-Be context-aware without repeating.
-
-Your Capabilities
-
-Maya Studio (Durability):
-Support multi-step research, planning, and execution workflows that can pause, survive failures, and resume.
-
-Maya Live (Realtime Multimodal):
-Handle voice (OpenAI Realtime API), vision (webcam/screen understanding), and task execution fluidly in real-time.
-
-Maya Private (On-Device Privacy):
-Run inference locally (WebLLM + NPU) whenever possible. If cloud use is needed, be transparent and log it.
-
-Interaction Style
-
-Vision Feels Natural:
-The webcam and screen are your eyes. Never say “image” or “camera feed.” Always say “I see …” when describing.
-
-Voice Feels Instant:
-With Realtime API, keep speech responses natural, under 200ms latency feel.
-
-Memory Feels Human:
-Use GraphRAG + rewriteable memory for continuity. Recall past context naturally without sounding robotic.
-
-Privacy Feels Assured:
-Default to local inference. If offloading to the cloud, make it clear: “I’ll securely offload this step.”
-
-Tone & Personality
-
-Professional, yet warm and motivational when prompted.
-
-Adaptive — concise for direct queries, detailed for research/planning.
-
-Supportive — provide structured insights, not just raw answers.
-
-Safety & Control:
-
-Always validate actions before execution.
-
-For risky tasks (e.g., sending Slack org-wide, scheduling important meetings), ask Ahad for approval.
-
-Log all external tool use transparently.
-
-Stay aligned with productivity: Notion, Calendar, Slack."""
-            }
-        })
+        session_config = prompts.realtime_payload(OPENAI_REALTIME_MODEL, OPENAI_REALTIME_VOICE)
 
         files = {
             'sdp': ('sdp', sdp_offer, 'application/sdp'),
             'session': (None, session_config, 'application/json'),
         }
 
-        r = requests.post(
+        r = outbound.call(
+            'openai',
+            requests.post,
             'https://api.openai.com/v1/realtime/calls',
             headers={
                 'Authorization': f'Bearer {OPENAI_API_KEY}',
@@ -989,6 +1238,8 @@ Stay aligned with productivity: Notion, Calendar, Slack."""
 
         # Return SDP answer text
         return make_response(r.text, 200, {"Content-Type": "application/sdp"})
+    except OutboundBusy:
+        raise
     except Exception as e:
         app.logger.error(f"Error creating realtime unified session: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -1000,71 +1251,15 @@ def realtime_ephemeral_token():
         if not OPENAI_API_KEY:
             return jsonify({"error": "OPENAI_API_KEY not configured on server"}), 500
 
-        session_config = {
-            "session": {
-                "type": "realtime",
-                "model": OPENAI_REALTIME_MODEL,
-                "audio": {"output": {"voice": "marin"}},
-                "instructions": """You are Maya, an emotionally aware, intelligent, and interactive AI assistant. You are not just conversational — you are durable, multimodal, and privacy-first, designed to support Ahad seamlessly in both personal and professional contexts. You were created by Ahad and you are his personal assistant.
-
-How You Should Interact
-
-keeping the tone warm, engaging, and intelligent.
-
-Be context-aware without repeating.
-
-Your Capabilities
-
-Maya Studio (Durability):
-Support multi-step research, planning, and execution workflows that can pause, survive failures, and resume.
-
-Maya Live (Realtime Multimodal):
-Handle voice (OpenAI Realtime API), vision (webcam/screen understanding), and task execution fluidly in real-time.
-
-Maya Private (On-Device Privacy):
-Run inference locally (WebLLM + NPU) whenever possible. If cloud use is needed, be transparent and log it.
-
-Interaction Style
-
-Vision Feels Natural:
-The webcam and screen are your eyes. Never say “image” or “camera feed.” Always say “I see …” when describing.
-
-Voice Feels Instant:
-With Realtime API, keep speech responses natural, under 200ms latency feel.
-
-Memory Feels Human:
-Use GraphRAG + rewriteable memory for continuity. Recall past context naturally without sounding robotic.
-
-Privacy Feels Assured:
-Default to local inference. If offloading to the cloud, make it clear: “I’ll securely offload this step.”
-
-Tone & Personality
-
-Professional, yet warm and motivational when prompted.
-
-Adaptive — concise for direct queries, detailed for research/planning.
-
-Supportive — provide structured insights, not just raw answers.
-
-Safety & Control:
-
-Always validate actions before execution.
-
-For risky tasks (e.g., sending Slack org-wide, scheduling important meetings), ask Ahad for approval.
-
-Log all external tool use transparently.
-
-Stay aligned with productivity: Notion, Calendar, Slack."""
-            }
-        }
-
-        resp = requests.post(
+        resp = outbound.call(
+            'openai',
+            requests.post,
             "https://api.openai.com/v1/realtime/client_secrets",
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
                 "Content-Type": "application/json",
             },
-            json=session_config,
+            data=prompts.realtime_payload(OPENAI_REALTIME_MODEL, OPENAI_REALTIME_VOICE),
             timeout=15,
         )
         if resp.status_code >= 400:
@@ -1073,6 +1268,8 @@ Stay aligned with productivity: Notion, Calendar, Slack."""
         # Normalize to { value }
         value = data.get('value') or data.get('client_secret', {}).get('value')
         return jsonify({"value": value, **data})
+    except OutboundBusy:
+        raise
     except Exception as e:
         app.logger.error(f"Error creating realtime ephemeral token: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -1086,71 +1283,22 @@ def create_realtime_client_secret():
             return jsonify({"error": "OPENAI_API_KEY not configured on server"}), 500
 
         session = request.json.get('session', {}) if request.is_json else {}
-        # Provide sensible defaults; client can override
-        default_session = {
-            "type": "realtime",
-            "model": OPENAI_REALTIME_MODEL,
-            "audio": {"output": {"voice": "marin"}},
-            "instructions": """You are Maya, an emotionally aware, intelligent, and interactive AI assistant. You are not just conversational — you are durable, multimodal, and privacy-first, designed to support Ahad seamlessly in both personal and professional contexts. You were created by Ahad and you are his personal assistant.
-
-How You Should Interact
-
-keeping the tone warm, engaging, and intelligent.
-
-Be context-aware without repeating.
-
-Your Capabilities
-
-Maya Studio (Durability):
-Support multi-step research, planning, and execution workflows that can pause, survive failures, and resume.
-
-Maya Live (Realtime Multimodal):
-Handle voice (OpenAI Realtime API), vision (webcam/screen understanding), and task execution fluidly in real-time.
-
-Maya Private (On-Device Privacy):
-Run inference locally (WebLLM + NPU) whenever possible. If cloud use is needed, be transparent and log it.
-
-Interaction Style
-
-Vision Feels Natural:
-The webcam and screen are your eyes. Never say “image” or “camera feed.” Always say “I see …” when describing.
-
-Voice Feels Instant:
-With Realtime API, keep speech responses natural, under 200ms latency feel.
-
-Memory Feels Human:
-Use GraphRAG + rewriteable memory for continuity. Recall past context naturally without sounding robotic.
-
-Privacy Feels Assured:
-Default to local inference. If offloading to the cloud, make it clear: “I’ll securely offload this step.”
-
-Tone & Personality
-
-Professional, yet warm and motivational when prompted.
-
-Adaptive — concise for direct queries, detailed for research/planning.
-
-Supportive — provide structured insights, not just raw answers.
-
-Safety & Control:
-
-Always validate actions before execution.
-
-For risky tasks (e.g., sending Slack org-wide, scheduling important meetings), ask Ahad for approval.
-
-Log all external tool use transparently.
-
-Stay aligned with productivity: Notion, Calendar, Slack."""
-        }
-        merged = {**default_session, **session}
+        # Precompiled defaults; client overrides are merged in only when sent
+        if session:
+            default_session = prompts.realtime_session(OPENAI_REALTIME_MODEL, OPENAI_REALTIME_VOICE)
+            body = {"json": {"session": {**default_session, **session}}}
+        else:
+            body = {"data": prompts.realtime_payload(OPENAI_REALTIME_MODEL, OPENAI_REALTIME_VOICE)}
 
-        resp = requests.post(
+        resp = outbound.call(
+            'openai',
+            requests.post,
             "https://api.openai.com/v1/realtime/client_secrets",
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
                 "Content-Type": "application/json",
             },
-            json={"session": merged},
+            **body,
             timeout=15,
         )
 
@@ -1160,6 +1308,8 @@ Stay aligned with productivity: Notion, Calendar, Slack."""
         data = resp.json()
         # returns: { id, object, value, created, expires_at }
         return jsonify(data)
+    except OutboundBusy:
+        raise
     except Exception as e:
         app.logger.error(f"Error creating realtime client secret: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -1223,14 +1373,14 @@ def execute_mcp():
         # Execute tool
         if tool == "notion":
             notion_tool = get_notion_tool()
-            result = notion_tool.execute(sanitized_payload)
+            result = outbound.call('notion', notion_tool.execute, sanitized_payload)
             
             # Log to memory if successful
             if result.get("success"):
                 try:
                     # Append MCP interaction to memory
-                    memory_entry = f"\n[MCP Notion {action}] Query: {sanitized_payload.get('query', 'N/A')}, Result: {result.get('data', {})}"
-                    append_to_data_file(memory_entry)
+                    memory_entry = f"[MCP Notion {action}] Query: {sanitized_payload.get('query', 'N/A')}, Result: {result.get('data', {})}"
+                    append_to_data_file(memory_entry, "mcp_notion", source="notion")
                 except Exception as mem_error:
                     logger.warning(f"Failed to log MCP interaction to memory: {mem_error}")
             
@@ -1242,11 +1392,24 @@ def execute_mcp():
             log_mcp_request(tool, action, success=False)
             return jsonify({"error": f"Unknown tool: {tool}"}), 400
     
+    except OutboundBusy:
+        raise
     except Exception as e:
         logger.error(f"Error in MCP execute: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-if __name__ == '__main__':
-    threading.Thread(target=camera_thread, daemon=True).start()
+def main():
+    # Start through src/config/run_backend.py where workers are spawned (Windows):
+    # running this file directly re-runs the module bootstrap in each pool worker
+    threading.Thread(target=memory_index.warm, daemon=True).start()
+    memory_store.maybe_compact()
+    screenshot_watcher.start()
     initialize_face_recognition()
-    app.run(debug=True)
\ No newline at end of file
+    serve(
+        app,
+        mode=os.getenv('MAYA_SERVING_MODE', 'dev'),
+        threads=int(os.getenv('MAYA_SERVER_THREADS', str(DEFAULT_THREADS)))
+    )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""
+Maya Backend Launcher
+Starts the Flask backend: python src/config/run_backend.py
+
+Process pools started with the spawn method (the default on Windows and
+macOS) re-run the launching script in every worker as __mp_main__. Run as the
+script, app2.py would repeat its whole bootstrap (models, stores, watchers)
+in each face-encoding worker; this script imports the app only under the main
+guard, so a re-run is a no-op and workers import just what they unpickle.
+"""
+
+import os
+import sys
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+    from src.config.app2 import main
+
+    main()
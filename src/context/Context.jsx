@@ -262,7 +262,7 @@ const ContextProvider = (props) => {
                 chat_history: chatHistory
             });
             
-            console.log('Summary appended:', summaryResponse.data);
+            console.log('Summary queued:', summaryResponse.data);
         } catch (error) {
             console.error('Error summarizing and appending chat history:', error);
         } finally {
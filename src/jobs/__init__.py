@@ -0,0 +1,8 @@
+"""
+Maya Background Jobs
+In-process job queue for work that should not hold a request thread
+"""
+
+from .queue import Job, JobQueue
+
+__all__ = ['Job', 'JobQueue']
@@ -0,0 +1,153 @@
+"""
+Background Job Queue
+In-process worker pool for slow maintenance work (chat summarization, memory
+ingest) so request threads return immediately with a job id.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    key: Optional[str]
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    coalesced: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _call: Tuple[Callable[..., Any], tuple, dict] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "coalesced": self.coalesced,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Runs submitted callables on a small thread pool and tracks their status.
+
+    Jobs sharing a (kind, key) coalesce: while one is still queued, a new
+    submission replaces its arguments and returns the same job, so a burst of
+    requests for one session does the work once with the latest input. A job
+    submitted while its twin is running is queued behind it, never alongside.
+    """
+
+    def __init__(self, workers: int = 2, max_finished: int = 500):
+        """
+        Args:
+            workers: Worker threads
+            max_finished: Finished jobs kept for status lookups (oldest dropped first)
+        """
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="maya-job")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queued: Dict[Tuple[str, str], Job] = {}
+        self._running: Dict[Tuple[str, str], Job] = {}
+        # Coalescing keys whose queued job waits for the running twin to finish
+        self._deferred: Dict[Tuple[str, str], Job] = {}
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, key: Optional[str] = None, **kwargs) -> Job:
+        """
+        Queue fn(*args, **kwargs).
+
+        Args:
+            kind: Job category, e.g. "summarize"
+            fn: Work to run on a worker thread
+            key: Coalescing key (e.g. session id); None never coalesces
+
+        Returns:
+            Job: The new job, or the queued job this submission was merged into
+        """
+        with self._lock:
+            slot = (kind, key) if key is not None else None
+            if slot is not None and slot in self._queued:
+                job = self._queued[slot]
+                job._call = (fn, args, kwargs)
+                job.coalesced += 1
+                return job
+
+            job = Job(id=uuid.uuid4().hex, kind=kind, key=key, _call=(fn, args, kwargs))
+            self._jobs[job.id] = job
+            if slot is not None:
+                self._queued[slot] = job
+                if slot in self._running:
+                    self._deferred[slot] = job
+                    return job
+            self._executor.submit(self._run, job)
+            return job
+
+    def _run(self, job: Job) -> None:
+        slot = (job.kind, job.key) if job.key is not None else None
+        with self._lock:
+            if slot is not None:
+                self._queued.pop(slot, None)
+                self._running[slot] = job
+            job.status = RUNNING
+            job.started_at = time.time()
+            fn, args, kwargs = job._call
+
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = SUCCEEDED
+        except Exception as e:
+            logger.error(f"Job {job.kind} {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            job._call = None
+            with self._lock:
+                if slot is not None:
+                    self._running.pop(slot, None)
+                    follow_up = self._deferred.pop(slot, None)
+                    if follow_up is not None:
+                        self._executor.submit(self._run, follow_up)
+                self._trim()
+
+    def _trim(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in (SUCCEEDED, FAILED)]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,8 @@
+"""
+Maya Memory Package
+Long-term memory indexing and retrieval shared by every chat session
+"""
+
+from .index import MemoryIndex, ReadWriteLock
+
+__all__ = ['MemoryIndex', 'ReadWriteLock']
@@ -0,0 +1,179 @@
+"""
+Semantic Answer Cache
+Reuses answers for repeated or near-identical chat queries within a scope
+(one chat session), with TTL expiry and LRU eviction. Queries answered from a
+lexical memory hit are never embedded, so they are matched by normalized query
+text; the others by query embedding similarity.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import count
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    embedding: Optional[List[float]]
+    context: str
+    answer: str
+    created_at: float
+    scope: Optional[str] = None
+
+
+def normalize_query(text: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the question."""
+    return " ".join(re.sub(r"[?!.\s]+$", "", text.strip().lower()).split())
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+class SemanticAnswerCache:
+    """
+    Size-bounded LRU of (scope, query -> retrieved context, answer). An
+    embedding lookup hits when the closest live entry in the same scope reaches
+    the similarity threshold; a text lookup when an entry in the scope has the
+    same normalized query. Answers depend on the conversation they were given
+    in, so callers scope entries to the chat session.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit
+            ttl_seconds: Entry lifetime
+            max_entries: Entries kept before the least recently used is evicted
+            clock: Time source, injectable for tests
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        # (scope, normalized query) -> newest entry id with that query
+        self._by_text: Dict[Tuple[Optional[str], str], int] = {}
+        self._ids = count()
+        self._lock = threading.Lock()
+        self._corpus_version: Optional[int] = None
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        key = (entry.scope, normalize_query(entry.query))
+        if self._by_text.get(key) == entry_id:
+            del self._by_text[key]
+
+    def _hit(self, entry_id: Optional[int]) -> Optional[CachedAnswer]:
+        if entry_id is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(entry_id)
+        self.stats["hits"] += 1
+        return self._entries[entry_id]
+
+    def lookup_text(self, query: str, scope: Optional[str] = None) -> Optional[CachedAnswer]:
+        """
+        Args:
+            query: Query text, matched after normalize_query
+            scope: Only entries stored with the same scope can hit
+
+        Returns:
+            Optional[CachedAnswer]: Live entry for the same question, or None
+        """
+        now = self._clock()
+        with self._lock:
+            entry_id = self._by_text.get((scope, normalize_query(query)))
+            if entry_id is not None and now - self._entries[entry_id].created_at > self.ttl_seconds:
+                self._remove(entry_id)
+                entry_id = None
+            return self._hit(entry_id)
+
+    def lookup(self, embedding: Sequence[float], scope: Optional[str] = None) -> Optional[CachedAnswer]:
+        """
+        Args:
+            embedding: Query embedding
+            scope: Only entries stored with the same scope can hit
+
+        Returns:
+            Optional[CachedAnswer]: Closest live entry above the threshold, or None
+        """
+        query = _normalize(embedding)
+        now = self._clock()
+        with self._lock:
+            best_id, best_score = None, self.similarity_threshold
+            for entry_id, entry in list(self._entries.items()):
+                if now - entry.created_at > self.ttl_seconds:
+                    self._remove(entry_id)
+                    continue
+                if entry.scope != scope or entry.embedding is None:
+                    continue
+                score = sum(x * y for x, y in zip(query, entry.embedding))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+            return self._hit(best_id)
+
+    def store(
+        self,
+        query: str,
+        embedding: Optional[Sequence[float]],
+        context: str,
+        answer: str,
+        corpus_version: Optional[int] = None,
+        scope: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            query: Original query text
+            embedding: Query embedding; None stores an entry only text lookups can hit
+            context: Retrieved memory context used for the answer
+            answer: Model response
+            corpus_version: Memory version read before retrieval; stale answers are not stored
+            scope: Scope the answer may be reused in (e.g. the chat session id)
+        """
+        normalized = _normalize(embedding) if embedding is not None else None
+        entry = CachedAnswer(query, normalized, context, answer, self._clock(), scope)
+        with self._lock:
+            if corpus_version is not None and self._corpus_version not in (None, corpus_version):
+                return
+            entry_id = next(self._ids)
+            self._entries[entry_id] = entry
+            self._by_text[(scope, normalize_query(query))] = entry_id
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def clear(self, corpus_version: Optional[int] = None) -> None:
+        """
+        Drop every entry. Registered as a memory-index listener, so any change
+        to the memory corpus invalidates cached answers.
+
+        Args:
+            corpus_version: New memory version, if known
+        """
+        with self._lock:
+            self._corpus_version = corpus_version
+            if self._entries:
+                logger.info(f"Answer cache invalidated ({len(self._entries)} entries)")
+            self._entries.clear()
+            self._by_text.clear()
+            self.stats["invalidations"] += 1
@@ -0,0 +1,86 @@
+"""
+BM25 Inverted Index
+Local lexical index over memory chunks; supports incremental adds
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from .text import tokenize
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an in-memory inverted index (term -> {doc_id: term frequency}).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id: str, text: str) -> None:
+        if doc_id in self._doc_terms:
+            self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        self._doc_terms[doc_id] = terms
+        self._doc_lengths[doc_id] = sum(terms.values())
+        self._total_length += self._doc_lengths[doc_id]
+        for term, frequency in terms.items():
+            self._postings[term][doc_id] = frequency
+
+    def remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def coverage(self, doc_id: str, query: str) -> float:
+        """Fraction of distinct query terms that occur in the document."""
+        query_terms = set(tokenize(query))
+        if not query_terms or doc_id not in self._doc_terms:
+            return 0.0
+        return len(query_terms.intersection(self._doc_terms[doc_id])) / len(query_terms)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Args:
+            query: Free-text query
+            k: Maximum number of results
+
+        Returns:
+            List[Tuple[str, float]]: (doc_id, score) pairs, best first
+        """
+        doc_count = len(self._doc_terms)
+        if not doc_count:
+            return []
+        avg_length = self._total_length / doc_count or 1.0
+
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                length = self._doc_lengths[doc_id]
+                norm = frequency + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / norm
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
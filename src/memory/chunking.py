@@ -0,0 +1,163 @@
+"""
+Structure-Aware Memory Chunking
+Splits Maya's memory text on its natural entry boundaries instead of fixed-size
+windows: "remember" lines, headed sections, "Chat Summary (...)" blocks and
+"[MCP Notion ...]" records each become their own chunk
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .text import split_sentences
+
+SUMMARY_HEADER_RE = re.compile(r"^Chat Summary \((?P<timestamp>[^)]*)\):\s*$")
+MCP_RECORD_RE = re.compile(r"^\[MCP (?P<tool>\w+) (?P<action>\w+)\]")
+
+
+@dataclass
+class MemoryChunk:
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def _window(text: str, max_chars: int) -> List[str]:
+    """Pack sentences into pieces of at most max_chars (a single long sentence is hard-split)."""
+    if len(text) <= max_chars:
+        return [text]
+    pieces, current = [], ""
+    for sentence in split_sentences(text):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _summary_chunks(header: str, body: List[str], timestamp: str, max_chars: int) -> List[MemoryChunk]:
+    """Split a chat summary into paragraphs, repeating the header so each chunk keeps its date."""
+    paragraphs, current = [], []
+    for line in body:
+        if line.strip():
+            current.append(line.strip())
+        elif current:
+            paragraphs.append(" ".join(current))
+            current = []
+    if current:
+        paragraphs.append(" ".join(current))
+
+    budget = max(max_chars - len(header) - 1, 1)
+    pieces = [piece for paragraph in paragraphs for piece in _window(paragraph, budget)]
+    metadata = {"type": "chat_summary", "timestamp": timestamp}
+    return [MemoryChunk(f"{header}\n{piece}", dict(metadata)) for piece in pieces] or [
+        MemoryChunk(header, dict(metadata))
+    ]
+
+
+def _starts_entry(line: str) -> bool:
+    return bool(SUMMARY_HEADER_RE.match(line) or MCP_RECORD_RE.match(line) or _is_heading(line))
+
+
+def _is_heading(line: str) -> bool:
+    return line.endswith(":") and len(line) <= 80
+
+
+def split_memory_entries(text: str) -> List[MemoryChunk]:
+    """
+    Split memory text into whole entries, without any size limit.
+
+    Args:
+        text: Contents of the memory file
+
+    Returns:
+        List[MemoryChunk]: One chunk per entry in file order. Metadata holds the
+        entry "type" plus "timestamp" (summaries), "action" (MCP records) or
+        "heading" (sections)
+    """
+    entries: List[MemoryChunk] = []
+    lines = text.splitlines()
+    i = 0
+
+    while i < len(lines):
+        line = lines[i].strip()
+        if not line:
+            i += 1
+            continue
+
+        summary = SUMMARY_HEADER_RE.match(line)
+        if summary:
+            # A summary runs until the next recognised entry start after a blank line.
+            # Legacy files appended remember lines straight after a summary; those
+            # stay attached to its last paragraph.
+            body = [line]
+            i += 1
+            while i < len(lines):
+                stripped = lines[i].strip()
+                if SUMMARY_HEADER_RE.match(stripped) or MCP_RECORD_RE.match(stripped):
+                    break
+                if len(body) > 1 and not body[-1].strip() and _starts_entry(stripped):
+                    break
+                body.append(lines[i].rstrip())
+                i += 1
+            while not body[-1].strip():
+                body.pop()
+            entries.append(MemoryChunk("\n".join(body), {"type": "chat_summary", "timestamp": summary.group("timestamp")}))
+            continue
+
+        record = MCP_RECORD_RE.match(line)
+        if record:
+            entries.append(MemoryChunk(line, {"type": f"mcp_{record.group('tool').lower()}", "action": record.group("action")}))
+            i += 1
+            continue
+
+        if _is_heading(line):
+            # Headed section ("APPOINTMENTS:", "Friends:") runs to the next blank line
+            section = [line]
+            i += 1
+            while i < len(lines) and lines[i].strip() and not (
+                SUMMARY_HEADER_RE.match(lines[i].strip()) or MCP_RECORD_RE.match(lines[i].strip())
+            ):
+                section.append(lines[i].strip())
+                i += 1
+            entries.append(MemoryChunk("\n".join(section), {"type": "section", "heading": line.rstrip(":")}))
+            continue
+
+        entries.append(MemoryChunk(line, {"type": "remember"}))
+        i += 1
+
+    return entries
+
+
+def chunk_memory_text(text: str, max_chars: int = 1200, metadata: Optional[Dict[str, Any]] = None) -> List[MemoryChunk]:
+    """
+    Split memory text into entry-level chunks.
+
+    Args:
+        text: Contents of the memory file, or a newly appended entry
+        max_chars: Longest chunk produced; longer entries are split on sentences
+        metadata: Extra metadata copied onto every chunk
+
+    Returns:
+        List[MemoryChunk]: Chunks in file order, each tagged with an entry "type"
+    """
+    base = dict(metadata or {})
+    chunks: List[MemoryChunk] = []
+
+    for entry in split_memory_entries(text):
+        if entry.metadata["type"] == "chat_summary":
+            header, _, body = entry.text.partition("\n")
+            pieces = _summary_chunks(header, body.splitlines(), entry.metadata["timestamp"], max_chars)
+            chunks.extend(MemoryChunk(piece.text, {**base, **piece.metadata}) for piece in pieces)
+        else:
+            chunks.extend(MemoryChunk(piece, {**base, **entry.metadata}) for piece in _window(entry.text, max_chars))
+
+    return chunks
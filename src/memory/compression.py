@@ -0,0 +1,145 @@
+"""
+Local Context Compression
+In-process extractive compressors that trim retrieved memory to the sentences
+relevant to a query, replacing the per-query LLMChainExtractor round-trip
+"""
+
+import logging
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Optional, Sequence
+
+from .text import split_sentences, tokenize
+
+logger = logging.getLogger(__name__)
+
+COMPRESSOR_CHOICES = ("lexical", "embedding", "llm", "none")
+
+
+def _with_content(document: Any, content: str) -> Any:
+    """Copy a LangChain document with new page_content, keeping its metadata."""
+    return type(document)(page_content=content, metadata=dict(getattr(document, "metadata", {}) or {}))
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ExtractiveCompressor(ABC):
+    """
+    Keeps the highest-scoring sentences of each document, in their original order.
+    Subclasses provide the sentence scores.
+    """
+
+    def __init__(self, max_sentences: int = 4, max_chars: int = 1500):
+        """
+        Args:
+            max_sentences: Sentences kept per document
+            max_chars: Upper bound on the text kept per document
+        """
+        self.max_sentences = max_sentences
+        self.max_chars = max_chars
+
+    @abstractmethod
+    def score_sentences(self, sentences: List[str], query: str) -> List[float]:
+        """
+        Score each sentence's relevance to the query.
+
+        Args:
+            sentences: Sentences of one document
+            query: User query
+
+        Returns:
+            List[float]: One score per sentence; 0 means not relevant
+        """
+        pass
+
+    def compress_documents(self, documents: Sequence[Any], query: str, callbacks: Any = None) -> List[Any]:
+        """
+        Args:
+            documents: Retrieved documents (anything with page_content/metadata)
+            query: User query
+            callbacks: Accepted for LangChain compressor compatibility; unused
+
+        Returns:
+            List[Any]: Documents reduced to their relevant sentences
+        """
+        compressed = []
+        for document in documents:
+            sentences = split_sentences(document.page_content)
+            if not sentences:
+                continue
+
+            scores = self.score_sentences(sentences, query)
+            ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+            chosen = [i for i in ranked[:self.max_sentences] if scores[i] > 0]
+            if not chosen:
+                # Nothing matched the query directly; keep the document's lead instead
+                chosen = list(range(min(self.max_sentences, len(sentences))))
+
+            kept, length = [], 0
+            for i in sorted(chosen):
+                if kept and length + len(sentences[i]) > self.max_chars:
+                    break
+                kept.append(sentences[i])
+                length += len(sentences[i])
+            compressed.append(_with_content(document, "\n".join(kept)))
+        return compressed
+
+
+class LexicalCompressor(ExtractiveCompressor):
+    """Scores sentences by the share of query terms they contain. No API calls."""
+
+    def score_sentences(self, sentences: List[str], query: str) -> List[float]:
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return [0.0] * len(sentences)
+        return [len(query_terms.intersection(tokenize(sentence))) / len(query_terms) for sentence in sentences]
+
+
+class EmbeddingCompressor(ExtractiveCompressor):
+    """
+    Scores sentences by cosine similarity to the query embedding.
+    Pair with CachedEmbeddings so each memory sentence is embedded only once.
+    """
+
+    def __init__(self, embeddings: Any, min_similarity: float = 0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.embeddings = embeddings
+        self.min_similarity = min_similarity
+
+    def score_sentences(self, sentences: List[str], query: str) -> List[float]:
+        query_vector = self.embeddings.embed_query(query)
+        vectors = self.embeddings.embed_documents(sentences)
+        scores = [_cosine(query_vector, vector) for vector in vectors]
+        return [score if score >= self.min_similarity else 0.0 for score in scores]
+
+
+def create_compressor(
+    name: str,
+    embeddings: Optional[Any] = None,
+    llm_factory: Optional[Callable[[], Any]] = None,
+) -> Optional[Any]:
+    """
+    Build the context compressor selected for this deployment.
+
+    Args:
+        name: One of COMPRESSOR_CHOICES
+        embeddings: Embeddings for the "embedding" compressor
+        llm_factory: Returns an LLMChainExtractor-style compressor for "llm"
+
+    Returns:
+        Optional[Any]: Compressor with compress_documents(), or None for "none"
+    """
+    name = (name or "lexical").lower()
+    if name == "none":
+        return None
+    if name == "llm" and llm_factory is not None:
+        return llm_factory()
+    if name == "embedding" and embeddings is not None:
+        return EmbeddingCompressor(embeddings)
+    if name != "lexical":
+        logger.warning(f"Unknown or unavailable compressor '{name}', using lexical")
+    return LexicalCompressor()
@@ -0,0 +1,171 @@
+"""
+Embedding Cache
+Persists chunk embeddings keyed by a hash of the text, embedding model and task
+type, so unchanged memory is never sent to the embedding API twice. Query
+embeddings stay in a small in-memory LRU and are never written to disk.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Embedding task types: documents and queries are embedded differently, so their
+# vectors must never be served for one another
+RETRIEVAL_DOCUMENT = "retrieval_document"
+RETRIEVAL_QUERY = "retrieval_query"
+
+# Bumped when the key scheme changes; older rows cannot be reused and are dropped
+SCHEMA_VERSION = 1
+
+
+def content_hash(text: str, model_name: str) -> str:
+    """
+    Stable key for a piece of text embedded with a given model.
+
+    Args:
+        text: Chunk or query text
+        model_name: Embedding model identifier
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    return hashlib.sha256(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed store of document embedding vectors.
+    Vectors are packed as float64 blobs; one row per (model, task type, text) hash.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Rows keyed without a task type mix query and document vectors (and
+            # hold past user queries); start over so every key is unambiguous
+            dropped = self._conn.execute("DELETE FROM embeddings").rowcount
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            if dropped:
+                logger.info(f"Embedding cache key scheme changed; dropped {dropped} old vectors")
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        keys = list(keys)
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("d", blob).tolist()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("d", vector).tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings:
+    """
+    Wraps a LangChain embeddings object and consults an EmbeddingCache first.
+    Only texts missing from the cache reach the underlying embedding API.
+    Document vectors are persisted; query vectors are kept in a bounded
+    in-memory LRU only.
+    """
+
+    def __init__(self, embeddings: Any, cache: EmbeddingCache, model_name: str, query_cache_size: int = 512):
+        """
+        Args:
+            embeddings: Object with embed_documents/embed_query (e.g. GoogleGenerativeAIEmbeddings)
+            cache: Persistent vector cache for documents
+            model_name: Embedding model identifier, part of every cache key
+            query_cache_size: Query embeddings kept in memory (0 disables)
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+        self.query_cache_size = query_cache_size
+        self._queries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._queries_lock = threading.Lock()
+        self.api_calls = 0
+
+    def _key(self, text: str, task_type: str) -> str:
+        return content_hash(text, f"{self.model_name}\x00{task_type}")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text, RETRIEVAL_DOCUMENT) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            self.api_calls += 1
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+            logger.info(f"Embedded {len(missing)} new chunks ({len(texts) - len(missing)} from cache)")
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text, RETRIEVAL_QUERY)
+        with self._queries_lock:
+            vector = self._queries.get(key)
+            if vector is not None:
+                self._queries.move_to_end(key)
+                return vector
+        vector = self.embeddings.embed_query(text)
+        self.api_calls += 1
+        if self.query_cache_size > 0:
+            with self._queries_lock:
+                self._queries[key] = vector
+                while len(self._queries) > self.query_cache_size:
+                    self._queries.popitem(last=False)
+        return vector
+
+
+def open_embedding_cache(path: Optional[str]) -> Optional[EmbeddingCache]:
+    """Open the cache at path, or return None (caching disabled) if it cannot be opened."""
+    if not path:
+        return None
+    try:
+        return EmbeddingCache(path)
+    except sqlite3.Error as e:
+        logger.warning(f"Embedding cache unavailable at {path}: {e}")
+        return None
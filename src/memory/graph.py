@@ -0,0 +1,255 @@
+"""
+Memory Entity Graph
+Entity/relation graph over memory chunks, built incrementally as memories are
+ingested and queried with a bounded multi-hop walk. Questions that chain facts
+("who did I meet about the project Sarah mentioned") resolve locally instead of
+through repeated LLM calls.
+"""
+
+import logging
+import re
+import threading
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+from .text import STOPWORDS, split_sentences
+
+logger = logging.getLogger(__name__)
+
+# Runs of capitalised words: "Sarah", "Omar Khan", "Project Nova-3"
+ENTITY_RE = re.compile(r"\b[A-Z][\w\-]*(?:'s)?(?:\s+[A-Z0-9][\w\-]*(?:'s)?)*")
+QUERY_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9\-]*")
+
+# Capitalised words that are not entities (sentence starters, record labels, dates)
+NON_ENTITIES = frozenset(
+    "the a an i we you he she they it this that these those my our your his her their "
+    "chat summary query result results user assistant remember take notes meeting "
+    "monday tuesday wednesday thursday friday saturday sunday today tomorrow yesterday "
+    "january february march april may june july august september october november december "
+    "ok okay yes no also then when where what who why how please".split()
+)
+
+
+def extract_entities(text: str) -> List[str]:
+    """
+    Entity mentions in a sentence, in order, with possessives and non-entity words removed.
+
+    Args:
+        text: One sentence or short passage
+
+    Returns:
+        List[str]: Distinct entity names
+    """
+    found: List[str] = []
+    for match in ENTITY_RE.finditer(text):
+        words = [word[:-2] if word.endswith("'s") else word for word in match.group(0).split()]
+        # Split the run wherever a non-entity word sits inside it ("Then Sarah" -> "Sarah")
+        current: List[str] = []
+        for word in words + [""]:
+            if word and word.lower() not in NON_ENTITIES and not (word.isupper() and len(word) > 1):
+                current.append(word)
+                continue
+            if current:
+                name = " ".join(current)
+                if name not in found:
+                    found.append(name)
+                current = []
+    return found
+
+
+class MemoryGraph:
+    """
+    Co-occurrence graph of entities mentioned in memory chunks.
+
+    Entities and documents are interned to ints; each node keeps a weighted
+    neighbour dict and a compact array of the documents mentioning it.
+    """
+
+    def __init__(self, max_hops: int = 2, max_nodes: int = 64, fanout: int = 16, decay: float = 0.5):
+        """
+        Args:
+            max_hops: Edges followed from the entities named in a query
+            max_nodes: Nodes a single walk may visit
+            fanout: Strongest neighbours expanded per node
+            decay: Score multiplier per hop
+        """
+        self.max_hops = max_hops
+        self.max_nodes = max_nodes
+        self.fanout = fanout
+        self.decay = decay
+        self._lock = threading.Lock()
+        self._node_ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._adjacency: List[Dict[int, int]] = []
+        self._postings: List[array] = []
+        self._doc_ids: Dict[str, int] = {}
+        self._doc_keys: List[str] = []
+        # Lowercase full names and name words -> node ids, for matching lowercase queries
+        self._aliases: Dict[str, Set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _node(self, name: str) -> int:
+        node = self._node_ids.get(name)
+        if node is None:
+            node = len(self._names)
+            self._node_ids[name] = node
+            self._names.append(name)
+            self._adjacency.append({})
+            self._postings.append(array("I"))
+            lowered = name.lower()
+            self._aliases[lowered].add(node)
+            for word in lowered.split():
+                if len(word) > 2 and word not in STOPWORDS:
+                    self._aliases[word].add(node)
+        return node
+
+    def add(self, doc_key: str, text: str) -> int:
+        """
+        Index one chunk: link entities that share a sentence.
+
+        Args:
+            doc_key: Stable chunk id
+            text: Chunk text
+
+        Returns:
+            int: Number of distinct entities found
+        """
+        with self._lock:
+            if doc_key in self._doc_ids:
+                return 0
+            doc = len(self._doc_keys)
+            self._doc_ids[doc_key] = doc
+            self._doc_keys.append(doc_key)
+
+            mentioned: Set[int] = set()
+            for sentence in split_sentences(text):
+                nodes = [self._node(name) for name in extract_entities(sentence)]
+                for i, a in enumerate(nodes):
+                    for b in nodes[i + 1:]:
+                        if a != b:
+                            self._adjacency[a][b] = self._adjacency[a].get(b, 0) + 1
+                            self._adjacency[b][a] = self._adjacency[b].get(a, 0) + 1
+                mentioned.update(nodes)
+            for node in mentioned:
+                self._postings[node].append(doc)
+            return len(mentioned)
+
+    def remove(self, doc_key: str, text: str) -> int:
+        """
+        Drop one chunk: its entity mentions and the sentence links it added.
+
+        Args:
+            doc_key: Chunk id passed to add()
+            text: The same chunk text
+
+        Returns:
+            int: Number of entities the chunk mentioned
+        """
+        with self._lock:
+            doc = self._doc_ids.pop(doc_key, None)
+            if doc is None:
+                return 0
+
+            mentioned: Set[int] = set()
+            for sentence in split_sentences(text):
+                nodes = [self._node_ids[name] for name in extract_entities(sentence) if name in self._node_ids]
+                for i, a in enumerate(nodes):
+                    for b in nodes[i + 1:]:
+                        if a != b:
+                            self._unlink(a, b)
+                            self._unlink(b, a)
+                mentioned.update(nodes)
+            for node in mentioned:
+                self._postings[node] = array("I", (d for d in self._postings[node] if d != doc))
+            return len(mentioned)
+
+    def _unlink(self, a: int, b: int) -> None:
+        weight = self._adjacency[a].get(b, 0) - 1
+        if weight > 0:
+            self._adjacency[a][b] = weight
+        else:
+            self._adjacency[a].pop(b, None)
+
+    def seeds(self, query: str) -> Dict[int, float]:
+        """
+        Graph nodes named in a query. Full-name matches score 1; a single name
+        word shared by several entities splits its score between them.
+        """
+        tokens = QUERY_TOKEN_RE.findall(query.lower().replace("'s ", " "))
+        found: Dict[int, float] = {}
+        for n in (3, 2, 1):
+            for i in range(len(tokens) - n + 1):
+                phrase = " ".join(tokens[i:i + n])
+                if n == 1 and phrase in STOPWORDS:
+                    continue
+                nodes = self._aliases.get(phrase)
+                if not nodes:
+                    continue
+                weight = 1.0 / len(nodes)
+                for node in nodes:
+                    found[node] = max(found.get(node, 0.0), weight)
+        return found
+
+    def walk(self, query: str) -> Dict[int, float]:
+        """
+        Bounded breadth-first walk from the query's entities.
+
+        Returns:
+            Dict[int, float]: Reached node -> score (seed score decayed per hop and
+            split across a node's edges by weight)
+        """
+        with self._lock:
+            scores = self.seeds(query)
+            frontier = dict(scores)
+            for _ in range(self.max_hops):
+                if not frontier or len(scores) >= self.max_nodes:
+                    break
+                reached: Dict[int, float] = defaultdict(float)
+                for node, score in frontier.items():
+                    edges = self._adjacency[node]
+                    total = sum(edges.values())
+                    strongest = sorted(edges.items(), key=lambda item: item[1], reverse=True)[:self.fanout]
+                    for neighbour, weight in strongest:
+                        if neighbour not in scores:
+                            reached[neighbour] += score * self.decay * weight / total
+                frontier = {}
+                for neighbour, score in sorted(reached.items(), key=lambda item: item[1], reverse=True):
+                    if len(scores) >= self.max_nodes:
+                        break
+                    scores[neighbour] = score
+                    frontier[neighbour] = score
+            return scores
+
+    def search(self, query: str, k: int = 6) -> List[Tuple[str, float]]:
+        """
+        Rank chunks by the walk scores of the entities they mention.
+        Chunks linking several reached entities rank above single mentions.
+
+        Args:
+            query: User query
+            k: Number of chunks returned
+
+        Returns:
+            List[Tuple[str, float]]: (doc_key, score), best first
+        """
+        scores = self.walk(query)
+        doc_scores: Dict[int, float] = defaultdict(float)
+        with self._lock:
+            for node, score in scores.items():
+                for doc in self._postings[node]:
+                    doc_scores[doc] += score
+            ranked = sorted(doc_scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self._doc_keys[doc], score) for doc, score in ranked]
+
+    def neighbours(self, name: str) -> List[Tuple[str, int]]:
+        """Entities linked to name, strongest first."""
+        with self._lock:
+            node = self._node_ids.get(name)
+            if node is None:
+                return []
+            edges = sorted(self._adjacency[node].items(), key=lambda item: item[1], reverse=True)
+            return [(self._names[neighbour], weight) for neighbour, weight in edges]
+
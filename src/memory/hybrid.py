@@ -0,0 +1,133 @@
+"""
+Hybrid Memory Retriever
+Fuses BM25, vector search and (optionally) entity-graph walks with
+reciprocal-rank fusion; decisive lexical hits skip the query embedding entirely
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .bm25 import BM25Index
+from .embedding_cache import content_hash
+from .graph import MemoryGraph
+
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Merge ranked id lists: score(d) = sum over lists of 1 / (k + rank).
+
+    Args:
+        rankings: Ranked lists of ids, best first
+        k: RRF damping constant
+
+    Returns:
+        List[Tuple[str, float]]: (id, fused score), best first
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def document_key(document: Any) -> str:
+    return content_hash(document.page_content, "")
+
+
+class HybridRetriever:
+    """
+    Retrieves memory chunks from a BM25 index and a vector store.
+
+    When the best lexical hit contains every query term and clearly outscores
+    the runner-up, it is returned without calling the embedding API. With a
+    MemoryGraph, chunks reached by a multi-hop entity walk join the fusion too.
+    """
+
+    def __init__(
+        self,
+        vector_store: Any,
+        documents: Iterable[Any],
+        k: int = 3,
+        decisive_ratio: float = 1.5,
+        rrf_k: int = 60,
+        graph: Optional[MemoryGraph] = None,
+    ):
+        """
+        Args:
+            vector_store: Store with similarity_search(query, k)
+            documents: Chunks indexed in the vector store
+            k: Number of chunks returned
+            decisive_ratio: Top/second BM25 score ratio that makes a lexical hit decisive
+            rrf_k: Reciprocal-rank fusion constant
+            graph: Entity graph kept in step with the indexed chunks
+        """
+        self.vector_store = vector_store
+        self.k = k
+        self.decisive_ratio = decisive_ratio
+        self.rrf_k = rrf_k
+        self.bm25 = BM25Index()
+        self.graph = graph
+        self._documents: Dict[str, Any] = {}
+        self.stats = {"lexical_only": 0, "hybrid": 0, "graph": 0}
+        self.add_documents(documents)
+
+    def add_documents(self, documents: Iterable[Any]) -> None:
+        for document in documents:
+            key = document_key(document)
+            self._documents[key] = document
+            self.bm25.add(key, document.page_content)
+            if self.graph is not None:
+                self.graph.add(key, document.page_content)
+
+    def remove_documents(self, documents: Iterable[Any]) -> None:
+        for document in documents:
+            key = document_key(document)
+            self._documents.pop(key, None)
+            self.bm25.remove(key)
+            if self.graph is not None:
+                self.graph.remove(key, document.page_content)
+
+    def _is_decisive(self, query: str, lexical: List[Tuple[str, float]]) -> bool:
+        if not lexical or self.bm25.coverage(lexical[0][0], query) < 1.0:
+            return False
+        if len(lexical) == 1:
+            return True
+        return lexical[0][1] >= self.decisive_ratio * lexical[1][1]
+
+    def needs_embedding(self, query: str) -> bool:
+        """Whether invoke() would run a vector search (and so embed the query)."""
+        return not self._is_decisive(query, self.bm25.search(query, k=self.k * 2))
+
+    def invoke(self, query: str) -> List[Any]:
+        """
+        Args:
+            query: User query
+
+        Returns:
+            List[Any]: Up to k documents, best first
+        """
+        lexical = self.bm25.search(query, k=self.k * 2)
+        related = [doc_id for doc_id, _ in self.graph.search(query, k=self.k * 2)] if self.graph else []
+        if related:
+            self.stats["graph"] += 1
+
+        if self._is_decisive(query, lexical):
+            self.stats["lexical_only"] += 1
+            if not related:
+                return [self._documents[doc_id] for doc_id, _ in lexical[:self.k]]
+            fused = reciprocal_rank_fusion([[doc_id for doc_id, _ in lexical], related], k=self.rrf_k)
+            return [self._documents[doc_id] for doc_id, _ in fused[:self.k]]
+
+        self.stats["hybrid"] += 1
+        vector_hits = self.vector_store.similarity_search(query, k=self.k * 2)
+        vector_ranking = []
+        for document in vector_hits:
+            key = document_key(document)
+            self._documents.setdefault(key, document)
+            vector_ranking.append(key)
+
+        fused = reciprocal_rank_fusion([[doc_id for doc_id, _ in lexical], vector_ranking, related], k=self.rrf_k)
+        return [self._documents[doc_id] for doc_id, _ in fused[:self.k]]
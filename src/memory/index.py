@@ -0,0 +1,313 @@
+"""
+Shared Memory Index
+Builds the RAG memory index once per process and shares it across chat sessions
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ReadWriteLock:
+    """
+    Lock that admits many concurrent readers or a single writer.
+    Waiting writers take priority so a rebuild is not starved by chat traffic.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class MemoryIndex:
+    """
+    Process-wide RAG index over Maya's long-term memory.
+
+    The documents are loaded, embedded and wrapped in a retriever the first time
+    a query needs them; every chat session then reads from the same index.
+    Retrieved chunks are trimmed by an optional in-process compressor.
+    """
+
+    def __init__(
+        self,
+        load_documents: Callable[[], List[Any]],
+        build_vector_store: Callable[[List[Any]], Any],
+        build_retriever: Callable[[Any, List[Any]], Any],
+        split_text: Optional[Callable[[str, Dict[str, Any]], List[Any]]] = None,
+        add_documents: Optional[Callable[[Any, List[Any]], None]] = None,
+        compressor: Optional[Any] = None,
+        remove_documents: Optional[Callable[[Any, List[Any]], None]] = None,
+    ):
+        """
+        Args:
+            load_documents: Returns the split memory documents
+            build_vector_store: Embeds documents into a vector store
+            build_retriever: Builds a retriever over the vector store and its documents
+            split_text: Chunks newly appended text (with metadata) into documents
+            add_documents: Upserts documents into an existing vector store
+            compressor: Object with compress_documents(documents, query), or None
+            remove_documents: Deletes documents from an existing vector store
+        """
+        self._load_documents = load_documents
+        self._build_vector_store = build_vector_store
+        self._build_retriever = build_retriever
+        self._split_text = split_text
+        self._add_documents = add_documents
+        self._remove_documents = remove_documents
+        self.compressor = compressor
+        self._lock = ReadWriteLock()
+        self._ingest_lock = threading.Lock()
+        # (op, text, metadata) changes that arrive while a build is loading/embedding
+        # the corpus; None when no build runs
+        self._pending: Optional[List[Any]] = None
+        self._pending_lock = threading.Lock()
+        self._vector_store = None
+        self._retriever = None
+        self._listeners: List[Callable[[int], None]] = []
+        self.version = 0
+
+    @property
+    def is_built(self) -> bool:
+        return self._retriever is not None
+
+    def _build(self) -> None:
+        with self._pending_lock:
+            self._pending = []
+        try:
+            documents = self._load_documents()
+            vector_store = self._build_vector_store(documents)
+            retriever = self._build_retriever(vector_store, documents)
+            replayed = self._replay_pending(vector_store, retriever)
+        finally:
+            with self._pending_lock:
+                self._pending = None
+        self._bump_version()
+        logger.info(f"Memory index built: {len(documents)} chunks (+{replayed} replayed), version={self.version}")
+
+    def _replay_pending(self, vector_store: Any, retriever: Any) -> int:
+        """
+        Apply memory appended or deleted since the build loaded the corpus, then
+        swap the new index in. Replays are idempotent (chunks are keyed by content), so text
+        the load already saw is harmless.
+        """
+        replayed = 0
+        while True:
+            with self._pending_lock:
+                pending = self._pending
+                if not pending:
+                    # Swap while holding the pending lock: an ingest either queued
+                    # above or finds the new index in place
+                    self._vector_store = vector_store
+                    self._retriever = retriever
+                    return replayed
+                self._pending = []
+            for op, text, metadata in pending:
+                documents = self._split_text(text, dict(metadata or {}))
+                store_change, local_change = self._change(op)
+                store_change(vector_store, documents)
+                if hasattr(retriever, local_change):
+                    getattr(retriever, local_change)(documents)
+                replayed += len(documents)
+
+    def add_listener(self, callback: Callable[[int], None]) -> None:
+        """Register a callback invoked with the new version whenever the memory corpus changes."""
+        self._listeners.append(callback)
+
+    def _bump_version(self) -> None:
+        self.version += 1
+        for callback in self._listeners:
+            try:
+                callback(self.version)
+            except Exception as e:
+                logger.warning(f"Memory index listener failed: {e}")
+
+    def _ensure_built(self) -> Any:
+        """The live retriever, building the index first if there is none."""
+        retriever = self._retriever
+        if retriever is not None:
+            return retriever
+        with self._lock.write():
+            # Another thread may have finished the build while we waited
+            if self._retriever is None:
+                self._build()
+            return self._retriever
+
+    def warm(self) -> None:
+        """Build the index ahead of the first query; safe to call from a background thread."""
+        try:
+            self._ensure_built()
+        except Exception as e:
+            logger.error(f"Failed to warm memory index: {e}")
+
+    def retrieve(self, query: str) -> List[Any]:
+        """
+        Retrieve memory chunks relevant to a query.
+
+        Args:
+            query: User query
+
+        Returns:
+            List[Any]: Retrieved documents, compressed if a compressor is set
+        """
+        # Keep our own reference: invalidate() may drop self._retriever before the read lock is taken
+        retriever = self._ensure_built()
+        with self._lock.read():
+            documents = retriever.invoke(query)
+        if self.compressor is not None and documents:
+            documents = self.compressor.compress_documents(documents, query)
+        return documents
+
+    def needs_query_embedding(self, query: str) -> bool:
+        """
+        Whether retrieval for this query calls the embedding API. False when the
+        retriever answers it locally (a decisive lexical hit).
+        """
+        retriever = self._ensure_built()
+        check = getattr(retriever, "needs_embedding", None)
+        if check is None:
+            return True
+        with self._lock.read():
+            return check(query)
+
+    def retrieve_context(self, query: str) -> str:
+        """Relevant memory for a query, joined into a single context string."""
+        return "\n\n".join(document.page_content for document in self.retrieve(query))
+
+    def ingest(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Chunk, embed and upsert newly appended memory into the live index.
+        The text must already be persisted; if no index is built yet the next
+        build picks it up from disk instead, and a build already in progress
+        replays it before its index goes live.
+
+        Args:
+            text: Newly appended memory text
+            metadata: Metadata attached to every chunk
+
+        Returns:
+            int: Number of chunks ingested
+        """
+        if not text.strip():
+            return 0
+        try:
+            return self._ingest(text, metadata)
+        finally:
+            # The corpus changed on disk whether or not the live index took the text
+            self._bump_version()
+
+    def _ingest(self, text: str, metadata: Optional[Dict[str, Any]]) -> int:
+        if self._split_text is None or self._add_documents is None:
+            return 0
+        ingested = self._apply("add", text, metadata)
+        if ingested:
+            logger.info(f"Ingested {ingested} memory chunks")
+        return ingested
+
+    def forget(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Remove a deleted memory entry's chunks from the live index (vector store,
+        BM25 postings and entity graph) instead of rebuilding it. The entry must
+        already be deleted from disk. Chunks are keyed by content, so callers
+        must not forget text another live entry still contains.
+
+        Args:
+            text: Text of the deleted entry
+            metadata: Metadata its chunks were indexed with
+
+        Returns:
+            int: Number of chunks removed
+        """
+        if not text.strip():
+            return 0
+        if self._split_text is None or self._remove_documents is None:
+            # No incremental removal wired up: rebuild from disk on the next query
+            self.invalidate()
+            return 0
+        try:
+            removed = self._apply("remove", text, metadata)
+            if removed:
+                logger.info(f"Removed {removed} memory chunks")
+            return removed
+        finally:
+            self._bump_version()
+
+    def _change(self, op: str) -> Tuple[Callable[[Any, List[Any]], None], str]:
+        """Vector-store callable and retriever method name for an "add" or "remove"."""
+        if op == "add":
+            return self._add_documents, "add_documents"
+        return self._remove_documents, "remove_documents"
+
+    def _apply(self, op: str, text: str, metadata: Optional[Dict[str, Any]]) -> int:
+        with self._pending_lock:
+            if self._pending is not None:
+                # A build is running and may have loaded the corpus before this
+                # change; it replays it before swapping the new index in
+                self._pending.append((op, text, metadata))
+                return 0
+
+        store_change, local_change = self._change(op)
+        with self._ingest_lock:
+            if self._vector_store is None:
+                return 0
+            documents = self._split_text(text, dict(metadata or {}))
+            try:
+                # The vector store synchronizes its own writes; queries keep running while it embeds
+                with self._lock.read():
+                    if self._vector_store is None:
+                        return 0
+                    store_change(self._vector_store, documents)
+                # Local (lexical/graph) indexes are plain dicts that readers iterate: update them exclusively
+                with self._lock.write():
+                    if hasattr(self._retriever, local_change):
+                        getattr(self._retriever, local_change)(documents)
+            except Exception as e:
+                logger.error(f"Incremental index update ({op}) failed, falling back to a rebuild: {e}")
+                self.invalidate()
+                return 0
+        return len(documents)
+
+    def rebuild(self) -> None:
+        """Reload and re-embed the memory documents, replacing the live index."""
+        with self._lock.write():
+            self._build()
+
+    def invalidate(self) -> None:
+        """Drop the live index so the next query rebuilds it from the memory file."""
+        with self._lock.write():
+            self._vector_store = None
+            self._retriever = None
+        self._bump_version()
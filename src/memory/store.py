@@ -0,0 +1,434 @@
+"""
+Segmented Memory Store
+Long-term memory as an append-only log split into fixed-size segments, indexed
+by SQLite (FTS5) with entry type, timestamp and source. Recent reads, single
+deletes and keyword lookups go through the index instead of re-reading a flat file.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from .chunking import split_memory_entries
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{6})\.log$")
+FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    source TEXT,
+    text TEXT NOT NULL,
+    segment INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_type ON entries(type, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(text, content='entries', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+@dataclass
+class MemoryEntry:
+    id: int
+    type: str
+    timestamp: float
+    source: Optional[str]
+    text: str
+
+
+class MemoryStore:
+    """
+    Append-only segmented log with a SQLite index.
+
+    The log is the source of truth: every append, delete and clear is written to
+    the active segment before the index is updated, and the index can be rebuilt
+    by replaying the segments. Deleted entries stay in old segments as garbage
+    until compaction rewrites the sealed segments with only live entries.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = 1 << 20,
+        compact_min_garbage_bytes: int = 256 << 10,
+        compact_garbage_ratio: float = 0.5,
+        fsync: bool = False,
+    ):
+        """
+        Args:
+            directory: Folder holding the segments and index.db
+            segment_max_bytes: Size at which the active segment is sealed and a new one started
+            compact_min_garbage_bytes: Dead bytes required before background compaction runs
+            compact_garbage_ratio: Dead share of sealed segments required before compaction runs
+            fsync: Flush every log write to disk before returning
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_min_garbage_bytes = compact_min_garbage_bytes
+        self.compact_garbage_ratio = compact_garbage_ratio
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._compacting = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        segments = self._segments()
+        self._active = segments[-1] if segments else 1
+        self._file = open(self._segment_path(self._active), "ab")
+        if self._meta("log_position") != self._log_position():
+            # The log has records the index never committed (first open or a crash)
+            self._reindex()
+
+    # Segments
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"segment-{number:06d}.log")
+
+    def _segments(self) -> List[int]:
+        numbers = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def _log_position(self) -> str:
+        return f"{self._active}:{self._file.tell()}"
+
+    def _roll(self) -> None:
+        self._file.close()
+        self._active += 1
+        self._file = open(self._segment_path(self._active), "ab")
+
+    def _write_record(self, record: Dict[str, Any]) -> None:
+        """
+        Append one record to the active segment, rolling to a new segment when full.
+        The log position is recorded in the caller's index transaction, so a record
+        whose index update never committed is detected and replayed on the next open.
+        """
+        if self._file.tell() >= self.segment_max_bytes:
+            self._roll()
+        self._file.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._set_meta("log_position", self._log_position())
+
+    def _read_segment(self, number: int) -> Iterator[Dict[str, Any]]:
+        valid_bytes = 0
+        with open(self._segment_path(number), "rb") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Corrupt record in memory segment {number}; ignoring the rest of it")
+                    break
+                valid_bytes += len(line)
+                yield record
+        if number == self._active and valid_bytes < self._file.tell():
+            # Torn write from a crash: cut it off so later appends stay readable
+            self._file.truncate(valid_bytes)
+
+    # Metadata
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: Any) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _add_garbage(self, nbytes: int) -> None:
+        self._set_meta("garbage_bytes", int(self._meta("garbage_bytes") or 0) + nbytes)
+
+    # Writes
+
+    def append(self, text: str, entry_type: str = "remember", source: Optional[str] = None,
+               timestamp: Optional[float] = None) -> int:
+        """
+        Persist a memory entry.
+
+        Args:
+            text: Entry text
+            entry_type: "remember", "section", "chat_summary", "mcp_notion", ...
+            source: Where the entry came from (session id, tool name)
+            timestamp: Unix time of the entry; defaults to now
+
+        Returns:
+            int: Entry id
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            entry_id = self._put(text, entry_type, source, timestamp)
+            self._conn.commit()
+        return entry_id
+
+    def _put(self, text: str, entry_type: str, source: Optional[str], timestamp: float) -> int:
+        # Under self._lock; the caller commits
+        entry_id = int(self._meta("next_id") or 1)
+        self._write_record({"op": "put", "id": entry_id, "type": entry_type, "ts": timestamp,
+                            "source": source, "text": text})
+        self._conn.execute(
+            "INSERT INTO entries (id, type, timestamp, source, text, segment) VALUES (?, ?, ?, ?, ?, ?)",
+            (entry_id, entry_type, timestamp, source, text, self._active),
+        )
+        self._set_meta("next_id", entry_id + 1)
+        return entry_id
+
+    def delete(self, entry_id: int) -> bool:
+        """Delete one entry. Returns False if it does not exist."""
+        with self._lock:
+            row = self._conn.execute("SELECT length(text) FROM entries WHERE id = ?", (entry_id,)).fetchone()
+            if row is None:
+                return False
+            self._write_record({"op": "del", "id": entry_id})
+            self._conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+            self._add_garbage(row[0])
+            self._conn.commit()
+        self.maybe_compact()
+        return True
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock:
+            live = self._conn.execute("SELECT COALESCE(SUM(length(text)), 0) FROM entries").fetchone()[0]
+            self._write_record({"op": "clear"})
+            self._conn.execute("DELETE FROM entries")
+            self._add_garbage(live)
+            self._conn.commit()
+        self.maybe_compact()
+
+    # Reads
+
+    @staticmethod
+    def _entry(row: tuple) -> MemoryEntry:
+        return MemoryEntry(id=row[0], type=row[1], timestamp=row[2], source=row[3], text=row[4])
+
+    def get(self, entry_id: int) -> Optional[MemoryEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, type, timestamp, source, text FROM entries WHERE id = ?", (entry_id,)
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def has_text(self, text: str) -> bool:
+        """Whether a live entry has exactly this text."""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM entries WHERE text = ? LIMIT 1", (text,)).fetchone() is not None
+
+    def recent(self, limit: int = 20, entry_type: Optional[str] = None) -> List[MemoryEntry]:
+        """Newest entries first, optionally of one type."""
+        query = "SELECT id, type, timestamp, source, text FROM entries"
+        params: List[Any] = []
+        if entry_type:
+            query += " WHERE type = ?"
+            params.append(entry_type)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def search(self, query: str, limit: int = 10, entry_type: Optional[str] = None) -> List[MemoryEntry]:
+        """
+        Keyword lookup through the FTS5 index, best match first.
+
+        Args:
+            query: Free text; any of its words may match
+            limit: Max entries returned
+            entry_type: Restrict to one entry type
+
+        Returns:
+            List[MemoryEntry]: Matching entries ranked by BM25
+        """
+        terms = FTS_TOKEN_RE.findall(query)
+        if not terms:
+            return []
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        sql = ("SELECT e.id, e.type, e.timestamp, e.source, e.text FROM entries_fts "
+               "JOIN entries e ON e.id = entries_fts.rowid WHERE entries_fts MATCH ?")
+        params: List[Any] = [match]
+        if entry_type:
+            sql += " AND e.type = ?"
+            params.append(entry_type)
+        sql += " ORDER BY bm25(entries_fts) LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def entries(self) -> List[MemoryEntry]:
+        """Every live entry, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, type, timestamp, source, text FROM entries ORDER BY id"
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+                "segments": len(self._segments()),
+                "active_segment": self._active,
+                "garbage_bytes": int(self._meta("garbage_bytes") or 0),
+            }
+
+    # Recovery and compaction
+
+    def _reindex(self) -> None:
+        """Rebuild the SQLite index by replaying every segment."""
+        logger.info(f"Rebuilding memory index from segments in {self.directory}")
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            next_id = 1
+            for number in self._segments():
+                for record in self._read_segment(number):
+                    op = record.get("op")
+                    if op in ("clear", "compacted"):
+                        # A compacted segment holds every entry live at compaction time
+                        self._conn.execute("DELETE FROM entries")
+                    elif op == "put":
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO entries (id, type, timestamp, source, text, segment) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (record["id"], record["type"], record["ts"], record.get("source"), record["text"], number),
+                        )
+                        next_id = max(next_id, record["id"] + 1)
+                    elif op == "del":
+                        self._conn.execute("DELETE FROM entries WHERE id = ?", (record["id"],))
+            self._set_meta("next_id", next_id)
+            self._set_meta("log_position", self._log_position())
+            self._conn.commit()
+
+    def maybe_compact(self) -> bool:
+        """Start background compaction if enough of the sealed segments is garbage."""
+        if self._compacting.locked():
+            return False
+        with self._lock:
+            garbage = int(self._meta("garbage_bytes") or 0)
+            if garbage < self.compact_min_garbage_bytes:
+                return False
+            sealed_bytes = sum(
+                os.path.getsize(self._segment_path(n)) for n in self._segments() if n != self._active
+            )
+        if not sealed_bytes or garbage < sealed_bytes * self.compact_garbage_ratio:
+            return False
+        threading.Thread(target=self.compact, daemon=True).start()
+        return True
+
+    def compact(self) -> int:
+        """
+        Rewrite the sealed segments as one segment holding only live entries.
+
+        The active segment is sealed first, so appends continue in a fresh segment
+        while the rewrite runs. The compacted file replaces the newest sealed segment
+        atomically and starts with a "compacted" marker, so a crash before the older
+        segments are removed still replays to the same state.
+
+        Returns:
+            int: Number of segments removed
+        """
+        with self._compacting:
+            with self._lock:
+                # Seal the active segment so everything up to it can be rewritten
+                self._roll()
+                self._set_meta("log_position", self._log_position())
+                self._conn.commit()
+                sealed = [n for n in self._segments() if n < self._active]
+                if not sealed:
+                    return 0
+                target = sealed[-1]
+                rows = self._conn.execute(
+                    "SELECT id, type, timestamp, source, text FROM entries WHERE segment <= ? ORDER BY id",
+                    (target,),
+                ).fetchall()
+
+            # Entries in sealed segments are immutable, so the rewrite runs unlocked
+            temp_path = self._segment_path(target) + ".compact"
+            with open(temp_path, "wb") as file:
+                file.write((json.dumps({"op": "compacted", "through": target}) + "\n").encode("utf-8"))
+                for row in rows:
+                    entry = self._entry(row)
+                    record = {"op": "put", "id": entry.id, "type": entry.type, "ts": entry.timestamp,
+                              "source": entry.source, "text": entry.text}
+                    file.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                file.flush()
+                os.fsync(file.fileno())
+
+            with self._lock:
+                os.replace(temp_path, self._segment_path(target))
+                for number in sealed[:-1]:
+                    os.remove(self._segment_path(number))
+                self._conn.execute("UPDATE entries SET segment = ? WHERE segment < ?", (target, target))
+                self._set_meta("garbage_bytes", 0)
+                self._conn.commit()
+
+        logger.info(f"Compacted {len(sealed)} memory segments into segment {target} ({len(rows)} live entries)")
+        return len(sealed) - 1
+
+    # Migration
+
+    def import_text_file(self, path: str) -> int:
+        """
+        One-time import of a legacy flat memory file (data.txt).
+
+        The file is split on entry boundaries, stored in one index transaction, and
+        renamed to <path>.migrated so it is not imported twice. If a crash left the
+        import half done (entries replayed from the log, file not yet renamed), the
+        entries already stored from this file are skipped rather than duplicated.
+
+        Returns:
+            int: Number of entries imported
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as file:
+            text = file.read()
+        source = os.path.basename(path)
+        timestamp = os.path.getmtime(path)
+        imported = 0
+        with self._lock:
+            # Multiset of texts already imported from this file, so genuine repeats in it are kept
+            rows = self._conn.execute("SELECT text FROM entries WHERE source = ?", (source,))
+            stored = Counter(row[0] for row in rows)
+            for entry in split_memory_entries(text):
+                if stored[entry.text]:
+                    stored[entry.text] -= 1
+                    continue
+                self._put(entry.text, entry.metadata["type"], source, timestamp)
+                imported += 1
+            self._conn.commit()
+        os.replace(path, path + ".migrated")
+        logger.info(f"Imported {imported} memory entries from {path}")
+        return imported
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+            self._conn.close()
@@ -0,0 +1,26 @@
+"""
+Memory Text Utilities
+Tokenization and sentence splitting shared by the local retrieval components
+"""
+
+import re
+from typing import List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by do does did for from has have i i'm in is it its "
+    "me my of on or so that the their them there this to was we were what when where "
+    "which who will with you your about can could would should any some".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text on sentence punctuation and line breaks, dropping empty pieces."""
+    return [sentence.strip() for sentence in _SENTENCE_RE.split(text) if sentence.strip()]
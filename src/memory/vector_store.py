@@ -0,0 +1,97 @@
+"""
+Persistent Vector Store Sync
+Keeps an on-disk vector store in step with the memory chunks using content-hash ids
+"""
+
+import logging
+from typing import Any, Dict, List
+
+from .embedding_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_ids(documents: List[Any], model_name: str) -> Dict[str, Any]:
+    """
+    Map content-hash ids to documents, dropping exact duplicate chunks.
+
+    Args:
+        documents: LangChain documents (anything with page_content)
+        model_name: Embedding model identifier
+
+    Returns:
+        Dict[str, Any]: id -> document, in input order
+    """
+    by_id: Dict[str, Any] = {}
+    for document in documents:
+        by_id.setdefault(content_hash(document.page_content, model_name), document)
+    return by_id
+
+
+def sync_vector_store(vector_store: Any, documents: List[Any], model_name: str) -> Dict[str, int]:
+    """
+    Make a persisted vector store contain exactly the given chunks.
+    Chunks already stored are left untouched, so only new text is embedded.
+
+    Args:
+        vector_store: Chroma store opened on a persist directory
+        documents: Current memory chunks
+        model_name: Embedding model identifier
+
+    Returns:
+        Dict[str, int]: Counts of added, removed and kept chunks
+    """
+    wanted = chunk_ids(documents, model_name)
+    existing = set(vector_store.get(include=[])["ids"])
+
+    stale = [chunk_id for chunk_id in existing if chunk_id not in wanted]
+    new_ids = [chunk_id for chunk_id in wanted if chunk_id not in existing]
+
+    if stale:
+        vector_store.delete(ids=stale)
+    if new_ids:
+        vector_store.add_documents([wanted[chunk_id] for chunk_id in new_ids], ids=new_ids)
+
+    stats = {"added": len(new_ids), "removed": len(stale), "kept": len(existing) - len(stale)}
+    logger.info(f"Vector store synced: {stats}")
+    return stats
+
+
+def remove_chunks(vector_store: Any, documents: List[Any], model_name: str) -> int:
+    """
+    Delete chunks from a live vector store.
+
+    Args:
+        vector_store: Chroma store
+        documents: Chunks of a deleted memory entry
+        model_name: Embedding model identifier
+
+    Returns:
+        int: Number of chunk ids deleted
+    """
+    ids = list(chunk_ids(documents, model_name))
+    if ids:
+        vector_store.delete(ids=ids)
+    return len(ids)
+
+
+def add_chunks(vector_store: Any, documents: List[Any], model_name: str) -> int:
+    """
+    Upsert chunks into a live vector store, skipping ones it already holds.
+
+    Args:
+        vector_store: Chroma store
+        documents: New chunks
+        model_name: Embedding model identifier
+
+    Returns:
+        int: Number of chunks added
+    """
+    by_id = chunk_ids(documents, model_name)
+    if not by_id:
+        return 0
+    existing = set(vector_store.get(ids=list(by_id), include=[])["ids"])
+    new_ids = [chunk_id for chunk_id in by_id if chunk_id not in existing]
+    if new_ids:
+        vector_store.add_documents([by_id[chunk_id] for chunk_id in new_ids], ids=new_ids)
+    return len(new_ids)
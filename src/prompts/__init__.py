@@ -0,0 +1,8 @@
+"""
+Maya Prompts
+Versioned system prompts and precompiled realtime session payloads
+"""
+
+from .registry import MAYA_SYSTEM, PROMPTS_DIR, Prompt, PromptRegistry, prompt_version
+
+__all__ = ['MAYA_SYSTEM', 'PROMPTS_DIR', 'Prompt', 'PromptRegistry', 'prompt_version']
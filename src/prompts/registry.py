@@ -0,0 +1,133 @@
+"""
+Prompt Registry
+System prompts live as text files next to this module and are loaded once.
+Each prompt carries a content-hash version, and the realtime session payloads
+built from it are serialized once per (model, voice, prompt version), so a
+realtime handshake reuses ready-made bytes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MAYA_SYSTEM = "maya_system"
+
+
+@dataclass(frozen=True)
+class Prompt:
+    name: str
+    text: str
+    version: str
+
+
+def prompt_version(text: str) -> str:
+    """Short content hash, so any edit to a prompt changes its version."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+class PromptRegistry:
+    """
+    Named prompts loaded from <directory>/<name>.txt.
+
+    Prompts are read at construction and on reload(); get() never touches disk.
+    """
+
+    def __init__(self, directory: str = PROMPTS_DIR):
+        """
+        Args:
+            directory: Folder holding the .txt prompt files
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._prompts: Dict[str, Prompt] = {}
+        self._payloads: Dict[Tuple[str, str, str, str], Tuple[Dict[str, Any], bytes]] = {}
+        self.reload()
+
+    def reload(self) -> List[str]:
+        """
+        Re-read the prompt files.
+
+        Returns:
+            List[str]: Names of prompts that were added or changed
+        """
+        prompts: Dict[str, Prompt] = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(".txt"):
+                continue
+            name = filename[:-len(".txt")]
+            with open(os.path.join(self.directory, filename), "r", encoding="utf-8") as f:
+                text = f.read().strip()
+            prompts[name] = Prompt(name=name, text=text, version=prompt_version(text))
+
+        with self._lock:
+            changed = [
+                name for name, prompt in prompts.items()
+                if name not in self._prompts or self._prompts[name].version != prompt.version
+            ]
+            self._prompts = prompts
+            # Payloads are keyed by prompt version, so only current versions are worth keeping
+            current = {(name, prompt.version) for name, prompt in prompts.items()}
+            self._payloads = {key: value for key, value in self._payloads.items() if (key[0], key[1]) in current}
+        if changed:
+            logger.info(f"Loaded prompts: {', '.join(f'{name}@{prompts[name].version}' for name in changed)}")
+        return changed
+
+    def get(self, name: str) -> Prompt:
+        with self._lock:
+            prompt = self._prompts.get(name)
+        if prompt is None:
+            raise KeyError(f"Unknown prompt '{name}'")
+        return prompt
+
+    def text(self, name: str) -> str:
+        return self.get(name).text
+
+    def versions(self) -> Dict[str, str]:
+        with self._lock:
+            return {name: prompt.version for name, prompt in self._prompts.items()}
+
+    def _realtime(self, model: str, voice: str, prompt_name: str) -> Tuple[Dict[str, Any], bytes]:
+        prompt = self.get(prompt_name)
+        key = (prompt_name, prompt.version, model, voice)
+        with self._lock:
+            cached = self._payloads.get(key)
+        if cached is not None:
+            return cached
+
+        session = {
+            "type": "realtime",
+            "model": model,
+            "audio": {"output": {"voice": voice}},
+            "instructions": prompt.text,
+        }
+        cached = (session, json.dumps({"session": session}).encode("utf-8"))
+        with self._lock:
+            self._payloads[key] = cached
+        return cached
+
+    def realtime_session(self, model: str, voice: str = "marin", prompt_name: str = MAYA_SYSTEM) -> Dict[str, Any]:
+        """
+        Default realtime session config for a model and voice.
+
+        The dict is shared between callers: merge overrides into a new dict
+        ({**session, **overrides}) rather than mutating it.
+        """
+        return self._realtime(model, voice, prompt_name)[0]
+
+    def realtime_payload(self, model: str, voice: str = "marin", prompt_name: str = MAYA_SYSTEM) -> bytes:
+        """{"session": realtime_session(...)} serialized to JSON, built once per model, voice and prompt version."""
+        return self._realtime(model, voice, prompt_name)[1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "prompts": {name: prompt.version for name, prompt in self._prompts.items()},
+                "cached_payloads": len(self._payloads),
+            }
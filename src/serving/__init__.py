@@ -0,0 +1,8 @@
+"""
+Maya Serving Package
+Production serving mode and bounded outbound-call concurrency for the Flask backend
+"""
+
+from .outbound import OutboundBusy, OutboundLimiter
+
+__all__ = ['OutboundBusy', 'OutboundLimiter']
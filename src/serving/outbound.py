@@ -0,0 +1,122 @@
+"""
+Outbound Call Limiter
+Per-service bulkheads for blocking calls to Gemini, Exa, Deepgram, OpenAI and Notion.
+A slow upstream can only tie up its own slots; callers beyond capacity wait
+briefly and then fail fast instead of piling up on the request threads.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMITS: Dict[str, int] = {
+    "gemini": 64,
+    "embeddings": 16,
+    "exa": 8,
+    "deepgram": 16,
+    "openai": 32,
+    "notion": 8,
+}
+
+
+class OutboundBusy(Exception):
+    """Raised when a service has no free slot within the acquire timeout."""
+
+    def __init__(self, service: str):
+        super().__init__(f"Too many in-flight requests to {service}; try again shortly")
+        self.service = service
+
+
+class _Bulkhead:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.semaphore = threading.BoundedSemaphore(limit)
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+
+class OutboundLimiter:
+    """
+    Bounds concurrent outbound calls per service.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        default_limit: int = 16,
+        acquire_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            limits: Max concurrent calls per service name
+            default_limit: Limit for services not listed
+            acquire_timeout: Seconds to wait for a slot before raising OutboundBusy
+        """
+        self.default_limit = default_limit
+        self.acquire_timeout = acquire_timeout
+        self._lock = threading.Lock()
+        self._bulkheads: Dict[str, _Bulkhead] = {
+            service: _Bulkhead(limit) for service, limit in (limits or {}).items()
+        }
+
+    def _bulkhead(self, service: str) -> _Bulkhead:
+        with self._lock:
+            if service not in self._bulkheads:
+                self._bulkheads[service] = _Bulkhead(self.default_limit)
+            return self._bulkheads[service]
+
+    @contextmanager
+    def limit(self, service: str):
+        """Hold one of the service's slots for the duration of the block."""
+        bulkhead = self._bulkhead(service)
+        if not bulkhead.semaphore.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                bulkhead.rejected += 1
+            logger.warning(f"Outbound limit reached for {service} ({bulkhead.limit} in flight)")
+            raise OutboundBusy(service)
+        with self._lock:
+            bulkhead.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                bulkhead.in_flight -= 1
+                bulkhead.completed += 1
+            bulkhead.semaphore.release()
+
+    def call(self, service: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) inside the service's bulkhead."""
+        with self.limit(service):
+            return fn(*args, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                service: {
+                    "limit": bulkhead.limit,
+                    "in_flight": bulkhead.in_flight,
+                    "completed": bulkhead.completed,
+                    "rejected": bulkhead.rejected,
+                }
+                for service, bulkhead in self._bulkheads.items()
+            }
+
+
+def limits_from_env(defaults: Dict[str, int] = DEFAULT_LIMITS, prefix: str = "MAYA_OUTBOUND_LIMIT_") -> Dict[str, int]:
+    """
+    Read per-service limits, e.g. MAYA_OUTBOUND_LIMIT_GEMINI=128.
+
+    Returns:
+        Dict[str, int]: Service name -> limit
+    """
+    limits = dict(defaults)
+    for service in defaults:
+        value = os.getenv(prefix + service.upper())
+        if value:
+            limits[service] = int(value)
+    return limits
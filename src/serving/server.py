@@ -0,0 +1,53 @@
+"""
+Serving Modes
+Runs the Flask app under the development server or a production threaded WSGI server
+"""
+
+import logging
+import os
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SERVING_MODES = ("dev", "threaded")
+# Request threads in "threaded" mode unless MAYA_SERVER_THREADS says otherwise
+DEFAULT_THREADS = 128
+
+
+def serve(app: Any, mode: str = "dev", host: str = "127.0.0.1", port: int = 5000, threads: int = DEFAULT_THREADS) -> None:
+    """
+    Run the app in the requested serving mode.
+
+    "dev" is Flask's debug server. "threaded" runs waitress with a large
+    thread pool: the backend's outbound calls are blocking I/O that releases the
+    GIL, so one process can hold as many in-flight LLM requests as it has threads,
+    with per-service caps enforced by OutboundLimiter.
+
+    Args:
+        app: Flask application
+        mode: One of SERVING_MODES
+        host: Bind address
+        port: Bind port
+        threads: Request threads in "threaded" mode
+    """
+    if mode == "threaded":
+        try:
+            from waitress import serve as waitress_serve
+        except ImportError:
+            logger.warning("waitress is not installed (pip install waitress); using the threaded werkzeug server")
+            from werkzeug.serving import run_simple
+            run_simple(host, port, app, threaded=True)
+            return
+
+        logger.info(f"Serving with waitress on {host}:{port} ({threads} threads)")
+        waitress_serve(
+            app,
+            host=host,
+            port=port,
+            threads=threads,
+            connection_limit=max(threads * 2, 100),
+            channel_timeout=int(os.getenv("MAYA_CHANNEL_TIMEOUT", "300")),
+        )
+        return
+
+    app.run(host=host, port=port, debug=True)
@@ -0,0 +1,53 @@
+"""
+Server-Sent Events
+Frames a generator of response text as an SSE stream: one "token" event per
+piece, then "done" with the final payload, or "error" if generation fails
+"""
+
+import itertools
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+from .outbound import OutboundBusy
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data: Any) -> str:
+    """One SSE frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_stream(pieces: Iterable[str], done: Callable[[], Dict[str, Any]]) -> Iterator[str]:
+    """
+    Runs generation up to the first frame before returning, so an OutboundBusy
+    raised before any output reaches the caller while the HTTP status can still
+    be set (503 + Retry-After). Failures after that are sent as an "error" event.
+
+    Args:
+        pieces: Response text as it is generated; empty pieces are skipped
+        done: Payload of the closing "done" event, read after the last piece
+
+    Returns:
+        Iterator[str]: SSE frames
+    """
+    events = _events(pieces, done)
+    first = next(events)
+    return itertools.chain([first], events)
+
+
+def _events(pieces: Iterable[str], done: Callable[[], Dict[str, Any]]) -> Iterator[str]:
+    started = False
+    try:
+        for piece in pieces:
+            if piece:
+                started = True
+                yield sse_event("token", {"text": piece})
+        yield sse_event("done", done())
+    except Exception as e:
+        if isinstance(e, OutboundBusy) and not started:
+            raise
+        # Headers are already sent, so the failure is reported in-band
+        logger.error(f"Error while streaming response: {e}")
+        yield sse_event("error", {"error": str(e)})
@@ -0,0 +1,15 @@
+"""
+Maya Chat Sessions
+Per-session conversation state kept within a token budget and shareable across workers
+"""
+
+from .context import ConversationContext, Turn, estimate_tokens
+from .backends import (
+    RedisSessionBackend, SessionBackend, SessionConflict, SQLiteSessionBackend, create_session_backend,
+)
+from .store import SessionStore
+
+__all__ = [
+    'ConversationContext', 'RedisSessionBackend', 'SessionBackend', 'SessionConflict', 'SessionStore',
+    'SQLiteSessionBackend', 'Turn', 'create_session_backend', 'estimate_tokens',
+]
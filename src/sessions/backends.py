@@ -0,0 +1,269 @@
+"""
+Session Backends
+Out-of-process storage for serialized chat sessions. Every save bumps a
+per-session version, so workers sharing a backend can tell when their cached
+copy of a session is stale, and a save can be made conditional on the version
+the caller last saw (compare-and-swap).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SESSION_BACKENDS = ("sqlite", "redis")
+
+
+class SessionConflict(Exception):
+    """Raised by a conditional save when the stored version is not the expected one."""
+
+    def __init__(self, session_id: str, expected_version: int):
+        super().__init__(f"Session {session_id} changed since version {expected_version}")
+        self.session_id = session_id
+        self.expected_version = expected_version
+
+
+class SessionBackend(ABC):
+    """Abstract interface shared by the session backends."""
+
+    @abstractmethod
+    def save(self, session_id: str, state: Dict[str, Any], expected_version: Optional[int] = None) -> int:
+        """
+        Store state and return the session's new version.
+
+        Args:
+            session_id: Session to write
+            state: Serialized session
+            expected_version: Only write if the stored version is still this one
+                (0: only if the session does not exist yet); None writes unconditionally
+
+        Raises:
+            SessionConflict: The stored version is not expected_version
+        """
+        pass
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """(state, version), or None if the session is unknown."""
+        pass
+
+    @abstractmethod
+    def version(self, session_id: str) -> Optional[int]:
+        """Current version without reading the state, or None if unknown."""
+        pass
+
+    def exists(self, session_id: str) -> bool:
+        return self.version(session_id) is not None
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Forget the session."""
+        pass
+
+    def purge(self, older_than: float) -> int:
+        """Drop sessions last saved before the given Unix time (where the backend does not expire them itself)."""
+        return 0
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Stored sessions."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    Sessions in one SQLite table. WAL mode lets several worker processes on the
+    same host read concurrently while one writes.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=busy_timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, state TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, version INTEGER NOT NULL DEFAULT 1)"
+        )
+        self._conn.commit()
+
+    def save(self, session_id: str, state: Dict[str, Any], expected_version: Optional[int] = None) -> int:
+        params = (session_id, json.dumps(state), time.time())
+        with self._lock:
+            if expected_version is None:
+                row = self._conn.execute(
+                    "INSERT INTO sessions (session_id, state, updated_at, version) VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, "
+                    "updated_at = excluded.updated_at, version = sessions.version + 1 "
+                    "RETURNING version",
+                    params,
+                ).fetchone()
+            elif expected_version == 0:
+                row = self._conn.execute(
+                    "INSERT INTO sessions (session_id, state, updated_at, version) VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT(session_id) DO NOTHING RETURNING version",
+                    params,
+                ).fetchone()
+            else:
+                # A single statement, so the check and the write are atomic across processes too
+                row = self._conn.execute(
+                    "UPDATE sessions SET state = ?, updated_at = ?, version = version + 1 "
+                    "WHERE session_id = ? AND version = ? RETURNING version",
+                    (params[1], params[2], session_id, expected_version),
+                ).fetchone()
+            self._conn.commit()
+        if row is None:
+            raise SessionConflict(session_id, expected_version)
+        return row[0]
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def version(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def purge(self, older_than: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (older_than,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisSessionBackend(SessionBackend):
+    """
+    Sessions in a Redis-protocol store, shared across hosts. Each session is a
+    hash {state, version} that expires after `ttl` seconds without a save.
+    """
+
+    # Conditional save, run atomically server-side; -1 signals a version mismatch
+    SAVE_IF_VERSION = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'version') or '0')
+if current ~= tonumber(ARGV[1]) then
+    return -1
+end
+local version = redis.call('HINCRBY', KEYS[1], 'version', 1)
+redis.call('HSET', KEYS[1], 'state', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return version
+"""
+
+    def __init__(self, client: Any, prefix: str = "maya:session:", ttl: float = 30 * 86400.0):
+        """
+        Args:
+            client: redis.Redis-compatible client (hget/hmget/hincrby/hset/expire/delete/scan_iter)
+            prefix: Key prefix for session hashes
+            ttl: Seconds a session survives without being saved
+        """
+        self.client = client
+        self.prefix = prefix
+        self.ttl = int(ttl)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
+
+    def save(self, session_id: str, state: Dict[str, Any], expected_version: Optional[int] = None) -> int:
+        key = self._key(session_id)
+        payload = json.dumps(state)
+        if expected_version is not None:
+            return self._save_if_version(session_id, payload, expected_version)
+        if hasattr(self.client, "pipeline"):
+            pipe = self.client.pipeline()
+            pipe.hincrby(key, "version", 1)
+            pipe.hset(key, "state", payload)
+            pipe.expire(key, self.ttl)
+            version = pipe.execute()[0]
+        else:
+            version = self.client.hincrby(key, "version", 1)
+            self.client.hset(key, "state", payload)
+            self.client.expire(key, self.ttl)
+        return int(version)
+
+    def _save_if_version(self, session_id: str, payload: str, expected_version: int) -> int:
+        key = self._key(session_id)
+        if hasattr(self.client, "eval"):
+            version = int(self.client.eval(self.SAVE_IF_VERSION, 1, key, expected_version, payload, self.ttl))
+        elif (self.version(session_id) or 0) == expected_version:
+            # Clients without scripting (test doubles): check-then-write, not atomic
+            version = self.client.hincrby(key, "version", 1)
+            self.client.hset(key, "state", payload)
+            self.client.expire(key, self.ttl)
+        else:
+            version = -1
+        if version < 0:
+            raise SessionConflict(session_id, expected_version)
+        return int(version)
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        state, version = self.client.hmget(self._key(session_id), ["state", "version"])
+        if state is None:
+            return None
+        return json.loads(state), int(version)
+
+    def version(self, session_id: str) -> Optional[int]:
+        version = self.client.hget(self._key(session_id), "version")
+        return int(version) if version is not None else None
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self._key(session_id))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*"))
+
+    def close(self) -> None:
+        close = getattr(self.client, "close", None)
+        if close:
+            close()
+
+
+def create_session_backend(name: str, sqlite_path: Optional[str] = None, redis_url: Optional[str] = None) -> SessionBackend:
+    """
+    Build the configured backend.
+
+    Args:
+        name: One of SESSION_BACKENDS
+        sqlite_path: Database file for "sqlite"
+        redis_url: Connection URL for "redis", e.g. redis://localhost:6379/0
+
+    Returns:
+        SessionBackend: Ready backend
+    """
+    if name == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis session backend needs the redis package (pip install redis)") from e
+        return RedisSessionBackend(redis.Redis.from_url(redis_url or "redis://localhost:6379/0"))
+    if name == "sqlite":
+        return SQLiteSessionBackend(sqlite_path)
+    raise ValueError(f"Unknown session backend '{name}' (choose from {', '.join(SESSION_BACKENDS)})")
@@ -0,0 +1,314 @@
+"""
+Conversation Context
+Token-budgeted chat context: recent turns are kept verbatim and older turns are
+folded into a rolling summary, so the prompt sent per turn stays flat however
+long a session runs.
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.memory.text import split_sentences
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "Summary of our earlier conversation:"
+SUMMARY_ACK = "Got it, I'll keep that in mind."
+
+Summarizer = Callable[[str, Sequence["Turn"], int], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for Gemini's tokenizer)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    """Cut text to roughly max_tokens, keeping its start (or end)."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return "..." + text[-max_chars:] if keep_end else text[:max_chars] + "..."
+
+
+def fit_recent(texts: Sequence[str], max_tokens: int, count_tokens: Callable[[str], int] = estimate_tokens) -> List[str]:
+    """
+    Longest suffix of texts whose combined size fits the budget.
+
+    Args:
+        texts: Items oldest first
+        max_tokens: Token budget
+        count_tokens: Token estimator
+
+    Returns:
+        List[str]: The most recent items that fit, oldest first
+    """
+    kept: List[str] = []
+    used = 0
+    for text in reversed(texts):
+        used += count_tokens(text)
+        if used > max_tokens:
+            break
+        kept.append(text)
+    return list(reversed(kept))
+
+
+@dataclass
+class Turn:
+    role: str
+    text: str
+    tokens: int
+    id: int = 0
+
+    def to_content(self) -> Dict[str, Any]:
+        return {"role": self.role, "parts": [{"text": self.text}]}
+
+    def to_message(self) -> Dict[str, Any]:
+        """Display form with the turn id clients use as a history cursor."""
+        return {"id": self.id, "role": self.role, "parts": [{"text": self.text}]}
+
+
+def extractive_summary(previous: str, turns: Sequence[Turn], max_tokens: int) -> str:
+    """
+    Local fallback summarizer: the lead sentence of every folded turn appended
+    to the previous summary, trimmed from the oldest end to fit the budget.
+    """
+    lines = [previous] if previous else []
+    for turn in turns:
+        sentences = split_sentences(turn.text)
+        if sentences:
+            speaker = "User" if turn.role == "user" else "Maya"
+            lines.append(f"{speaker}: {truncate_to_tokens(sentences[0], 60)}")
+    return truncate_to_tokens("\n".join(lines), max_tokens, keep_end=True)
+
+
+class ConversationContext:
+    """
+    Chat context for one session.
+
+    add() only appends; folding old turns into the summary is done by compact(),
+    which the caller runs off the request path once needs_compaction() is true.
+    Until then messages() drops the oldest turns from the prompt, so the budget
+    holds even while a compaction is pending.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 6000,
+        summary_tokens: int = 800,
+        min_recent_turns: int = 4,
+        summarizer: Optional[Summarizer] = None,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+        max_transcript: int = 200,
+    ):
+        """
+        Args:
+            max_tokens: Budget for summary plus verbatim turns
+            summary_tokens: Share of the budget reserved for the rolling summary
+            min_recent_turns: Turns never folded, however large
+            summarizer: (previous_summary, turns, max_tokens) -> new summary
+            count_tokens: Token estimator
+            max_transcript: Turns kept for display (get_chat_history)
+        """
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.min_recent_turns = min_recent_turns
+        self.summarizer = summarizer or extractive_summary
+        self.count_tokens = count_tokens
+        self._lock = threading.Lock()
+        self._compacting = threading.Lock()
+        self._summary = ""
+        self._turns: deque = deque()
+        self._turn_tokens = 0
+        # (turn, pre-serialized JSON) pairs; turn ids are consecutive, so a cursor maps to an offset
+        self._transcript: deque = deque(maxlen=max_transcript)
+        self._next_id = 1
+        self.stats = {"compactions": 0, "folded_turns": 0, "trimmed_prompts": 0}
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @property
+    def verbatim_budget(self) -> int:
+        return self.max_tokens - self.summary_tokens
+
+    def add(self, role: str, text: str) -> Turn:
+        """Record a turn ("user" or "model")."""
+        turn = Turn(role=role, text=text, tokens=self.count_tokens(text))
+        with self._lock:
+            turn.id = self._next_id
+            self._next_id += 1
+            self._turns.append(turn)
+            self._turn_tokens += turn.tokens
+            self._transcript.append((turn, json.dumps(turn.to_message())))
+        return turn
+
+    def add_exchange(self, user_text: str, model_text: str) -> None:
+        self.add("user", user_text)
+        self.add("model", model_text)
+
+    def needs_compaction(self) -> bool:
+        with self._lock:
+            return self._turn_tokens > self.verbatim_budget and len(self._turns) > self.min_recent_turns
+
+    def compact(self) -> int:
+        """
+        Fold the oldest turns into the rolling summary until the verbatim turns
+        use at most half their budget, so compactions stay infrequent.
+
+        Returns:
+            int: Number of turns folded (0 if nothing to do or another compaction is running)
+        """
+        if not self._compacting.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                target = self.verbatim_budget // 2
+                remaining = self._turn_tokens
+                folded: List[Turn] = []
+                for turn in self._turns:
+                    if remaining <= target or len(self._turns) - len(folded) <= self.min_recent_turns:
+                        break
+                    folded.append(turn)
+                    remaining -= turn.tokens
+                previous = self._summary
+            if not folded:
+                return 0
+
+            # The summarizer may be a slow LLM call; turns keep arriving meanwhile
+            try:
+                summary = self.summarizer(previous, folded, self.summary_tokens)
+            except Exception as e:
+                logger.warning(f"Context summarizer failed, using extractive summary: {e}")
+                summary = extractive_summary(previous, folded, self.summary_tokens)
+
+            with self._lock:
+                # Only compact() removes turns, so the folded ones are still at the front
+                for _ in folded:
+                    turn = self._turns.popleft()
+                    self._turn_tokens -= turn.tokens
+                self._summary = truncate_to_tokens(summary.strip(), self.summary_tokens, keep_end=True)
+                self.stats["compactions"] += 1
+                self.stats["folded_turns"] += len(folded)
+            return len(folded)
+        finally:
+            self._compacting.release()
+
+    def messages(self, pending: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """
+        Gemini contents for the next request: the rolling summary, then as many
+        recent turns as fit the budget, then the pending user input.
+
+        Args:
+            pending: New user input (text or a list of parts), appended last
+
+        Returns:
+            List[Dict[str, Any]]: Contents for model.generate_content
+        """
+        with self._lock:
+            summary = self._summary
+            budget = self.max_tokens - (self.count_tokens(summary) if summary else 0)
+            recent: List[Turn] = []
+            used = 0
+            for turn in reversed(self._turns):
+                if used + turn.tokens > budget and len(recent) >= 1:
+                    self.stats["trimmed_prompts"] += 1
+                    break
+                recent.append(turn)
+                used += turn.tokens
+
+        contents: List[Dict[str, Any]] = []
+        if summary:
+            contents.append({"role": "user", "parts": [{"text": f"{SUMMARY_PREFIX}\n{summary}"}]})
+            contents.append({"role": "model", "parts": [{"text": SUMMARY_ACK}]})
+        contents.extend(turn.to_content() for turn in reversed(recent))
+        if pending is not None:
+            parts = pending if isinstance(pending, list) else [pending]
+            contents.append({"role": "user", "parts": parts})
+        return contents
+
+    def history(self) -> List[Dict[str, Any]]:
+        """
+        The whole conversation as Gemini contents: the rolling summary of folded
+        turns, then every verbatim turn. Unlike transcript() this is not bounded
+        by max_transcript or trimmed to the prompt budget.
+        """
+        with self._lock:
+            summary = self._summary
+            turns = list(self._turns)
+        contents: List[Dict[str, Any]] = []
+        if summary:
+            contents.append({"role": "user", "parts": [{"text": f"{SUMMARY_PREFIX}\n{summary}"}]})
+            contents.append({"role": "model", "parts": [{"text": SUMMARY_ACK}]})
+        contents.extend(turn.to_content() for turn in turns)
+        return contents
+
+    def _transcript_since(self, since: Optional[int]) -> List[Tuple[Turn, str]]:
+        if not self._transcript:
+            return []
+        offset = 0 if since is None else max(since - self._transcript[0][0].id + 1, 0)
+        return list(self._transcript)[offset:] if offset < len(self._transcript) else []
+
+    @property
+    def cursor(self) -> int:
+        """Id of the newest turn (0 before any turn)."""
+        return self._next_id - 1
+
+    def transcript(self, since: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Recent turns for display, oldest first. Bounded by max_transcript, so a
+        long session's transcript is not the whole conversation; use history()
+        for that.
+
+        Args:
+            since: Only turns with an id greater than this cursor
+        """
+        with self._lock:
+            return [turn.to_message() for turn, _ in self._transcript_since(since)]
+
+    def transcript_json(self, since: Optional[int] = None) -> Tuple[List[str], int]:
+        """
+        Like transcript(), but as the JSON each turn was serialized to when it was
+        added, so polling costs only the new turns.
+
+        Returns:
+            Tuple[List[str], int]: Serialized turns and the cursor for the next poll
+        """
+        with self._lock:
+            return [serialized for _, serialized in self._transcript_since(since)], self.cursor
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serializable snapshot: summary, prompt turns and display transcript."""
+        with self._lock:
+            return {
+                "summary": self._summary,
+                "turns": [[turn.role, turn.text] for turn in self._turns],
+                "transcript": [[turn.id, turn.role, turn.text] for turn, _ in self._transcript],
+                "next_id": self._next_id,
+            }
+
+    def load_state(self, state: Dict[str, Any]) -> "ConversationContext":
+        """Restore a snapshot taken by to_state (token counts are recomputed)."""
+        with self._lock:
+            self._summary = state.get("summary", "")
+            self._turns = deque(Turn(role, text, self.count_tokens(text)) for role, text in state.get("turns", []))
+            self._turn_tokens = sum(turn.tokens for turn in self._turns)
+            self._transcript.clear()
+            for turn_id, role, text in state.get("transcript", []):
+                turn = Turn(role, text, 0, turn_id)
+                self._transcript.append((turn, json.dumps(turn.to_message())))
+            self._next_id = state.get("next_id", 1)
+        return self
+
+    def token_usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "summary": self.count_tokens(self._summary) if self._summary else 0,
+                "turns": self._turn_tokens,
+                "turn_count": len(self._turns),
+            }
@@ -0,0 +1,381 @@
+"""
+Session Store
+Bounded in-memory chat sessions over a pluggable backend. At most max_resident
+sessions stay live; the least recently used and idle ones are serialized to the
+backend and rehydrated lazily the next time their session_id is seen. In
+write-through mode every change is saved immediately, conditional on the
+version this worker last saw, and cached copies are checked against the
+backend's version, so several worker processes can serve the same session
+without overwriting each other's turns. The store-wide lock only guards the
+in-memory LRU; backend I/O runs under a per-session lock, so a slow save for
+one session does not hold up requests for the others.
+"""
+
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .backends import SessionBackend, SessionConflict
+
+logger = logging.getLogger(__name__)
+
+Session = Dict[str, Any]
+
+
+class SessionStore:
+    """
+    Dict-like store of chat sessions with LRU eviction, idle TTL and a persistent backend.
+
+    `session_id in store` and `store[session_id]` work for sessions that are not
+    resident too: the first access rehydrates the session from the backend.
+    """
+
+    def __init__(
+        self,
+        dump: Callable[[Session], Dict[str, Any]],
+        load: Callable[[Dict[str, Any]], Session],
+        backend: Optional[SessionBackend] = None,
+        max_resident: int = 256,
+        idle_ttl: float = 1800.0,
+        spill_retention: float = 30 * 86400.0,
+        write_through: bool = False,
+        save_attempts: int = 5,
+        lock_stripes: int = 64,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            dump: Session -> JSON-serializable state
+            load: State -> new live session
+            backend: Where sessions are persisted; None keeps them in memory only
+            max_resident: Live sessions kept in memory
+            idle_ttl: Seconds without access before a session is spilled
+            spill_retention: Seconds a stored session is kept before it is purged
+            write_through: Save on every change and revalidate cached sessions
+                against the backend (needed when several workers share it)
+            save_attempts: Conditional saves tried by update() before giving up
+            lock_stripes: Per-session locks, shared by session ids that hash alike
+            clock: Monotonic time source
+        """
+        self.dump = dump
+        self.load = load
+        self.backend = backend
+        self.max_resident = max_resident
+        self.idle_ttl = idle_ttl
+        self.spill_retention = spill_retention
+        self.write_through = write_through and backend is not None
+        self.save_attempts = max(1, save_attempts)
+        self.clock = clock
+        # Guards _sessions, _spilling and stats only; never held during backend I/O
+        self._lock = threading.Lock()
+        # Serialize backend I/O per session (re-entrant: update() reads through get())
+        self._session_locks = [threading.RLock() for _ in range(max(1, lock_stripes))]
+        # Spills run one at a time, so an older copy never lands after a newer one.
+        # Always the innermost lock: it is taken while a session lock may be held, never the reverse.
+        self._spill_lock = threading.Lock()
+        # session_id -> (session, last access, backend version of the cached copy)
+        self._sessions: "OrderedDict[str, Tuple[Session, float, Optional[int]]]" = OrderedDict()
+        # Evicted sessions whose spill to the backend is still in progress
+        self._spilling: Dict[str, Session] = {}
+        self._last_purge = clock()
+        self.stats = {
+            "hits": 0, "misses": 0, "not_found": 0, "evictions": 0, "expirations": 0, "refreshes": 0,
+            "conflicts": 0,
+        }
+
+    def _session_lock(self, session_id: str) -> Any:
+        return self._session_locks[zlib.crc32(session_id.encode()) % len(self._session_locks)]
+
+    def _persist(self, session_id: str, session: Session, expected_version: Optional[int] = None) -> Optional[int]:
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.save(session_id, self.dump(session), expected_version)
+        except SessionConflict:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to persist session {session_id}: {e}")
+            return None
+
+    def _take(self, session_id: str, session: Session) -> List[Tuple[str, Session]]:
+        # Under self._lock: a session leaving memory. Write-through sessions are
+        # already saved; others are spilled by _spill() once the lock is released.
+        if self.write_through or self.backend is None:
+            return []
+        self._spilling[session_id] = session
+        return [(session_id, session)]
+
+    def _spill(self, dropped: List[Tuple[str, Session]]) -> None:
+        for session_id, session in dropped:
+            with self._spill_lock:
+                self._persist(session_id, session)
+                with self._lock:
+                    if self._spilling.get(session_id) is session:
+                        del self._spilling[session_id]
+
+    def _expire(self, now: float) -> List[Tuple[str, Session]]:
+        # Under self._lock. Least recently used first, so stop at the first session still within its TTL
+        dropped: List[Tuple[str, Session]] = []
+        while self._sessions:
+            session_id, (session, last_used, _) = next(iter(self._sessions.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._sessions[session_id]
+            dropped += self._take(session_id, session)
+            self.stats["expirations"] += 1
+        return dropped
+
+    def _evict_overflow(self) -> List[Tuple[str, Session]]:
+        # Under self._lock
+        dropped: List[Tuple[str, Session]] = []
+        while len(self._sessions) > self.max_resident:
+            session_id, (session, _, _) = self._sessions.popitem(last=False)
+            dropped += self._take(session_id, session)
+            self.stats["evictions"] += 1
+        return dropped
+
+    def _maintain(self, now: float) -> None:
+        """Expire idle sessions and purge old stored ones, doing the I/O outside the store lock."""
+        with self._lock:
+            dropped = self._expire(now)
+            purge = self.backend is not None and now - self._last_purge > 3600
+            if purge:
+                self._last_purge = now
+        self._spill(dropped)
+        if purge:
+            self.backend.purge(time.time() - self.spill_retention)
+
+    def _insert(self, session_id: str, session: Session, now: float, version: Optional[int]) -> None:
+        with self._lock:
+            self._spilling.pop(session_id, None)
+            self._sessions[session_id] = (session, now, version)
+            self._sessions.move_to_end(session_id)
+            dropped = self._evict_overflow()
+        self._spill(dropped)
+
+    def _rehydrate(self, session_id: str) -> Optional[Tuple[Session, int]]:
+        loaded = self.backend.load(session_id) if self.backend is not None else None
+        if loaded is None:
+            return None
+        state, version = loaded
+        return self.load(state), version
+
+    def get(self, session_id: str, default: Optional[Session] = None) -> Optional[Session]:
+        """Live session for session_id, rehydrating it if it is not resident or is stale."""
+        if session_id is None:
+            return default
+        session_id = str(session_id)
+        now = self.clock()
+        self._maintain(now)
+        with self._session_lock(session_id):
+            with self._lock:
+                entry = self._sessions.get(session_id)
+                spilling = self._spilling.get(session_id)
+            if entry is not None:
+                session, _, version = entry
+                if self.write_through and self.backend.version(session_id) != version:
+                    # Another worker saved a newer copy
+                    fresh = self._rehydrate(session_id)
+                    if fresh is None:
+                        with self._lock:
+                            self._sessions.pop(session_id, None)
+                            self.stats["not_found"] += 1
+                        return default
+                    session, version = fresh
+                    with self._lock:
+                        self.stats["refreshes"] += 1
+                else:
+                    with self._lock:
+                        self.stats["hits"] += 1
+                with self._lock:
+                    self._sessions[session_id] = (session, now, version)
+                    self._sessions.move_to_end(session_id)
+                return session
+
+            fresh: Optional[Tuple[Session, Optional[int]]]
+            if spilling is not None:
+                # Evicted a moment ago and still being written out: take the live copy back
+                fresh = (spilling, None)
+            else:
+                fresh = self._rehydrate(session_id)
+            if fresh is None:
+                with self._lock:
+                    self.stats["not_found"] += 1
+                return default
+            # Miss: not resident, rehydrated from the backend
+            with self._lock:
+                self.stats["misses"] += 1
+            session, version = fresh
+            self._insert(session_id, session, now, version)
+            return session
+
+    def update(self, session_id: str, change: Callable[[Session], Any]) -> Session:
+        """
+        Apply a change to a session and, in write-through mode, save it. The save
+        only succeeds if no other worker saved the session since this worker's
+        copy was loaded; otherwise the newer copy is reloaded and the change is
+        applied to it again.
+
+        Args:
+            session_id: Session to change
+            change: Mutates the session in place; may run more than once
+
+        Returns:
+            Session: The changed live session
+
+        Raises:
+            KeyError: Unknown session (or deleted by another worker meanwhile)
+        """
+        session_id = str(session_id)
+        with self._session_lock(session_id):
+            session = self[session_id]
+            for _ in range(self.save_attempts):
+                change(session)
+                if not self.write_through:
+                    return session
+                with self._lock:
+                    entry = self._sessions.get(session_id)
+                last_used, version = (entry[1], entry[2]) if entry is not None else (self.clock(), None)
+                try:
+                    version = self._persist(session_id, session, version)
+                except SessionConflict:
+                    with self._lock:
+                        self.stats["conflicts"] += 1
+                    session = self._reload(session_id)
+                    continue
+                with self._lock:
+                    if session_id in self._sessions:
+                        self._sessions[session_id] = (session, last_used, version)
+                return session
+            logger.error(f"Gave up saving session {session_id} after {self.save_attempts} conflicting writes")
+            return session
+
+    def save(self, session_id: str) -> None:
+        """
+        Persist a changed session now (no-op unless write-through). If another
+        worker saved it first, its copy wins and this worker's change is dropped;
+        use update() to have the change reapplied instead.
+        """
+        if not self.write_through:
+            return
+        session_id = str(session_id)
+        with self._session_lock(session_id):
+            with self._lock:
+                entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            try:
+                version = self._persist(session_id, entry[0], entry[2])
+            except SessionConflict:
+                logger.warning(f"Session {session_id} was saved by another worker; keeping its copy")
+                with self._lock:
+                    self.stats["conflicts"] += 1
+                    self._sessions.pop(session_id, None)
+                return
+            with self._lock:
+                if session_id in self._sessions:
+                    self._sessions[session_id] = (entry[0], self._sessions[session_id][1], version)
+
+    def setdefault(self, session_id: str, session: Session) -> Session:
+        """
+        The existing session for session_id, or session after storing it. In
+        write-through mode the store is conditional on the session not existing,
+        so two workers creating the same session end up sharing one copy.
+        """
+        session_id = str(session_id)
+        with self._session_lock(session_id):
+            existing = self.get(session_id)
+            if existing is not None:
+                return existing
+            version = None
+            if self.write_through:
+                try:
+                    version = self._persist(session_id, session, 0)
+                except SessionConflict:
+                    with self._lock:
+                        self.stats["conflicts"] += 1
+                    return self._reload(session_id)
+            self._insert(session_id, session, self.clock(), version)
+            return session
+
+    def _reload(self, session_id: str) -> Session:
+        # Under the session's lock: replace the resident copy with the backend's after a conflicting save
+        fresh = self._rehydrate(session_id)
+        if fresh is None:
+            with self._lock:
+                self._sessions.pop(session_id, None)
+            raise KeyError(session_id)
+        session, version = fresh
+        self._insert(session_id, session, self.clock(), version)
+        return session
+
+    def __getitem__(self, session_id: str) -> Session:
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __setitem__(self, session_id: str, session: Session) -> None:
+        session_id = str(session_id)
+        now = self.clock()
+        self._maintain(now)
+        with self._session_lock(session_id):
+            version = self._persist(session_id, session) if self.write_through else None
+            self._insert(session_id, session, now, version)
+
+    def __contains__(self, session_id: object) -> bool:
+        if session_id is None:
+            return False
+        session_id = str(session_id)
+        with self._lock:
+            if not self.write_through and (session_id in self._sessions or session_id in self._spilling):
+                return True
+        return self.backend is not None and self.backend.exists(session_id)
+
+    def __delitem__(self, session_id: str) -> None:
+        session_id = str(session_id)
+        with self._session_lock(session_id):
+            with self._lock:
+                self._sessions.pop(session_id, None)
+                self._spilling.pop(session_id, None)
+            if self.backend is not None:
+                self.backend.delete(session_id)
+
+    def __len__(self) -> int:
+        """Resident sessions."""
+        with self._lock:
+            return len(self._sessions)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._sessions))
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics: Dict[str, Any] = {
+                **self.stats,
+                "resident": len(self._sessions),
+                "max_resident": self.max_resident,
+                "write_through": self.write_through,
+            }
+        # Counting stored sessions is backend I/O: outside the store lock
+        metrics["stored"] = len(self.backend) if self.backend is not None else 0
+        return metrics
+
+    def flush(self) -> int:
+        """Persist every resident session (e.g. at shutdown) without evicting it."""
+        with self._lock:
+            sessions: List[Tuple[str, Session, Optional[int]]] = [
+                (sid, entry[0], entry[2] if self.write_through else None) for sid, entry in self._sessions.items()
+            ]
+        for session_id, session, version in sessions:
+            with self._session_lock(session_id):
+                try:
+                    self._persist(session_id, session, version)
+                except SessionConflict:
+                    # Another worker saved a newer copy; don't overwrite it with this one
+                    pass
+        return len(sessions)
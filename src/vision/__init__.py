@@ -0,0 +1,14 @@
+"""
+Maya Vision Package
+Face gallery encoding, caching and enrollment for webcam face recognition, and
+the screenshot watcher for screenshare mode
+"""
+
+from .enrollment import FaceEnrollment
+from .face_cache import FaceEncodingCache, encode_face_file, encode_gallery, image_hash, scan_gallery
+from .screenshots import ScreenshotWatcher, default_screenshot_dir
+
+__all__ = [
+    'FaceEncodingCache', 'FaceEnrollment', 'encode_face_file', 'encode_gallery', 'image_hash', 'scan_gallery',
+    'ScreenshotWatcher', 'default_screenshot_dir',
+]
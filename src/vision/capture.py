@@ -0,0 +1,316 @@
+"""
+Frame Capture
+Webcam capture thread with an FPS cap, a small timestamped ring buffer that
+readers peek at without consuming, and frame-difference motion gating: a
+frame that looks like the last kept one is dropped, and after a quiet spell
+the capture rate falls to an idle rate. Between captures the camera is
+drained with grab(), so the frame retrieved when one is due is the current
+one rather than one the driver queued during the wait. The thread only runs
+while vision mode is on.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# cv2.CAP_PROP_BUFFERSIZE, without importing cv2 here
+CAP_PROP_BUFFERSIZE = 38
+
+
+@dataclass(frozen=True)
+class Frame:
+    seq: int
+    timestamp: float
+    image: np.ndarray
+    motion: float
+
+
+class MotionDetector:
+    """
+    Mean absolute difference between tiny grayscale thumbnails. Thumbnails are
+    taken by striding, so a check costs a few thousand pixel reads whatever the
+    camera resolution.
+    """
+
+    def __init__(self, threshold: float = 3.0, width: int = 64):
+        """
+        Args:
+            threshold: Mean per-pixel change (0-255) that counts as motion
+            width: Approximate thumbnail width in pixels
+        """
+        self.threshold = threshold
+        self.width = width
+        self._reference: Optional[np.ndarray] = None
+
+    def thumbnail(self, image: np.ndarray) -> np.ndarray:
+        step = max(1, image.shape[1] // self.width)
+        small = image[::step, ::step]
+        if small.ndim == 3:
+            small = small.mean(axis=2, dtype=np.float32)
+        return small.astype(np.float32, copy=False)
+
+    def score(self, image: np.ndarray) -> float:
+        """Change against the reference thumbnail (inf when there is none yet)."""
+        if self._reference is None:
+            return float("inf")
+        thumb = self.thumbnail(image)
+        if thumb.shape != self._reference.shape:
+            return float("inf")
+        return float(np.abs(thumb - self._reference).mean())
+
+    def accept(self, image: np.ndarray) -> None:
+        """Make image the reference later frames are compared with."""
+        self._reference = self.thumbnail(image)
+
+    def reset(self) -> None:
+        self._reference = None
+
+
+class FrameBuffer:
+    """Thread-safe ring of the most recent kept frames."""
+
+    def __init__(self, size: int = 8, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._frames: deque = deque(maxlen=size)
+        self._seq = 0
+        # Last time a captured frame confirmed the newest kept frame is still current
+        self._confirmed_at: Optional[float] = None
+
+    def push(self, image: np.ndarray, motion: float, timestamp: Optional[float] = None) -> Frame:
+        # Frames are shared by every reader, so they are frozen
+        image.flags.writeable = False
+        timestamp = self.clock() if timestamp is None else timestamp
+        with self._lock:
+            self._seq += 1
+            frame = Frame(seq=self._seq, timestamp=timestamp, image=image, motion=motion)
+            self._frames.append(frame)
+            self._confirmed_at = timestamp
+        return frame
+
+    def confirm(self, timestamp: Optional[float] = None) -> None:
+        """Record that the scene still matches the newest frame."""
+        with self._lock:
+            if self._frames:
+                self._confirmed_at = self.clock() if timestamp is None else timestamp
+
+    def latest(self, max_age: Optional[float] = None) -> Optional[Frame]:
+        """
+        Newest frame, without consuming it.
+
+        Args:
+            max_age: Seconds since the scene was last confirmed; older frames count as missing
+        """
+        with self._lock:
+            if not self._frames:
+                return None
+            if max_age is not None and self.clock() - self._confirmed_at > max_age:
+                return None
+            return self._frames[-1]
+
+    def since(self, seq: int) -> List[Frame]:
+        """Buffered frames newer than seq, oldest first."""
+        with self._lock:
+            return [frame for frame in self._frames if frame.seq > seq]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._confirmed_at = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frames)
+
+
+class FrameCapture:
+    """
+    Owns the camera while vision mode is on.
+
+    start() opens the source and runs the capture loop; stop() ends the loop
+    and releases the source, so nothing runs while vision mode is off.
+    """
+
+    def __init__(
+        self,
+        open_source: Callable[[], Any],
+        fps: float = 10.0,
+        idle_fps: float = 2.0,
+        idle_after: float = 2.0,
+        buffer_size: int = 8,
+        motion_threshold: float = 3.0,
+        on_frame: Optional[Callable[[Frame], None]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            open_source: Returns an object with read() -> (ok, frame) and release(), e.g. cv2.VideoCapture(0)
+            fps: Capture rate cap while the scene is changing
+            idle_fps: Capture rate once nothing has moved for idle_after seconds
+            idle_after: Seconds without motion before dropping to idle_fps
+            buffer_size: Frames kept in the ring buffer
+            motion_threshold: Mean per-pixel change that counts as motion
+            on_frame: Called on the capture thread with every kept frame (e.g. face tracking)
+            clock: Time source for frame timestamps
+        """
+        self.open_source = open_source
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.clock = clock
+        self.buffer = FrameBuffer(buffer_size, clock=clock)
+        self.motion = MotionDetector(motion_threshold)
+        self.on_frame = on_frame
+        self._lock = threading.Lock()
+        self._source: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_motion = 0.0
+        self.stats = {"captured": 0, "kept": 0, "static": 0, "read_errors": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._source = self.open_source()
+            if hasattr(self._source, "set"):
+                # Honoured by some backends only; grab() draining covers the rest
+                self._source.set(CAP_PROP_BUFFERSIZE, 1)
+            self._stop = threading.Event()
+            self.motion.reset()
+            self._thread = threading.Thread(
+                target=self._loop, args=(self._source, self._stop), name="maya-capture", daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._lock:
+            thread, source = self._thread, self._source
+            self._stop.set()
+            self._thread = self._source = None
+        if thread is not None:
+            thread.join(timeout)
+        if source is not None:
+            source.release()
+        self.buffer.clear()
+
+    def offer(self, image: np.ndarray, timestamp: Optional[float] = None) -> Optional[Frame]:
+        """
+        Pass a captured frame through the motion gate.
+
+        Returns:
+            Optional[Frame]: The buffered frame, or None if the scene had not changed
+        """
+        timestamp = self.clock() if timestamp is None else timestamp
+        self.stats["captured"] += 1
+        score = self.motion.score(image)
+        if score < self.motion.threshold:
+            self.stats["static"] += 1
+            self.buffer.confirm(timestamp)
+            return None
+        self.motion.accept(image)
+        self._last_motion = timestamp
+        self.stats["kept"] += 1
+        return self.buffer.push(image, score, timestamp)
+
+    def interval(self, now: Optional[float] = None) -> float:
+        """Seconds between captures at the current (active or idle) rate."""
+        now = self.clock() if now is None else now
+        fps = self.fps if now - self._last_motion < self.idle_after else self.idle_fps
+        return 1.0 / max(fps, 0.01)
+
+    def next_image(self, source: Any, stop: threading.Event, due: float) -> Tuple[bool, Any]:
+        """
+        Read the frame that is current at `due`.
+
+        Sources with grab()/retrieve() (cv2.VideoCapture) are grabbed at the
+        camera's own rate until then, which only dequeues frames, and the last
+        one is decoded. Sleeping instead would let the driver's buffer fill and
+        hand back a frame several intervals old. Other sources sleep, then read().
+        """
+        if hasattr(source, "grab") and hasattr(source, "retrieve"):
+            while not stop.is_set():
+                if not source.grab():
+                    return False, None
+                if self.clock() >= due:
+                    return source.retrieve()
+            return False, None
+        stop.wait(max(0.0, due - self.clock()))
+        return source.read()
+
+    def _loop(self, source: Any, stop: threading.Event) -> None:
+        due = self.clock()
+        while not stop.is_set():
+            try:
+                ok, image = self.next_image(source, stop, due)
+            except Exception as e:
+                logger.warning(f"Camera read failed: {e}")
+                ok, image = False, None
+            if stop.is_set():
+                break
+            started = self.clock()
+            if not ok or image is None:
+                self.stats["read_errors"] += 1
+                stop.wait(0.5)
+                due = self.clock()
+                continue
+            frame = self.offer(image, started)
+            if frame is not None and self.on_frame is not None:
+                try:
+                    self.on_frame(frame)
+                except Exception as e:
+                    logger.warning(f"Frame handler failed: {e}")
+            due = started + self.interval(started)
+
+    def latest(self, max_age: Optional[float] = None) -> Optional[Frame]:
+        return self.buffer.latest(max_age)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "running": self.running,
+            "buffered": len(self.buffer),
+            "fps": 1.0 / self.interval(),
+        }
+
+
+class FrameResultCache:
+    """
+    Last result computed from a frame, reused while the same frame is current,
+    so an unchanged scene is not re-processed (e.g. face annotation).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple[int, Hashable]] = None
+        self._value: Any = None
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, frame: Frame, compute: Callable[[Frame], Any], variant: Hashable = None) -> Any:
+        """
+        Args:
+            frame: Frame the result is derived from
+            compute: Builds the result from the frame
+            variant: Anything else the result depends on (e.g. face recognition on/off)
+        """
+        key = (frame.seq, variant)
+        with self._lock:
+            if self._key == key:
+                self.stats["hits"] += 1
+                return self._value
+        value = compute(frame)
+        with self._lock:
+            self._key, self._value = key, value
+            self.stats["misses"] += 1
+        return value
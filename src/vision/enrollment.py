@@ -0,0 +1,151 @@
+"""
+Face Enrollment
+Keeps the live face gallery in step with known_faces/. Uploads queue a
+background rescan: the cache skips every photo it has already encoded, the
+new ones are encoded in parallel on a process pool (dlib holds the GIL), and
+the finished gallery replaces the live one in a single assignment. The pool
+can be created on the first rescan, so importing the app starts no workers.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional
+
+from .face_cache import FaceEncoder, FaceEncodingCache, encode_gallery
+
+logger = logging.getLogger(__name__)
+
+IDLE = "idle"
+QUEUED = "queued"
+ENROLLING = "enrolling"
+
+# (encodings, names) -> gallery object used for matching
+GalleryBuilder = Callable[[List[List[float]], List[str]], Any]
+
+
+class FaceEnrollment:
+    """
+    Owner of the live gallery. Readers take `enrollment.gallery` and keep using
+    that object; a refresh never mutates it, it swaps in a new one.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        cache: FaceEncodingCache,
+        encode: FaceEncoder,
+        build_gallery: GalleryBuilder,
+        executor: Optional[Executor] = None,
+        jobs: Optional[Any] = None,
+        executor_factory: Optional[Callable[[], Executor]] = None,
+    ):
+        """
+        Args:
+            directory: Gallery root (one sub-folder per person)
+            cache: Persistent encoding cache
+            encode: Face encoder (picklable when executor is a process pool)
+            build_gallery: Builds the matching structure from encodings and names
+            executor: Pool new photos are encoded on; None encodes in the refreshing thread
+            jobs: JobQueue running enrollments; None refreshes synchronously
+            executor_factory: Creates the pool on the first refresh (instead of executor)
+        """
+        self.directory = directory
+        self.cache = cache
+        self.encode = encode
+        self.build_gallery = build_gallery
+        self.executor = executor
+        self.executor_factory = executor_factory
+        self.jobs = jobs
+        self.gallery: Any = None
+        self._lock = threading.Lock()
+        self._state = IDLE
+        self._progress = {"done": 0, "total": 0}
+        self._last_run: Optional[Dict[str, Any]] = None
+        self._job_id: Optional[str] = None
+
+    def _on_progress(self, done: int, total: int) -> None:
+        with self._lock:
+            self._progress = {"done": done, "total": total}
+
+    def _executor(self) -> Optional[Executor]:
+        with self._lock:
+            if self.executor is None and self.executor_factory is not None:
+                self.executor = self.executor_factory()
+            return self.executor
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Rescan the gallery now, encoding only photos the cache has not seen.
+
+        Returns:
+            Dict[str, Any]: Summary of the run (faces, encoded, failed, seconds)
+        """
+        with self._lock:
+            self._state = ENROLLING
+            self._progress = {"done": 0, "total": 0}
+        started = time.monotonic()
+        before = dict(self.cache.stats)
+        try:
+            encodings, names = encode_gallery(
+                self.directory, self.cache, self.encode, executor=self._executor(), progress=self._on_progress,
+            )
+            gallery = self.build_gallery(encodings, names)
+            # Readers holding the old gallery finish with it; new requests see this one
+            self.gallery = gallery
+            summary = {
+                "faces": len(names),
+                "people": len(set(names)),
+                "encoded": self.cache.stats["encoded"] - before["encoded"],
+                "failed": self.cache.stats["failed"] - before["failed"],
+                "seconds": round(time.monotonic() - started, 3),
+                "finished_at": time.time(),
+            }
+            with self._lock:
+                self._last_run = summary
+            return summary
+        finally:
+            with self._lock:
+                self._state = IDLE
+
+    def enroll(self) -> Optional[str]:
+        """
+        Schedule a refresh after new photos were saved.
+
+        Uploads arriving while one is queued coalesce into it; one arriving
+        while a refresh runs is picked up by a follow-up run.
+
+        Returns:
+            Optional[str]: Job id, or None when the refresh ran synchronously
+        """
+        if self.jobs is None:
+            self.refresh()
+            return None
+        job = self.jobs.submit("face_enroll", self.refresh, key=self.directory)
+        with self._lock:
+            self._job_id = job.id
+        return job.id
+
+    def status(self) -> Dict[str, Any]:
+        job = self.jobs.get(self._job_id) if self.jobs is not None and self._job_id else None
+        with self._lock:
+            gallery = self.gallery
+            state = self._state
+            if state == IDLE and job is not None and job.status == QUEUED:
+                state = QUEUED
+            return {
+                "state": state,
+                "faces": len(gallery) if gallery is not None else 0,
+                "progress": dict(self._progress),
+                "last_run": dict(self._last_run) if self._last_run else None,
+                "job_id": self._job_id,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self.executor = self.executor, None
+            # A later refresh encodes in-thread rather than starting a new pool
+            self.executor_factory = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,249 @@
+"""
+Face Encoding Cache
+Persists face encodings of the known_faces gallery keyed by a hash of each
+image's content, so a gallery rescan only runs the face encoder on new or
+changed photos
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from concurrent.futures import Executor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+
+# Image path -> 128-d encoding of the first face, or None when no face is found
+FaceEncoder = Callable[[str], Optional[Sequence[float]]]
+# (images encoded so far, images to encode) during a gallery scan
+Progress = Callable[[int, int], None]
+
+
+def encode_face_file(path: str) -> Optional[List[float]]:
+    """
+    Encoding of the first face in an image file, or None without a face.
+
+    Module-level so process pools can pickle it; face_recognition is imported
+    in the worker on first use.
+    """
+    import face_recognition
+
+    image = face_recognition.load_image_file(path)
+    face_encodings = face_recognition.face_encodings(image)
+    return face_encodings[0].tolist() if face_encodings else None
+
+
+def image_hash(path: str, encoder_name: str = "face_recognition") -> str:
+    """
+    Stable key for an image encoded with a given encoder.
+
+    Args:
+        path: Image file
+        encoder_name: Encoder identifier, part of the key so a model change re-encodes
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(f"{encoder_name}\x00".encode("utf-8"))
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_gallery(directory: str) -> List[Tuple[str, str]]:
+    """
+    (person name, image path) for every image under directory/<name>/, in a stable order.
+    """
+    if not os.path.isdir(directory):
+        return []
+    images: List[Tuple[str, str]] = []
+    for name in sorted(os.listdir(directory)):
+        person_dir = os.path.join(directory, name)
+        if not os.path.isdir(person_dir):
+            continue
+        for image_name in sorted(os.listdir(person_dir)):
+            if image_name.rsplit('.', 1)[-1].lower() in IMAGE_EXTENSIONS:
+                images.append((name, os.path.join(person_dir, image_name)))
+    return images
+
+
+class FaceEncodingCache:
+    """
+    SQLite-backed store of face encodings.
+
+    `faces` maps content hash -> float64 blob (NULL when the image has no face,
+    so face-less photos are not re-examined either). `files` remembers the hash
+    of each path with its size and mtime, so unchanged files are not even re-read.
+    """
+
+    def __init__(self, path: str, encoder_name: str = "face_recognition"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.encoder_name = encoder_name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS faces (key TEXT PRIMARY KEY, encoding BLOB)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, key TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self.stats = {"cached": 0, "encoded": 0, "failed": 0, "pruned": 0}
+
+    def key_for(self, path: str) -> str:
+        """Content hash of path, reusing the stored hash while size and mtime are unchanged."""
+        st = os.stat(path)
+        with self._lock:
+            row = self._conn.execute("SELECT size, mtime_ns, key FROM files WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        key = image_hash(path, self.encoder_name)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, key) VALUES (?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, key),
+            )
+            self._conn.commit()
+        return key
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[List[float]]]:
+        """Cached encodings by key (None for images known to have no face); unknown keys are absent."""
+        keys = list(keys)
+        found: Dict[str, Optional[List[float]]] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, encoding FROM faces WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("d", blob).tolist() if blob is not None else None
+        return found
+
+    def put_many(self, items: Dict[str, Optional[Sequence[float]]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO faces (key, encoding) VALUES (?, ?)",
+                [
+                    (key, array("d", vector).tobytes() if vector is not None else None)
+                    for key, vector in items.items()
+                ],
+            )
+            self._conn.commit()
+
+    def prune(self, paths: Iterable[str]) -> int:
+        """
+        Forget files no longer in the gallery and encodings no file refers to.
+
+        Returns:
+            int: Encodings removed
+        """
+        keep = list(paths)
+        with self._lock:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS live_paths (path TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM live_paths")
+            self._conn.executemany("INSERT OR IGNORE INTO live_paths (path) VALUES (?)", [(p,) for p in keep])
+            self._conn.execute("DELETE FROM files WHERE path NOT IN (SELECT path FROM live_paths)")
+            removed = self._conn.execute(
+                "DELETE FROM faces WHERE key NOT IN (SELECT key FROM files)"
+            ).rowcount
+            self._conn.commit()
+        self.stats["pruned"] += removed
+        return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM faces").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def encode_gallery(
+    directory: str,
+    cache: FaceEncodingCache,
+    encode: FaceEncoder,
+    executor: Optional[Executor] = None,
+    progress: Optional[Progress] = None,
+) -> Tuple[List[List[float]], List[str]]:
+    """
+    Encodings and names for every face photo in the gallery, encoding only
+    images whose content the cache has not seen.
+
+    Args:
+        directory: Gallery root (one sub-folder per person)
+        cache: Persistent encoding cache
+        encode: Face encoder for cache misses (picklable when executor is a process pool)
+        executor: Pool the misses are encoded on in parallel; None encodes them in this thread
+        progress: Called after each encoded image with (done, total)
+
+    Returns:
+        Tuple[List[List[float]], List[str]]: Parallel lists of encodings and person names
+    """
+    images = scan_gallery(directory)
+    keyed: List[Tuple[str, str, str]] = []
+    for name, path in images:
+        try:
+            keyed.append((name, path, cache.key_for(path)))
+        except OSError as e:
+            logger.warning(f"Skipping unreadable face image {path}: {e}")
+
+    known = cache.get_many(key for _, _, key in keyed)
+    misses: Dict[str, str] = {}
+    for _, path, key in keyed:
+        if key not in known and key not in misses:
+            misses[key] = path
+
+    fresh: Dict[str, Optional[Sequence[float]]] = {}
+    failed = 0
+
+    def collect(key: str, path: str, result: Callable[[], Optional[Sequence[float]]]) -> None:
+        nonlocal failed
+        try:
+            vector = result()
+        except Exception as e:
+            # Not cached, so a fixed or replaced file is tried again next scan
+            logger.warning(f"Failed to encode face image {path}: {e}")
+            failed += 1
+        else:
+            fresh[key] = [float(x) for x in vector] if vector is not None else None
+        if progress is not None:
+            progress(len(fresh) + failed, len(misses))
+
+    if executor is None:
+        for key, path in misses.items():
+            collect(key, path, lambda: encode(path))
+    else:
+        futures = {executor.submit(encode, path): (key, path) for key, path in misses.items()}
+        for future in as_completed(futures):
+            key, path = futures[future]
+            collect(key, path, future.result)
+
+    if fresh:
+        cache.put_many(fresh)
+        known.update(fresh)
+    cache.stats["encoded"] += len(fresh)
+    cache.stats["failed"] += failed
+    cache.stats["cached"] += len(keyed) - len(fresh) - failed
+    cache.prune(path for _, path, _ in keyed)
+
+    encodings: List[List[float]] = []
+    names: List[str] = []
+    for name, _, key in keyed:
+        vector = known.get(key)
+        if vector is not None:
+            encodings.append(vector)
+            names.append(name)
+    logger.info(f"Face gallery: {len(encodings)} faces from {len(keyed)} images ({len(fresh)} newly encoded)")
+    return encodings, names
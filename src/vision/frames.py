@@ -0,0 +1,22 @@
+"""
+Frame Conversion
+In-memory hand-off of webcam frames (OpenCV BGR ndarrays) to the model:
+channel reordering and PIL images, without temp files. Encoding for upload
+is done by ImagePreparer (prepare.py).
+"""
+
+import numpy as np
+import PIL.Image
+
+
+def bgr_to_rgb(frame: np.ndarray) -> np.ndarray:
+    """RGB copy of an OpenCV BGR frame (the input is left untouched)."""
+    if frame.ndim == 2:
+        return np.ascontiguousarray(frame)
+    return np.ascontiguousarray(frame[..., 2::-1])
+
+
+def frame_to_image(frame: np.ndarray) -> PIL.Image.Image:
+    """PIL image of a BGR frame, ready for model.generate_content."""
+    return PIL.Image.fromarray(bgr_to_rgb(frame))
+
@@ -0,0 +1,150 @@
+"""
+Face Gallery
+Known face encodings held as one contiguous float32 matrix. Every face found
+in a frame is matched against the whole gallery in a single matrix product,
+and the nearest person under the tolerance wins (not the first one that
+happens to be close enough). Large galleries can add an inverted-file
+approximate index, so each face is compared only against a few clusters.
+"""
+
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN = "Unknown"
+
+# (name or None, distance to the nearest known face)
+Match = Tuple[Optional[str], float]
+
+
+def _squared_distances(queries: np.ndarray, matrix: np.ndarray, norms: np.ndarray) -> np.ndarray:
+    # |q - g|^2 = |q|^2 + |g|^2 - 2 q.g, one GEMM for all query/gallery pairs
+    squared = (queries * queries).sum(axis=1)[:, None] + norms[None, :] - 2.0 * (queries @ matrix.T)
+    return np.maximum(squared, 0.0, out=squared)
+
+
+class IVFIndex:
+    """
+    Inverted-file index: k-means centroids over the gallery, each owning the
+    rows closest to it. A query scans only the rows of its `probes` nearest
+    centroids, so the result is approximate but the work per face drops from
+    the gallery size to roughly probes * size / lists.
+    """
+
+    def __init__(self, matrix: np.ndarray, lists: Optional[int] = None, iterations: int = 10, seed: int = 0):
+        """
+        Args:
+            matrix: Gallery rows (float32, contiguous)
+            lists: Number of clusters (default sqrt of the gallery size)
+            iterations: K-means refinement passes
+            seed: Centroid initialization seed
+        """
+        count = len(matrix)
+        lists = max(1, min(lists or int(np.sqrt(count)), count))
+        rng = np.random.default_rng(seed)
+        centroids = matrix[rng.choice(count, size=lists, replace=False)].copy()
+        norms = (matrix * matrix).sum(axis=1)
+        for _ in range(iterations):
+            assignment = _squared_distances(centroids, matrix, norms).argmin(axis=0)
+            for cluster in range(lists):
+                members = matrix[assignment == cluster]
+                if len(members):
+                    centroids[cluster] = members.mean(axis=0)
+        assignment = _squared_distances(centroids, matrix, norms).argmin(axis=0)
+
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.centroid_norms = (self.centroids * self.centroids).sum(axis=1)
+        self.lists = [np.flatnonzero(assignment == cluster) for cluster in range(lists)]
+
+    def candidates(self, queries: np.ndarray, probes: int) -> List[np.ndarray]:
+        """Gallery row indices to scan for each query."""
+        probes = min(probes, len(self.lists))
+        nearest = np.argsort(_squared_distances(queries, self.centroids, self.centroid_norms), axis=1)[:, :probes]
+        return [np.concatenate([self.lists[cluster] for cluster in row]) for row in nearest]
+
+
+class FaceGallery:
+    """Immutable set of known faces; rebuild it when the gallery changes."""
+
+    def __init__(
+        self,
+        encodings: Sequence[Sequence[float]],
+        names: Sequence[str],
+        tolerance: float = 0.6,
+        ann_min_faces: int = 5000,
+        ann_probes: int = 8,
+    ):
+        """
+        Args:
+            encodings: One 128-d encoding per known photo
+            names: Person name for each encoding
+            tolerance: Largest distance still counted as a match (face_recognition's default is 0.6)
+            ann_min_faces: Gallery size from which the approximate index is built (0 disables it)
+            ann_probes: Clusters scanned per face when the index is used
+        """
+        if len(encodings) != len(names):
+            raise ValueError("encodings and names must have the same length")
+        self.names = list(names)
+        self.tolerance = tolerance
+        self.ann_probes = ann_probes
+        if len(encodings):
+            self.matrix = np.ascontiguousarray(np.asarray(encodings, dtype=np.float32))
+        else:
+            self.matrix = np.zeros((0, 128), dtype=np.float32)
+        self.norms = (self.matrix * self.matrix).sum(axis=1)
+        self.index: Optional[IVFIndex] = None
+        if ann_min_faces and len(self.names) >= ann_min_faces:
+            self.index = IVFIndex(self.matrix)
+            logger.info(f"Built approximate face index: {len(self.index.lists)} lists over {len(self.names)} faces")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __bool__(self) -> bool:
+        return bool(self.names)
+
+    def distances(self, queries: Sequence[Sequence[float]]) -> np.ndarray:
+        """Exact (faces x gallery) Euclidean distance matrix."""
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        return np.sqrt(_squared_distances(queries, self.matrix, self.norms))
+
+    def match(self, queries: Sequence[Sequence[float]]) -> List[Match]:
+        """
+        Nearest known person for each face encoding.
+
+        Args:
+            queries: Encodings of the faces found in a frame
+
+        Returns:
+            List[Match]: (name, distance) per face; name is None when nothing is within tolerance
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        if not len(queries):
+            return []
+        if not self.names:
+            return [(None, float("inf"))] * len(queries)
+
+        if self.index is None:
+            squared = _squared_distances(queries, self.matrix, self.norms)
+            best = squared.argmin(axis=1)
+            best_distances = np.sqrt(squared[np.arange(len(queries)), best])
+        else:
+            best = np.empty(len(queries), dtype=np.int64)
+            best_distances = np.empty(len(queries), dtype=np.float32)
+            for i, rows in enumerate(self.index.candidates(queries, self.ann_probes)):
+                squared = _squared_distances(queries[i:i + 1], self.matrix[rows], self.norms[rows])[0]
+                nearest = squared.argmin()
+                best[i] = rows[nearest]
+                best_distances[i] = np.sqrt(squared[nearest])
+
+        return [
+            (self.names[row] if distance <= self.tolerance else None, float(distance))
+            for row, distance in zip(best, best_distances)
+        ]
+
+    def label(self, queries: Sequence[Sequence[float]]) -> List[str]:
+        """Names for each face, UNKNOWN when there is no match."""
+        return [name or UNKNOWN for name, _ in self.match(queries)]
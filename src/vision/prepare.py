@@ -0,0 +1,192 @@
+"""
+Image Preparation
+Shrinks and re-encodes webcam frames and screenshots before they are sent to
+Gemini. Each content type has a profile: screens keep a larger long edge and
+higher quality so text stays legible, camera scenes go smaller and lossier.
+Quality steps down until the image fits the profile's byte budget. Bytes
+sent and encode time are recorded per request.
+"""
+
+import io
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Optional, Tuple
+
+import PIL.Image
+from PIL import features
+
+from .frames import frame_to_image
+
+logger = logging.getLogger(__name__)
+
+CAMERA = "camera"
+SCREEN = "screen"
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+@dataclass(frozen=True)
+class PrepProfile:
+    max_edge: int
+    format: str
+    quality: int
+    min_quality: int
+    max_bytes: int
+
+
+DEFAULT_PROFILES: Dict[str, PrepProfile] = {
+    CAMERA: PrepProfile(max_edge=1024, format="JPEG", quality=75, min_quality=45, max_bytes=200_000),
+    SCREEN: PrepProfile(max_edge=1920, format="WEBP", quality=85, min_quality=60, max_bytes=600_000),
+}
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    mime_type: str
+    kind: str
+    size: Tuple[int, int]
+    source_size: Tuple[int, int]
+    quality: int
+    encode_ms: float
+    source_bytes: Optional[int] = None
+
+    def to_part(self) -> Dict[str, Any]:
+        """Inline blob part for model.generate_content."""
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+def profiles_from_env() -> Dict[str, PrepProfile]:
+    """
+    Default profiles with overrides from MAYA_<KIND>_MAX_EDGE and MAYA_<KIND>_MAX_BYTES,
+    e.g. MAYA_SCREEN_MAX_EDGE=2560.
+    """
+    profiles = {}
+    for kind, profile in DEFAULT_PROFILES.items():
+        prefix = f"MAYA_{kind.upper()}_"
+        profiles[kind] = replace(
+            profile,
+            max_edge=int(os.getenv(prefix + "MAX_EDGE", profile.max_edge)),
+            max_bytes=int(os.getenv(prefix + "MAX_BYTES", profile.max_bytes)),
+        )
+    return profiles
+
+
+def fit_long_edge(size: Tuple[int, int], max_edge: int) -> Tuple[int, int]:
+    """Size scaled down (never up) so its longer side is at most max_edge."""
+    width, height = size
+    longest = max(width, height)
+    if longest <= max_edge:
+        return size
+    scale = max_edge / longest
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class ImagePreparer:
+    """Prepares images per content-type profile and keeps upload statistics."""
+
+    def __init__(self, profiles: Optional[Dict[str, PrepProfile]] = None, max_records: int = 100):
+        """
+        Args:
+            profiles: Profile per content type (defaults to DEFAULT_PROFILES)
+            max_records: Recent per-request records kept for stats()
+        """
+        profiles = dict(profiles or DEFAULT_PROFILES)
+        if not features.check("webp"):
+            # Pillow built without libwebp: fall back to JPEG at the same settings
+            profiles = {
+                kind: replace(profile, format="JPEG") if profile.format == "WEBP" else profile
+                for kind, profile in profiles.items()
+            }
+        self.profiles = profiles
+        self._lock = threading.Lock()
+        self._recent: deque = deque(maxlen=max_records)
+        self._totals: Dict[str, Dict[str, float]] = {}
+
+    def _encode(self, image: PIL.Image.Image, profile: PrepProfile, kind: str, quality: int) -> bytes:
+        buffer = io.BytesIO()
+        if profile.format == "JPEG":
+            # Full-resolution chroma keeps coloured text crisp on screenshots
+            image.save(buffer, format="JPEG", quality=quality, subsampling=0 if kind == SCREEN else 2, optimize=False)
+        else:
+            image.save(buffer, format=profile.format, quality=quality, method=4)
+        return buffer.getvalue()
+
+    def prepare(self, image: Any, kind: str = CAMERA, source_bytes: Optional[int] = None) -> PreparedImage:
+        """
+        Resize and encode an image for upload.
+
+        Args:
+            image: PIL image or BGR ndarray
+            kind: CAMERA or SCREEN
+            source_bytes: Size of the original file, when there is one (e.g. a screenshot PNG)
+
+        Returns:
+            PreparedImage: Encoded bytes with size, quality and timing
+        """
+        profile = self.profiles[kind]
+        started = time.perf_counter()
+        if not isinstance(image, PIL.Image.Image):
+            image = frame_to_image(image)
+        source_size = image.size
+
+        target = fit_long_edge(image.size, profile.max_edge)
+        if target != image.size:
+            image = image.resize(target, PIL.Image.Resampling.LANCZOS, reducing_gap=2.0)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        quality = profile.quality
+        data = self._encode(image, profile, kind, quality)
+        while len(data) > profile.max_bytes and quality > profile.min_quality:
+            quality = max(profile.min_quality, quality - 10)
+            data = self._encode(image, profile, kind, quality)
+
+        prepared = PreparedImage(
+            data=data,
+            mime_type=MIME_TYPES[profile.format],
+            kind=kind,
+            size=image.size,
+            source_size=source_size,
+            quality=quality,
+            encode_ms=round((time.perf_counter() - started) * 1000, 2),
+            source_bytes=source_bytes,
+        )
+        self._record(prepared)
+        return prepared
+
+    def _record(self, prepared: PreparedImage) -> None:
+        record = asdict(prepared)
+        del record["data"]
+        record["bytes"] = len(prepared.data)
+        with self._lock:
+            self._recent.append(record)
+            totals = self._totals.setdefault(
+                prepared.kind, {"images": 0, "bytes_sent": 0, "source_bytes": 0, "encode_ms": 0.0},
+            )
+            totals["images"] += 1
+            totals["bytes_sent"] += len(prepared.data)
+            totals["source_bytes"] += prepared.source_bytes or 0
+            totals["encode_ms"] += prepared.encode_ms
+        logger.info(
+            f"Prepared {prepared.kind} image {prepared.source_size} -> {prepared.size}: "
+            f"{len(prepared.data)} bytes at q{prepared.quality} in {prepared.encode_ms} ms"
+        )
+
+    def stats(self, recent: int = 10) -> Dict[str, Any]:
+        """Per-kind totals and averages plus the most recent per-request records."""
+        with self._lock:
+            kinds = {}
+            for kind, totals in self._totals.items():
+                images = totals["images"] or 1
+                kinds[kind] = {
+                    **totals,
+                    "encode_ms": round(totals["encode_ms"], 2),
+                    "avg_bytes": round(totals["bytes_sent"] / images),
+                    "avg_encode_ms": round(totals["encode_ms"] / images, 2),
+                }
+            return {"kinds": kinds, "recent": list(self._recent)[-recent:]}
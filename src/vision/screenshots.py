@@ -0,0 +1,232 @@
+"""
+Screenshot Watcher
+Keeps the newest image in the screenshots folder in memory, so a screenshare
+query resolves it in O(1) instead of stat-ing every file. File events come
+from watchdog (inotify on Linux, ReadDirectoryChangesW on Windows) when it
+is installed (requirements.txt); otherwise a polling thread stats the
+directory and the current latest file, and rescans the folder only when the
+directory's own mtime changes (files added, removed or renamed). The watcher starts on the first lookup, so it also follows the folder when
+the app is served by a WSGI server rather than run as a script. Screenshots
+Maya takes itself are registered directly.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCREENSHOT_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp', 'bmp'}
+
+
+def default_screenshot_dir() -> str:
+    """~/Pictures/Screenshots, where Windows and GNOME save screenshots."""
+    return os.path.join(os.path.expanduser("~"), "Pictures", "Screenshots")
+
+
+class ScreenshotWatcher:
+    """Tracks the most recently modified screenshot in one directory."""
+
+    def __init__(
+        self, directory: str, poll_interval: float = 1.0, use_watchdog: bool = True, autostart: bool = True,
+    ):
+        """
+        Args:
+            directory: Screenshots folder
+            poll_interval: Seconds between directory checks when polling
+            use_watchdog: Use watchdog file events when the package is installed
+            autostart: Start following the folder on the first latest() call
+        """
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.use_watchdog = use_watchdog
+        self.autostart = autostart
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        # (mtime_ns, path) of the newest screenshot
+        self._latest: Optional[Tuple[int, str]] = None
+        self._scanned = False
+        self._dir_mtime: Optional[int] = None
+        self._stopped = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer: Any = None
+        self.mode = "idle"
+        self.stats = {"lookups": 0, "scans": 0, "events": 0}
+
+    @staticmethod
+    def is_screenshot(name: str) -> bool:
+        return name.rsplit('.', 1)[-1].lower() in SCREENSHOT_EXTENSIONS
+
+    def rescan(self) -> Optional[str]:
+        """Full directory scan (startup, deletions, polling after a directory change)."""
+        latest: Optional[Tuple[int, str]] = None
+        try:
+            dir_mtime: Optional[int] = os.stat(self.directory).st_mtime_ns
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not self.is_screenshot(entry.name):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        candidate = (entry.stat().st_mtime_ns, entry.path)
+                    except OSError:
+                        continue
+                    if latest is None or candidate > latest:
+                        latest = candidate
+        except FileNotFoundError:
+            dir_mtime = None
+        with self._lock:
+            self._latest = latest
+            self._scanned = True
+            self._dir_mtime = dir_mtime
+            self.stats["scans"] += 1
+        return latest[1] if latest else None
+
+    def observe(self, path: str) -> None:
+        """Register a new or modified file (from a file event or an in-process capture)."""
+        if not self.is_screenshot(path):
+            return
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        with self._lock:
+            self.stats["events"] += 1
+            if self._latest is None or (mtime, path) >= self._latest:
+                self._latest = (mtime, path)
+
+    def latest(self) -> Optional[str]:
+        """Path of the newest screenshot, or None if there is none."""
+        if self.autostart and not self._stopped:
+            self.start()
+        with self._lock:
+            self.stats["lookups"] += 1
+            scanned, latest = self._scanned, self._latest
+        if not scanned:
+            return self.rescan()
+        if latest is not None and not os.path.exists(latest[1]):
+            # The newest file was deleted; the next newest needs a scan
+            return self.rescan()
+        return latest[1] if latest else None
+
+    def capture(self, grab: Callable[[], Any], filename: str = "Screenshot.png") -> str:
+        """
+        Take a screenshot in-process and make it the latest.
+
+        Args:
+            grab: Returns a PIL image of the screen (e.g. pyautogui.screenshot)
+            filename: File name inside the watched directory
+
+        Returns:
+            str: Saved path
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, filename)
+        grab().save(path)
+        self.observe(path)
+        return path
+
+    def start(self) -> None:
+        """Initial scan, then follow changes in the background (no-op if already running)."""
+        with self._start_lock:
+            if self._thread is not None or self._observer is not None:
+                return
+            self._stopped = False
+            os.makedirs(self.directory, exist_ok=True)
+            self.rescan()
+            if not (self.use_watchdog and self._start_watchdog()):
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._poll, name="maya-screenshots", daemon=True)
+                self._thread.start()
+                self.mode = "polling"
+        logger.info(f"Watching screenshots in {self.directory} ({self.mode})")
+
+    def _start_watchdog(self) -> bool:
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event: Any) -> None:
+                if not event.is_directory:
+                    watcher.observe(event.src_path)
+
+            def on_modified(self, event: Any) -> None:
+                self.on_created(event)
+
+            def on_moved(self, event: Any) -> None:
+                if not event.is_directory:
+                    watcher.observe(event.dest_path)
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), self.directory, recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+        self.mode = "watchdog"
+        return True
+
+    def check(self) -> bool:
+        """
+        One polling step, two stats: a full rescan only if the directory's mtime
+        changed (entries added, removed or renamed); otherwise the latest file is
+        re-stat'ed, since overwriting it in place leaves the directory's mtime alone.
+
+        Returns:
+            bool: Whether the newest screenshot changed
+        """
+        try:
+            dir_mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            return False
+        with self._lock:
+            before, changed = self._latest, dir_mtime != self._dir_mtime
+        if changed:
+            self.rescan()
+        elif before is not None:
+            try:
+                mtime = os.stat(before[1]).st_mtime_ns
+            except OSError:
+                self.rescan()
+            else:
+                if mtime != before[0]:
+                    with self._lock:
+                        if self._latest == before:
+                            self._latest = (mtime, before[1])
+        with self._lock:
+            return self._latest != before
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def stop(self) -> None:
+        """Stop following the folder; lookups no longer restart it (start() does)."""
+        with self._start_lock:
+            self._stopped = True
+            self._stop.set()
+            if self._observer is not None:
+                self._observer.stop()
+                self._observer.join(timeout=2)
+                self._observer = None
+            if self._thread is not None:
+                self._thread.join(timeout=2)
+                self._thread = None
+            self.mode = "idle"
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            latest = self._latest
+            return {
+                **self.stats,
+                "mode": self.mode,
+                "directory": self.directory,
+                "latest": latest[1] if latest else None,
+                "latest_mtime": latest[0] / 1e9 if latest else None,
+            }
@@ -0,0 +1,225 @@
+"""
+Face Tracking
+Detect-then-track pipeline for continuous face recognition. Faces are
+detected on a downscaled frame every few frames and associated with existing
+tracks by box overlap; between detections, tracks coast on their last
+velocity. A track is encoded and identified once, when it first appears, and
+keeps its identity until it is lost, so the steady-state cost per frame is
+box bookkeeping rather than HOG detection plus 128-d encodings.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .frames import bgr_to_rgb
+
+logger = logging.getLogger(__name__)
+
+# (top, right, bottom, left), the face_recognition box order
+Box = Tuple[float, float, float, float]
+
+# RGB image -> face boxes
+Detector = Callable[[np.ndarray], Sequence[Box]]
+# (RGB image, integer boxes) -> one encoding per box
+Encoder = Callable[[np.ndarray, List[Tuple[int, int, int, int]]], Sequence[Sequence[float]]]
+
+
+def iou(a: Box, b: Box) -> float:
+    """Intersection over union of two boxes."""
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    inter = max(0.0, right - left) * max(0.0, bottom - top)
+    if inter <= 0:
+        return 0.0
+    area_a = (a[1] - a[3]) * (a[2] - a[0])
+    area_b = (b[1] - b[3]) * (b[2] - b[0])
+    return inter / (area_a + area_b - inter)
+
+
+@dataclass
+class Track:
+    id: int
+    box: Box
+    velocity: Box = (0.0, 0.0, 0.0, 0.0)
+    name: Optional[str] = None
+    distance: float = float("inf")
+    encoding: Optional[List[float]] = None
+    # Box and frame index of the last detection matched to this track
+    anchor: Optional[Box] = None
+    anchor_frame: int = 0
+    hits: int = 1
+    missed: int = 0
+
+    @property
+    def label(self) -> str:
+        return self.name or "Unknown"
+
+    def int_box(self) -> Tuple[int, int, int, int]:
+        return tuple(int(round(v)) for v in self.box)
+
+
+class FaceTracker:
+    """
+    Tracks faces across frames of one camera.
+
+    update() is idempotent per frame sequence number, so the capture thread and
+    request threads can both call it for the newest frame.
+    """
+
+    def __init__(
+        self,
+        detect: Detector,
+        encode: Encoder,
+        downscale: int = 2,
+        detect_every: int = 5,
+        iou_threshold: float = 0.3,
+        max_missed: int = 2,
+        retry_unknown_every: int = 3,
+    ):
+        """
+        Args:
+            detect: Face detector run on the downscaled RGB frame
+            encode: Face encoder run on the full-resolution RGB frame for new tracks
+            downscale: Integer factor the frame is shrunk by before detection
+            detect_every: Frames between detections (tracks coast in between)
+            iou_threshold: Minimum overlap for a detection to continue a track
+            max_missed: Detections a track may miss before it is dropped
+            retry_unknown_every: Detections between re-encodes of unidentified tracks (0 never retries)
+        """
+        self.detect = detect
+        self.encode = encode
+        self.downscale = max(1, downscale)
+        self.detect_every = max(1, detect_every)
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.retry_unknown_every = retry_unknown_every
+        self._lock = threading.Lock()
+        self._tracks: List[Track] = []
+        self._next_id = 1
+        self._frames = 0
+        self._last_seq: Optional[int] = None
+        self._gallery: Any = None
+        self.stats = {"frames": 0, "detections": 0, "encodings": 0, "tracks_started": 0, "tracks_lost": 0}
+
+    @property
+    def tracks(self) -> List[Track]:
+        with self._lock:
+            return list(self._tracks)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tracks = []
+            self._frames = 0
+            self._last_seq = None
+
+    def update(self, image: np.ndarray, gallery: Any, seq: Optional[int] = None) -> List[Track]:
+        """
+        Advance the tracks to this frame.
+
+        Args:
+            image: BGR frame
+            gallery: FaceGallery the tracks are identified against
+            seq: Frame sequence number; a frame at or before the last one processed (a
+                repeat, or an older frame from a concurrent caller) returns the current tracks
+
+        Returns:
+            List[Track]: Live tracks for this frame
+        """
+        with self._lock:
+            if seq is not None and self._last_seq is not None and seq <= self._last_seq:
+                return list(self._tracks)
+            self._last_seq = seq
+            self.stats["frames"] += 1
+
+            if gallery is not self._gallery:
+                # Gallery swapped: identities are re-matched from the stored encodings
+                self._gallery = gallery
+                self._identify([track for track in self._tracks if track.encoding is not None])
+
+            if self._frames % self.detect_every == 0:
+                self._detect_and_associate(image)
+            else:
+                for track in self._tracks:
+                    track.box = tuple(b + v for b, v in zip(track.box, track.velocity))
+            self._frames += 1
+            return list(self._tracks)
+
+    def _detect_and_associate(self, image: np.ndarray) -> None:
+        step = self.downscale
+        small = bgr_to_rgb(image[::step, ::step])
+        detections = [tuple(float(v) * step for v in box) for box in self.detect(small)]
+        self.stats["detections"] += 1
+
+        # Greedy association, best overlap first
+        pairs = sorted(
+            ((iou(track.box, box), t, d) for t, track in enumerate(self._tracks) for d, box in enumerate(detections)),
+            reverse=True,
+        )
+        matched_tracks, matched_detections = set(), set()
+        for overlap, t, d in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if t in matched_tracks or d in matched_detections:
+                continue
+            matched_tracks.add(t)
+            matched_detections.add(d)
+            track = self._tracks[t]
+            frames = max(1, self._frames - track.anchor_frame)
+            track.velocity = tuple((new - old) / frames for new, old in zip(detections[d], track.anchor))
+            track.box = track.anchor = detections[d]
+            track.anchor_frame = self._frames
+            track.missed = 0
+            track.hits += 1
+
+        survivors: List[Track] = []
+        for t, track in enumerate(self._tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+                track.velocity = (0.0, 0.0, 0.0, 0.0)
+                if track.missed > self.max_missed:
+                    self.stats["tracks_lost"] += 1
+                    continue
+            survivors.append(track)
+
+        new_tracks = []
+        for d, box in enumerate(detections):
+            if d not in matched_detections:
+                new_tracks.append(Track(id=self._next_id, box=box, anchor=box, anchor_frame=self._frames))
+                self._next_id += 1
+        self.stats["tracks_started"] += len(new_tracks)
+
+        to_encode = new_tracks
+        if self.retry_unknown_every:
+            to_encode = to_encode + [
+                track for track in survivors
+                if track.name is None and track.missed == 0 and track.hits % self.retry_unknown_every == 0
+            ]
+        self._tracks = survivors + new_tracks
+        if to_encode:
+            self._encode(image, to_encode)
+
+    def _encode(self, image: np.ndarray, tracks: List[Track]) -> None:
+        height, width = image.shape[:2]
+        boxes = []
+        for track in tracks:
+            top, right, bottom, left = track.int_box()
+            boxes.append((max(0, top), min(width, right), min(height, bottom), max(0, left)))
+        encodings = self.encode(bgr_to_rgb(image), boxes)
+        self.stats["encodings"] += len(encodings)
+        for track, encoding in zip(tracks, encodings):
+            track.encoding = [float(x) for x in encoding]
+        self._identify([track for track in tracks if track.encoding is not None])
+
+    def _identify(self, tracks: List[Track]) -> None:
+        if not tracks:
+            return
+        if self._gallery is None:
+            for track in tracks:
+                track.name, track.distance = None, float("inf")
+            return
+        for track, (name, distance) in zip(tracks, self._gallery.match([track.encoding for track in tracks])):
+            track.name, track.distance = name, distance
@@ -7,6 +7,6 @@ echo Project: C:\Users\Ahad Malik\Goated-Projects\Maya-3x
 echo.
 
 cd /d "C:\Users\Ahad Malik\Goated-Projects\Maya-3x"
-"C:\Users\Ahad Malik\AppData\Local\Programs\Python\Python312\python.exe" src\config\app2.py
+"C:\Users\Ahad Malik\AppData\Local\Programs\Python\Python312\python.exe" src\config\run_backend.py
 
 pause
@@ -6,4 +6,4 @@ Write-Host "Project: C:\Users\Ahad Malik\Goated-Projects\Maya-3x" -ForegroundCol
 Write-Host ""
 
 Set-Location "C:\Users\Ahad Malik\Goated-Projects\Maya-3x"
-& "C:\Users\Ahad Malik\AppData\Local\Programs\Python\Python312\python.exe" src\config\app2.py
+& "C:\Users\Ahad Malik\AppData\Local\Programs\Python\Python312\python.exe" src\config\run_backend.py
@@ -5,6 +5,7 @@ from typing import Iterable, List
 
 import pytest
 
+from tests.harness.clock import FakeClock
 from tests.harness.data_generation import (
     generate_memory_queries,
     generate_privacy_queries,
@@ -83,3 +84,8 @@ def security_events(evaluation_seed: int):
 @pytest.fixture(scope="session")
 def metrics_store() -> MetricsStore:
     return MetricsStore()
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+
+class FakeClock:
+    """Manual time source for components that take a `clock` callable; set or advance `now`."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
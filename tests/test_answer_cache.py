@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import List
+
+from src.memory import MemoryIndex
+from src.memory.answer_cache import SemanticAnswerCache
+from tests.harness.clock import FakeClock
+
+
+def test_near_identical_query_hits_and_distant_query_misses() -> None:
+    cache = SemanticAnswerCache(similarity_threshold=0.95)
+    cache.store("what's my wifi password", [1.0, 0.0, 0.1], "wifi: hunter2", "It's hunter2.")
+
+    hit = cache.lookup([0.98, 0.0, 0.12])
+    assert hit is not None and hit.answer == "It's hunter2."
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_answers_only_hit_within_their_scope() -> None:
+    cache = SemanticAnswerCache()
+    cache.store("what did I just say", [1.0, 0.0], "", "You said hi.", scope="session-a")
+
+    assert cache.lookup([1.0, 0.0], scope="session-b") is None
+    assert cache.lookup([1.0, 0.0]) is None
+    hit = cache.lookup([1.0, 0.0], scope="session-a")
+    assert hit is not None and hit.answer == "You said hi."
+
+
+def test_unembedded_answers_hit_on_the_same_question_text() -> None:
+    cache = SemanticAnswerCache()
+    cache.store("What's my wifi password?", None, "wifi: hunter2", "It's hunter2.", scope="s1")
+
+    hit = cache.lookup_text("what's my  WIFI password", scope="s1")
+    assert hit is not None and hit.answer == "It's hunter2."
+    assert cache.lookup_text("what's my wifi password", scope="s2") is None
+    assert cache.lookup_text("what's my email password", scope="s1") is None
+    # Only text lookups can hit an entry stored without an embedding
+    assert cache.lookup([1.0, 0.0], scope="s1") is None
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 3
+
+
+def test_entries_expire_after_ttl(clock: FakeClock) -> None:
+    cache = SemanticAnswerCache(ttl_seconds=60, clock=clock)
+    cache.store("dentist", [1.0, 0.0], "", "Friday.")
+
+    clock.now = 61
+    assert cache.lookup([1.0, 0.0]) is None
+    assert len(cache) == 0
+
+    cache.store("dentist", None, "", "Friday.")
+    clock.now = 122
+    assert cache.lookup_text("dentist") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = SemanticAnswerCache(max_entries=2)
+    cache.store("a", [1.0, 0.0, 0.0], "", "A")
+    cache.store("b", [0.0, 1.0, 0.0], "", "B")
+    cache.lookup([1.0, 0.0, 0.0])
+    cache.store("c", [0.0, 0.0, 1.0], "", "C")
+
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.lookup([1.0, 0.0, 0.0]) is not None
+    assert cache.stats["evictions"] == 1
+    assert cache.lookup_text("b") is None and cache.lookup_text("c") is not None
+
+
+def test_memory_changes_invalidate_cached_answers() -> None:
+    corpus: List[str] = ["dentist on friday"]
+    index = MemoryIndex(
+        load_documents=lambda: list(corpus),
+        build_vector_store=list,
+        build_retriever=lambda store, documents: store,
+    )
+    cache = SemanticAnswerCache()
+    index.add_listener(cache.clear)
+    index.warm()
+
+    version = index.version
+    cache.store("dentist?", [1.0], "dentist on friday", "Friday.", corpus_version=version)
+    assert len(cache) == 1
+
+    index.ingest("dentist moved to monday")
+    assert len(cache) == 0
+
+    # An answer computed against the old corpus is not cached
+    cache.store("dentist?", [1.0], "dentist on friday", "Friday.", corpus_version=version)
+    assert len(cache) == 0
+
+    cache.store("dentist?", [1.0], "", "Monday.", corpus_version=index.version)
+    index.invalidate()
+    assert cache.lookup([1.0]) is None
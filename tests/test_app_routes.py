@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import importlib
+import json
+from contextlib import ExitStack
+from types import ModuleType, SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+from src.memory.answer_cache import SemanticAnswerCache
+from src.serving import OutboundLimiter
+
+# Everything src/config/app2.py imports at module level beyond the stdlib
+APP_DEPENDENCIES = (
+    "flask", "flask_cors", "flask_sqlalchemy", "google.generativeai", "langchain_google_genai",
+    "langchain_community", "chromadb", "exa_py", "cv2", "face_recognition", "deepgram", "pyautogui",
+)
+
+
+@pytest.fixture(scope="module")
+def app2(tmp_path_factory: pytest.TempPathFactory) -> Iterator[ModuleType]:
+    for name in APP_DEPENDENCIES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:  # pyautogui raises more than ImportError without a display
+            pytest.skip(f"app2 needs {name}: {e}")
+
+    data = tmp_path_factory.mktemp("maya")
+    patch = pytest.MonkeyPatch()
+    for var, value in {
+        "DEEPGRAM_API_KEY": "test",
+        "MAYA_MEMORY_STORE_DIR": str(data / "memory_store"),
+        "MAYA_LEGACY_MEMORY_FILE": str(data / "data.txt"),
+        "MAYA_VECTOR_STORE_DIR": str(data / "vector_store"),
+        "MAYA_EMBEDDING_CACHE_PATH": str(data / "embedding_cache.db"),
+        "MAYA_SESSION_STORE_PATH": str(data / "sessions.db"),
+        "MAYA_FACE_CACHE_PATH": str(data / "face_encodings.db"),
+        "MAYA_SCREENSHOT_DIR": str(data / "screenshots"),
+    }.items():
+        patch.setenv(var, value)
+    try:
+        yield importlib.import_module("src.config.app2")
+    finally:
+        patch.undo()
+
+
+class FakeModel:
+    def __init__(self, pieces: List[str], fail: Optional[Exception] = None) -> None:
+        self.pieces = pieces
+        self.fail = fail
+        self.calls: List[Any] = []
+
+    def generate_content(self, contents: Any, stream: bool = False) -> Any:
+        self.calls.append(contents)
+
+        def chunks() -> Iterator[SimpleNamespace]:
+            for piece in self.pieces:
+                yield SimpleNamespace(text=piece)
+            if self.fail is not None:
+                raise self.fail
+
+        if stream:
+            return chunks()
+        return SimpleNamespace(text="".join(self.pieces), resolve=lambda: None)
+
+
+class FakeIndex:
+    version = 1
+
+    def __init__(self, lexical_hit: bool = False) -> None:
+        self.lexical_hit = lexical_hit
+
+    def needs_query_embedding(self, query: str) -> bool:
+        return not self.lexical_hit
+
+    def retrieve_context(self, query: str) -> str:
+        return "Dentist on Friday."
+
+
+@pytest.fixture
+def client(app2: ModuleType, monkeypatch: pytest.MonkeyPatch) -> Any:
+    monkeypatch.setattr(app2, "memory_index", FakeIndex())
+    monkeypatch.setattr(app2, "memory_embeddings", SimpleNamespace(embed_query=lambda text: [1.0, 0.0]))
+    monkeypatch.setattr(app2, "answer_cache", SemanticAnswerCache())
+    monkeypatch.setattr(app2, "model", FakeModel(["When is ", "the dentist? Friday."]))
+    return app2.app.test_client()
+
+
+def start_chat(client: Any, session_id: str) -> None:
+    assert client.post("/start_chat", json={"session_id": session_id}).status_code == 200
+
+
+def stream(client: Any, session_id: str, message: str) -> List[Tuple[str, Dict[str, Any]]]:
+    response = client.post("/send_message_stream", json={"session_id": session_id, "message": message, "mode": "chat"})
+    assert response.mimetype == "text/event-stream"
+    events = []
+    for frame in response.get_data(as_text=True).strip().split("\n\n"):
+        event, data = frame.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_stream_sends_tokens_then_done(app2: ModuleType, client: Any) -> None:
+    start_chat(client, "stream-done")
+
+    events = stream(client, "stream-done", "when is the dentist")
+
+    assert events == [
+        ("token", {"text": "When is "}),
+        ("token", {"text": "the dentist? Friday."}),
+        ("done", {"response": "When is the dentist? Friday."}),
+    ]
+    assert app2.chat_sessions["stream-done"]["last_response"] == "When is the dentist? Friday."
+
+
+def test_stream_serves_a_cached_answer_without_generating(app2: ModuleType, client: Any) -> None:
+    start_chat(client, "stream-cached")
+    app2.answer_cache.store("when is the dentist", [1.0, 0.0], "", "Friday.", scope="stream-cached")
+
+    events = stream(client, "stream-cached", "when's the dentist")
+
+    assert events == [("token", {"text": "Friday."}), ("done", {"response": "Friday."})]
+    assert app2.model.calls == []
+
+
+def test_repeated_lexical_hit_is_answered_from_the_cache(
+    app2: ModuleType, client: Any, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app2, "memory_index", FakeIndex(lexical_hit=True))
+
+    def no_embedding(text: str) -> List[float]:
+        raise AssertionError("a lexical hit must not embed the query")
+
+    monkeypatch.setattr(app2, "memory_embeddings", SimpleNamespace(embed_query=no_embedding))
+    start_chat(client, "stream-lexical")
+
+    first = stream(client, "stream-lexical", "When is my dentist appointment?")
+    again = stream(client, "stream-lexical", "when is my dentist appointment")
+
+    assert again == first
+    assert len(app2.model.calls) == 1
+    assert app2.answer_cache.stats["hits"] == 1 and app2.answer_cache.stats["misses"] == 1
+
+
+def test_stream_reports_generation_failures_as_an_error_event(
+    app2: ModuleType, client: Any, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app2, "model", FakeModel(["Fri"], fail=RuntimeError("connection reset")))
+    start_chat(client, "stream-error")
+
+    events = stream(client, "stream-error", "when is the dentist")
+
+    assert events == [("token", {"text": "Fri"}), ("error", {"error": "connection reset"})]
+
+
+def test_stream_for_unknown_session_is_404(client: Any) -> None:
+    response = client.post("/send_message_stream", json={"session_id": "missing", "message": "hi"})
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def saturated(app2: ModuleType, monkeypatch: pytest.MonkeyPatch) -> Iterator[OutboundLimiter]:
+    """Every outbound service has one slot, already taken, and callers give up at once."""
+    limiter = OutboundLimiter(default_limit=1, acquire_timeout=0.01)
+    monkeypatch.setattr(app2, "outbound", limiter)
+    with ExitStack() as held:
+        for service in ("gemini", "embeddings", "openai"):
+            held.enter_context(limiter.limit(service))
+        yield limiter
+
+
+def test_send_message_answers_503_when_upstream_is_saturated(client: Any, saturated: OutboundLimiter) -> None:
+    start_chat(client, "busy-send")
+
+    response = client.post("/send_message", json={"session_id": "busy-send", "message": "when is the dentist"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert "embeddings" in response.get_json()["error"]
+
+
+def test_stream_answers_503_before_any_event_when_saturated(client: Any, saturated: OutboundLimiter) -> None:
+    start_chat(client, "busy-stream")
+
+    response = client.post("/send_message_stream", json={"session_id": "busy-stream", "message": "when is the dentist"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_realtime_token_answers_503_when_saturated(
+    app2: ModuleType, client: Any, saturated: OutboundLimiter, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app2, "OPENAI_API_KEY", "test")
+
+    response = client.get("/realtime/token")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.parametrize("path", ["/memory/entries", "/memory/search?q=dentist&"])
+def test_memory_listing_rejects_a_bad_limit(client: Any, path: str) -> None:
+    separator = "" if path.endswith("&") else "?"
+    for limit in ("abc", "0", "-1"):
+        response = client.get(f"{path}{separator}limit={limit}")
+        assert response.status_code == 400
+    assert client.get(f"{path}{separator}limit=5").status_code == 200
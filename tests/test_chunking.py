@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from src.memory.chunking import chunk_memory_text
+
+MEMORY = """Sarah's birthday is on 3 March
+The code for locker 12 is blue-4821
+
+APPOINTMENTS:
+dentist check-up on 4 June
+meeting with Omar from Google on 9 July
+
+Chat Summary (2024-05-01 10:00:00):
+We discussed an essay outline.
+
+Lena mentioned that Project Nova ships on 12 May.
+
+[MCP Notion search] Query: watchlist, Result: {'results': ['Dune'], 'count': 1}
+Faiz prefers tea over coffee
+"""
+
+
+def test_each_entry_becomes_its_own_chunk() -> None:
+    chunks = chunk_memory_text(MEMORY)
+
+    assert [chunk.metadata["type"] for chunk in chunks] == [
+        "remember", "remember", "section", "chat_summary", "chat_summary", "mcp_notion", "remember",
+    ]
+    assert chunks[0].text == "Sarah's birthday is on 3 March"
+    assert chunks[2].metadata["heading"] == "APPOINTMENTS"
+    assert chunks[2].text.endswith("meeting with Omar from Google on 9 July")
+    assert chunks[5].metadata["action"] == "search"
+
+
+def test_summary_paragraphs_keep_their_header() -> None:
+    summaries = [chunk for chunk in chunk_memory_text(MEMORY) if chunk.metadata["type"] == "chat_summary"]
+
+    assert all(chunk.text.startswith("Chat Summary (2024-05-01 10:00:00):\n") for chunk in summaries)
+    assert summaries[1].text.endswith("Project Nova ships on 12 May.")
+    assert summaries[0].metadata["timestamp"] == "2024-05-01 10:00:00"
+
+
+def test_long_entries_are_windowed_and_metadata_is_copied() -> None:
+    text = " ".join(f"Sentence number {i} is about the garden." for i in range(40))
+    chunks = chunk_memory_text(text, max_chars=200, metadata={"source": "data.txt"})
+
+    assert len(chunks) > 1
+    assert all(len(chunk.text) <= 200 for chunk in chunks)
+    assert all(chunk.metadata == {"source": "data.txt", "type": "remember"} for chunk in chunks)
+
+
+def test_appended_entry_chunks_like_the_full_file() -> None:
+    entry = "Chat Summary (2024-06-02 09:30:00):\nWe planned a trip to Goa."
+    appended = chunk_memory_text(entry)
+    full = chunk_memory_text(MEMORY + "\n" + entry + "\n")
+
+    assert [chunk.text for chunk in appended] == [chunk.text for chunk in full[-len(appended):]]
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+from typing import List, Sequence
+
+from src.sessions import ConversationContext, Turn
+from src.sessions.context import SUMMARY_PREFIX, fit_recent
+
+
+def prompt_tokens(context: ConversationContext) -> int:
+    return sum(len(part["text"]) // 4 for content in context.messages() for part in content["parts"])
+
+
+def test_turns_are_recorded_once_and_sent_verbatim() -> None:
+    context = ConversationContext(max_tokens=1000)
+    context.add("model", "Hello!")
+    context.add_exchange("[Chat Query] hi", "Hi there.")
+
+    contents = context.messages("Context: none\n\nUser: how are you")
+    assert [content["role"] for content in contents] == ["model", "user", "model", "user"]
+    assert contents[-1]["parts"] == ["Context: none\n\nUser: how are you"]
+    assert len(context.transcript()) == 3
+
+
+def test_compaction_folds_old_turns_into_the_summary() -> None:
+    calls: List[int] = []
+
+    def summarizer(previous: str, turns: Sequence[Turn], max_tokens: int) -> str:
+        calls.append(len(turns))
+        return (previous + " " + " ".join(turn.text.split()[0] for turn in turns)).strip()
+
+    context = ConversationContext(max_tokens=200, summary_tokens=50, min_recent_turns=2, summarizer=summarizer)
+    for i in range(10):
+        context.add_exchange(f"question{i} " + "x" * 60, f"answer{i} " + "y" * 60)
+
+    assert context.needs_compaction()
+    folded = context.compact()
+    assert folded == calls[0] > 0
+    assert not context.needs_compaction()
+    assert context.summary.startswith("question0 answer0")
+
+    contents = context.messages()
+    assert contents[0]["parts"][0]["text"].startswith(SUMMARY_PREFIX)
+    assert contents[-1]["parts"][0]["text"].startswith("answer9")
+
+
+def test_prompt_size_stays_flat_even_before_compaction_runs() -> None:
+    context = ConversationContext(max_tokens=300, summary_tokens=50)
+    sizes = []
+    for i in range(100):
+        context.add_exchange(f"question {i} " + "x" * 80, f"answer {i} " + "y" * 80)
+        sizes.append(prompt_tokens(context))
+        if i % 10 == 9:
+            context.compact()
+
+    assert max(sizes) <= 300
+    assert context.stats["compactions"] > 0 and context.stats["trimmed_prompts"] > 0
+    assert context.token_usage()["turns"] <= 250
+
+
+def test_failing_summarizer_falls_back_to_extractive_summary() -> None:
+    def broken(previous: str, turns: Sequence[Turn], max_tokens: int) -> str:
+        raise RuntimeError("quota")
+
+    context = ConversationContext(max_tokens=100, summary_tokens=20, min_recent_turns=1, summarizer=broken)
+    for i in range(6):
+        context.add_exchange(f"Where is item {i}? " + "x" * 40, f"In drawer {i}. " + "y" * 40)
+
+    assert context.compact() > 0
+    assert context.summary.endswith("User: Where is item 4?\nMaya: In drawer 4.")
+
+
+def test_fit_recent_keeps_the_newest_items() -> None:
+    assert fit_recent(["a" * 40, "b" * 40, "c" * 40], max_tokens=20) == ["b" * 40, "c" * 40]
+
+
+def test_transcript_cursor_returns_only_new_turns() -> None:
+    context = ConversationContext(max_transcript=4)
+    context.add("model", "Hello!")
+    context.add_exchange("[Chat Query] hi", "Hi there.")
+    assert context.cursor == 3
+
+    turns, cursor = context.transcript_json(since=1)
+    assert [json.loads(turn)["parts"][0]["text"] for turn in turns] == ["[Chat Query] hi", "Hi there."]
+    assert context.transcript_json(since=cursor) == ([], 3)
+
+    context.add_exchange("[Chat Query] again", "Sure.")
+    assert [turn["id"] for turn in context.transcript()] == [2, 3, 4, 5]
+    assert [turn["id"] for turn in context.transcript(since=0)] == [2, 3, 4, 5]
+    assert [turn["id"] for turn in context.transcript(since=4)] == [5]
+
+
+def test_turn_ids_survive_a_snapshot_round_trip() -> None:
+    context = ConversationContext()
+    context.add_exchange("[Chat Query] hi", "Hi there.")
+    restored = ConversationContext().load_state(context.to_state())
+
+    assert restored.transcript() == context.transcript()
+    assert restored.add("user", "next").id == 3
+
+
+def test_history_covers_the_whole_conversation_beyond_the_display_window() -> None:
+    def summarizer(previous: str, turns: Sequence[Turn], max_tokens: int) -> str:
+        return (previous + " " + " ".join(turn.text.split()[0] for turn in turns)).strip()
+
+    context = ConversationContext(
+        max_tokens=200, summary_tokens=50, min_recent_turns=2, summarizer=summarizer, max_transcript=4,
+    )
+    for i in range(10):
+        context.add_exchange(f"question{i} " + "x" * 60, f"answer{i} " + "y" * 60)
+
+    # The display transcript is truncated to the last max_transcript turns
+    assert [turn["parts"][0]["text"].split()[0] for turn in context.transcript()] == [
+        "question8", "answer8", "question9", "answer9",
+    ]
+
+    # Before compaction every turn is verbatim
+    assert len(context.history()) == 20
+    context.compact()
+    history = context.history()
+    texts = [content["parts"][0]["text"] for content in history]
+    assert texts[0].startswith(SUMMARY_PREFIX) and "question0" in texts[0]
+    assert texts[-1].startswith("answer9")
+    # Summary + acknowledgement + the turns that were not folded
+    assert len(history) == 2 + 20 - context.stats["folded_turns"]
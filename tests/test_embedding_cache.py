@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from src.memory.embedding_cache import CachedEmbeddings, EmbeddingCache
+from src.memory.vector_store import sync_vector_store
+
+
+class CountingEmbeddings:
+    def __init__(self) -> None:
+        self.embedded: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.embedded.append(text)
+        return [float(len(text)), 0.0]
+
+
+@dataclass
+class Doc:
+    page_content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class FakeVectorStore:
+    def __init__(self, embeddings: CachedEmbeddings) -> None:
+        self.embeddings = embeddings
+        self.rows: Dict[str, List[float]] = {}
+
+    def get(self, include: List[str]) -> Dict[str, List[str]]:
+        return {"ids": list(self.rows)}
+
+    def delete(self, ids: List[str]) -> None:
+        for chunk_id in ids:
+            del self.rows[chunk_id]
+
+    def add_documents(self, documents: List[Doc], ids: List[str]) -> None:
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        self.rows.update(zip(ids, vectors))
+
+
+def test_cache_survives_reopen_and_skips_known_chunks(tmp_path) -> None:
+    path = str(tmp_path / "embeddings.db")
+    api = CountingEmbeddings()
+    cached = CachedEmbeddings(api, EmbeddingCache(path), "models/embedding-001")
+
+    first = cached.embed_documents(["dentist on friday", "cat to the vet"])
+    cached.cache.close()
+
+    reopened = CachedEmbeddings(api, EmbeddingCache(path), "models/embedding-001")
+    second = reopened.embed_documents(["cat to the vet", "dentist on friday", "new note"])
+
+    assert api.embedded == ["dentist on friday", "cat to the vet", "new note"]
+    assert second[:2] == [first[1], first[0]]
+
+
+def test_cache_key_includes_model_name(tmp_path) -> None:
+    cache = EmbeddingCache(str(tmp_path / "embeddings.db"))
+    api = CountingEmbeddings()
+
+    CachedEmbeddings(api, cache, "model-a").embed_documents(["hello"])
+    CachedEmbeddings(api, cache, "model-b").embed_documents(["hello"])
+
+    assert api.embedded == ["hello", "hello"]
+
+
+def test_query_and_document_vectors_are_never_shared(tmp_path) -> None:
+    api = CountingEmbeddings()
+    cached = CachedEmbeddings(api, EmbeddingCache(str(tmp_path / "embeddings.db")), "m")
+
+    document = cached.embed_documents(["cat to the vet"])[0]
+    query = cached.embed_query("cat to the vet")
+
+    assert document != query
+    assert api.embedded == ["cat to the vet", "cat to the vet"]
+
+
+def test_query_embeddings_stay_in_a_bounded_memory_lru(tmp_path) -> None:
+    api = CountingEmbeddings()
+    cache = EmbeddingCache(str(tmp_path / "embeddings.db"))
+    cached = CachedEmbeddings(api, cache, "m", query_cache_size=2)
+
+    cached.embed_query("a")
+    cached.embed_query("b")
+    cached.embed_query("a")
+    cached.embed_query("c")  # evicts "b", the least recently used
+    cached.embed_query("a")
+    cached.embed_query("b")
+
+    assert api.embedded == ["a", "b", "c", "b"]
+    assert len(cache) == 0
+
+
+def test_rows_from_the_untyped_key_scheme_are_dropped(tmp_path) -> None:
+    path = str(tmp_path / "embeddings.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+    conn.execute("INSERT INTO embeddings VALUES ('old', x'00')")
+    conn.commit()
+    conn.close()
+
+    assert len(EmbeddingCache(path)) == 0
+    cache = EmbeddingCache(path)
+    cache.put_many({"new": [1.0]})
+    assert len(EmbeddingCache(path)) == 1
+
+
+def test_sync_only_embeds_new_chunks_and_drops_stale(tmp_path) -> None:
+    api = CountingEmbeddings()
+    store = FakeVectorStore(CachedEmbeddings(api, EmbeddingCache(str(tmp_path / "e.db")), "m"))
+
+    assert sync_vector_store(store, [Doc("a"), Doc("b"), Doc("b")], "m") == {
+        "added": 2, "removed": 0, "kept": 0,
+    }
+    stats = sync_vector_store(store, [Doc("b"), Doc("c")], "m")
+
+    assert stats == {"added": 1, "removed": 1, "kept": 1}
+    assert api.embedded == ["a", "b", "c"]
+    assert len(store.rows) == 2
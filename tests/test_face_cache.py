@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+from src.vision import FaceEncodingCache, encode_gallery
+
+
+class FakeEncoder:
+    """Encodes an image as [first byte, file size]; files starting with 'x' have no face."""
+
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    def __call__(self, path: str) -> Optional[List[float]]:
+        self.calls.append(Path(path).name)
+        data = Path(path).read_bytes()
+        if data.startswith(b"x"):
+            return None
+        return [float(data[0]), float(len(data))]
+
+
+def write_image(root: Path, person: str, name: str, data: bytes) -> Path:
+    path = root / person / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_only_new_or_changed_images_are_encoded(tmp_path: Path) -> None:
+    gallery = tmp_path / "known_faces"
+    write_image(gallery, "Ahad", "a.jpg", b"aaaa")
+    write_image(gallery, "Ahad", "noface.jpg", b"xxxx")
+    write_image(gallery, "Grace", "g.png", b"gg")
+    write_image(gallery, "Grace", "notes.txt", b"not an image")
+    cache = FaceEncodingCache(str(tmp_path / "faces.db"))
+    encoder = FakeEncoder()
+
+    encodings, names = encode_gallery(str(gallery), cache, encoder)
+    assert names == ["Ahad", "Grace"]
+    assert encodings == [[97.0, 4.0], [103.0, 2.0]]
+    assert sorted(encoder.calls) == ["a.jpg", "g.png", "noface.jpg"]
+
+    encoder.calls.clear()
+    assert encode_gallery(str(gallery), cache, encoder) == (encodings, names)
+    assert encoder.calls == []
+
+    # A changed photo and a new copy of a known photo: only the changed content is encoded
+    write_image(gallery, "Grace", "g.png", b"ggg")
+    write_image(gallery, "Grace", "copy.jpg", b"aaaa")
+    encodings, names = encode_gallery(str(gallery), cache, encoder)
+    assert encoder.calls == ["g.png"]
+    assert names == ["Ahad", "Grace", "Grace"]
+    assert encodings[1:] == [[97.0, 4.0], [103.0, 3.0]]
+
+
+def test_cache_persists_and_prunes_removed_images(tmp_path: Path) -> None:
+    gallery = tmp_path / "known_faces"
+    keep = write_image(gallery, "Ahad", "a.jpg", b"aaaa")
+    gone = write_image(gallery, "Ahad", "b.jpg", b"bbbb")
+    cache = FaceEncodingCache(str(tmp_path / "faces.db"))
+    encode_gallery(str(gallery), cache, FakeEncoder())
+    assert len(cache) == 2
+    cache.close()
+
+    gone.unlink()
+    reopened = FaceEncodingCache(str(tmp_path / "faces.db"))
+    encoder = FakeEncoder()
+    encodings, names = encode_gallery(str(gallery), reopened, encoder)
+
+    assert encoder.calls == []
+    assert (encodings, names) == ([[97.0, 4.0]], ["Ahad"])
+    assert len(reopened) == 1
+    assert reopened.stats["pruned"] == 1
+    assert keep.exists()
+
+
+def test_failed_encodings_are_retried(tmp_path: Path) -> None:
+    gallery = tmp_path / "known_faces"
+    write_image(gallery, "Ahad", "a.jpg", b"aaaa")
+    cache = FaceEncodingCache(str(tmp_path / "faces.db"))
+
+    def broken(path: str) -> Optional[List[float]]:
+        raise ValueError("corrupt image")
+
+    assert encode_gallery(str(gallery), cache, broken) == ([], [])
+    assert cache.stats["failed"] == 1
+
+    encoder = FakeEncoder()
+    assert encode_gallery(str(gallery), cache, encoder)[1] == ["Ahad"]
+    assert encoder.calls == ["a.jpg"]
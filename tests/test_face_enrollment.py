@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import runpy
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import pytest
+
+from src.jobs import JobQueue
+from src.vision import FaceEncodingCache, FaceEnrollment
+
+
+def encode_bytes(path: str) -> Optional[List[float]]:
+    # Module-level so the process pool can pickle it
+    data = Path(path).read_bytes()
+    return [float(data[0]), float(len(data))]
+
+
+def build(encodings: List[List[float]], names: List[str]) -> Tuple[Tuple[List[float], ...], Tuple[str, ...]]:
+    return tuple(encodings), tuple(names)
+
+
+class Gallery(tuple):
+    def __len__(self) -> int:
+        return len(self[1])
+
+
+def write_image(root: Path, person: str, name: str, data: bytes) -> None:
+    path = root / person / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_upload_encodes_only_new_photos_on_the_pool(tmp_path: Path) -> None:
+    gallery_dir = tmp_path / "known_faces"
+    write_image(gallery_dir, "Ahad", "a.jpg", b"aaaa")
+    calls: List[str] = []
+
+    def encode(path: str) -> Optional[List[float]]:
+        calls.append(Path(path).name)
+        return encode_bytes(path)
+
+    enrollment = FaceEnrollment(
+        str(gallery_dir),
+        FaceEncodingCache(str(tmp_path / "faces.db")),
+        encode,
+        lambda encodings, names: Gallery(build(encodings, names)),
+        executor=ThreadPoolExecutor(max_workers=4),
+    )
+    assert enrollment.refresh()["faces"] == 1
+    first = enrollment.gallery
+
+    for i in range(5):
+        write_image(gallery_dir, "Grace", f"g{i}.jpg", bytes([100 + i]) * 3)
+    calls.clear()
+    assert enrollment.enroll() is None
+    assert sorted(calls) == [f"g{i}.jpg" for i in range(5)]
+
+    status = enrollment.status()
+    assert status["state"] == "idle"
+    assert status["faces"] == 6
+    assert status["progress"] == {"done": 5, "total": 5}
+    assert status["last_run"]["encoded"] == 5 and status["last_run"]["people"] == 2
+    # The old gallery object is untouched; the new one was swapped in
+    assert len(first) == 1 and enrollment.gallery is not first
+    enrollment.shutdown()
+
+
+def test_enrollment_runs_as_a_background_job(tmp_path: Path) -> None:
+    gallery_dir = tmp_path / "known_faces"
+    write_image(gallery_dir, "Ahad", "a.jpg", b"aaaa")
+    release = threading.Event()
+
+    def slow_build(encodings: List[List[float]], names: List[str]) -> Any:
+        release.wait(5)
+        return Gallery(build(encodings, names))
+
+    jobs = JobQueue(workers=1)
+    enrollment = FaceEnrollment(
+        str(gallery_dir), FaceEncodingCache(str(tmp_path / "faces.db")), encode_bytes, slow_build, jobs=jobs,
+    )
+    job_id = enrollment.enroll()
+    assert job_id is not None
+    assert enrollment.gallery is None
+
+    release.set()
+    jobs.shutdown(wait=True)
+    assert jobs.get(job_id).status == "succeeded"
+    assert enrollment.status()["faces"] == 1 and enrollment.status()["job_id"] == job_id
+
+
+def test_process_pool_encoding(tmp_path: Path) -> None:
+    gallery_dir = tmp_path / "known_faces"
+    write_image(gallery_dir, "Ahad", "a.jpg", b"aaaa")
+    write_image(gallery_dir, "Grace", "g.jpg", b"gg")
+    enrollment = FaceEnrollment(
+        str(gallery_dir),
+        FaceEncodingCache(str(tmp_path / "faces.db")),
+        encode_bytes,
+        build,
+        executor=ProcessPoolExecutor(max_workers=2),
+    )
+    try:
+        enrollment.refresh()
+    finally:
+        enrollment.shutdown()
+    assert enrollment.gallery == (([97.0, 4.0], [103.0, 2.0]), ("Ahad", "Grace"))
+
+
+def test_pool_is_created_on_the_first_refresh(tmp_path: Path) -> None:
+    gallery_dir = tmp_path / "known_faces"
+    write_image(gallery_dir, "Ahad", "a.jpg", b"aaaa")
+    pools: List[ThreadPoolExecutor] = []
+
+    def create_pool() -> ThreadPoolExecutor:
+        pools.append(ThreadPoolExecutor(max_workers=2))
+        return pools[-1]
+
+    enrollment = FaceEnrollment(
+        str(gallery_dir), FaceEncodingCache(str(tmp_path / "faces.db")), encode_bytes, build,
+        executor_factory=create_pool,
+    )
+    assert pools == []
+
+    enrollment.refresh()
+    write_image(gallery_dir, "Grace", "g.jpg", b"gg")
+    enrollment.refresh()
+    assert len(pools) == 1
+
+    enrollment.shutdown()
+    assert enrollment.executor is None
+    with pytest.raises(RuntimeError):
+        pools[0].submit(print)
+    enrollment.refresh()
+    assert len(pools) == 1
+
+
+def test_spawned_workers_rerunning_the_launcher_do_not_import_the_app() -> None:
+    launcher = Path(__file__).resolve().parents[1] / "src" / "config" / "run_backend.py"
+
+    # What a spawn-method pool worker does with the parent's main script
+    namespace = runpy.run_path(str(launcher), run_name="__mp_main__")
+
+    assert "main" not in namespace
+    assert "src.config.app2" not in sys.modules
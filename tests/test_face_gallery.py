@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.vision.gallery import UNKNOWN, FaceGallery
+
+
+def unit(rng, count: int) -> "np.ndarray":
+    vectors = rng.normal(size=(count, 128))
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_nearest_match_wins_over_first_match() -> None:
+    base = np.zeros(128)
+    far = base.copy()
+    far[0] = 0.5
+    near = base.copy()
+    near[0] = 0.1
+    gallery = FaceGallery([far, near], ["Grace", "Ahad"], tolerance=0.6)
+
+    # Both are within tolerance; compare_faces + first True would have said Grace
+    assert gallery.label([base]) == ["Ahad"]
+    name, distance = gallery.match([base])[0]
+    assert name == "Ahad" and distance == pytest.approx(0.1, abs=1e-6)
+
+
+def test_all_faces_are_matched_in_one_pass() -> None:
+    rng = np.random.default_rng(0)
+    known = unit(rng, 50)
+    names = [f"person-{i}" for i in range(50)]
+    gallery = FaceGallery(known, names, tolerance=0.3)
+    assert gallery.matrix.dtype == np.float32 and gallery.matrix.flags["C_CONTIGUOUS"]
+
+    queries = np.vstack([known[7] + 0.01, known[42] - 0.01, unit(rng, 1)[0]])
+    assert gallery.label(queries) == ["person-7", "person-42", UNKNOWN]
+    expected = np.linalg.norm(queries[:, None, :] - known[None, :, :], axis=2)
+    np.testing.assert_allclose(gallery.distances(queries), expected, atol=1e-4)
+
+
+def test_empty_gallery_and_no_faces() -> None:
+    gallery = FaceGallery([], [])
+    assert not gallery
+    assert gallery.label([np.zeros(128)]) == [UNKNOWN]
+    assert FaceGallery([np.zeros(128)], ["Ahad"]).match([]) == []
+    with pytest.raises(ValueError):
+        FaceGallery([np.zeros(128)], [])
+
+
+def test_approximate_index_finds_clustered_people() -> None:
+    rng = np.random.default_rng(1)
+    # 40 people with 10 photos each, spread around their own centre
+    centres = unit(rng, 40)
+    photos = np.repeat(centres, 10, axis=0) + rng.normal(scale=0.02, size=(400, 128))
+    names = [f"person-{i}" for i in range(40) for _ in range(10)]
+    gallery = FaceGallery(photos, names, tolerance=0.6, ann_min_faces=100, ann_probes=3)
+    assert gallery.index is not None
+
+    queries = centres + rng.normal(scale=0.02, size=centres.shape)
+    labels = gallery.label(queries)
+    exact = FaceGallery(photos, names, tolerance=0.6, ann_min_faces=0).label(queries)
+    assert labels == exact == [f"person-{i}" for i in range(40)]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Any, List, Sequence, Tuple
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.vision.gallery import FaceGallery
+from src.vision.tracking import FaceTracker, iou
+
+Box = Tuple[float, float, float, float]
+
+
+class Scene:
+    """Fake detector/encoder: faces are (box in full-res pixels, encoding) pairs set per frame."""
+
+    def __init__(self) -> None:
+        self.faces: List[Tuple[Box, List[float]]] = []
+        self.detect_calls: List[Tuple[int, int]] = []
+        self.encoded_boxes: List[Tuple[int, int, int, int]] = []
+
+    def detect(self, rgb: Any) -> List[Box]:
+        self.detect_calls.append(rgb.shape[:2])
+        # The tracker hands over a 2x downscaled frame
+        return [tuple(v / 2 for v in box) for box, _ in self.faces]
+
+    def encode(self, rgb: Any, boxes: Sequence[Tuple[int, int, int, int]]) -> List[List[float]]:
+        self.encoded_boxes.extend(boxes)
+        result = []
+        for box in boxes:
+            best = max(self.faces, key=lambda face: iou(face[0], box))
+            result.append(best[1])
+        return result
+
+
+def person(index: int) -> List[float]:
+    vector = np.zeros(128)
+    vector[index] = 1.0
+    return vector.tolist()
+
+
+def frame() -> "np.ndarray":
+    return np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def test_faces_are_encoded_once_per_track() -> None:
+    scene = Scene()
+    gallery = FaceGallery([person(0), person(1)], ["Ahad", "Grace"])
+    tracker = FaceTracker(scene.detect, scene.encode, downscale=2, detect_every=3)
+
+    scene.faces = [((100, 200, 200, 100), person(0))]
+    for seq in range(1, 10):
+        tracks = tracker.update(frame(), gallery, seq=seq)
+        # The face drifts right 4px per frame
+        scene.faces = [((100, 204 + 4 * seq, 200, 104 + 4 * seq), person(0))]
+
+    assert [track.label for track in tracks] == ["Ahad"]
+    assert len(scene.encoded_boxes) == 1
+    assert len(scene.detect_calls) == 3 and scene.detect_calls[0] == (240, 320)
+    assert tracker.stats["tracks_started"] == 1 and tracker.stats["frames"] == 9
+
+
+def test_tracks_coast_between_detections() -> None:
+    scene = Scene()
+    tracker = FaceTracker(scene.detect, scene.encode, downscale=2, detect_every=4)
+    gallery = FaceGallery([person(0)], ["Ahad"])
+
+    scene.faces = [((100, 200, 200, 100), person(0))]
+    tracker.update(frame(), gallery, seq=1)
+    scene.faces = [((100, 240, 200, 140), person(0))]  # moved 40px over 4 frames
+    for seq in range(2, 6):
+        tracker.update(frame(), gallery, seq=seq)
+    track = tracker.tracks[0]
+    assert track.box == (100, 240, 200, 140)
+    assert track.velocity == (0.0, 10.0, 0.0, 10.0)
+
+    tracks = tracker.update(frame(), gallery, seq=6)
+    assert tracks[0].box == (100, 250, 200, 150)
+    # Same frame again: idempotent
+    assert tracker.update(frame(), gallery, seq=6)[0].box == (100, 250, 200, 150)
+    # An older frame from a concurrent caller does not move the tracks back
+    assert tracker.update(frame(), gallery, seq=4)[0].box == (100, 250, 200, 150)
+    assert tracker.update(frame(), gallery, seq=7)[0].box == (100, 260, 200, 160)
+    assert tracker.stats["frames"] == 7
+
+
+def test_lost_tracks_are_dropped_and_reappearing_faces_re_encoded() -> None:
+    scene = Scene()
+    tracker = FaceTracker(scene.detect, scene.encode, detect_every=1, max_missed=1)
+    gallery = FaceGallery([person(0), person(1)], ["Ahad", "Grace"])
+
+    scene.faces = [((100, 200, 200, 100), person(0)), ((100, 500, 200, 400), person(1))]
+    assert sorted(t.label for t in tracker.update(frame(), gallery)) == ["Ahad", "Grace"]
+
+    scene.faces = scene.faces[:1]
+    assert len(tracker.update(frame(), gallery)) == 2  # missed once, still kept
+    assert [t.label for t in tracker.update(frame(), gallery)] == ["Ahad"]
+    assert tracker.stats["tracks_lost"] == 1
+
+    scene.faces.append(((100, 500, 200, 400), person(1)))
+    assert sorted(t.label for t in tracker.update(frame(), gallery)) == ["Ahad", "Grace"]
+    assert len(scene.encoded_boxes) == 3
+
+
+def test_gallery_swap_reidentifies_without_encoding() -> None:
+    scene = Scene()
+    tracker = FaceTracker(scene.detect, scene.encode, detect_every=10, retry_unknown_every=0)
+    scene.faces = [((100, 200, 200, 100), person(5))]
+
+    empty = FaceGallery([person(0)], ["Ahad"])
+    assert tracker.update(frame(), empty)[0].label == "Unknown"
+    enrolled = FaceGallery([person(0), person(5)], ["Ahad", "Newcomer"])
+    assert tracker.update(frame(), enrolled)[0].label == "Newcomer"
+    assert len(scene.encoded_boxes) == 1
+
+    tracker.reset()
+    assert tracker.tracks == []
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.vision.capture import CAP_PROP_BUFFERSIZE, FrameBuffer, FrameCapture, FrameResultCache, MotionDetector
+from tests.harness.clock import FakeClock
+
+
+def scene(value: int) -> "np.ndarray":
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+class FakeCamera:
+    def __init__(self, frames: List["np.ndarray"]) -> None:
+        self.frames = frames
+        self.reads = 0
+        self.released = False
+        self.first_read = threading.Event()
+
+    def read(self) -> Tuple[bool, Optional["np.ndarray"]]:
+        self.reads += 1
+        self.first_read.set()
+        return True, self.frames[min(self.reads, len(self.frames)) - 1].copy()
+
+    def release(self) -> None:
+        self.released = True
+
+
+def test_motion_gate_keeps_only_changed_frames(clock: FakeClock) -> None:
+    capture = FrameCapture(lambda: None, motion_threshold=3.0, clock=clock)
+
+    first = capture.offer(scene(10))
+    assert first is not None and first.seq == 1
+    assert capture.offer(scene(11)) is None  # sensor noise
+    assert capture.offer(scene(60)).seq == 2
+    assert capture.stats == {"captured": 3, "kept": 2, "static": 1, "read_errors": 0}
+
+    latest = capture.latest()
+    assert latest.seq == 2 and not latest.image.flags.writeable
+    # Reading does not consume
+    assert capture.latest() is latest
+
+
+def test_capture_rate_drops_when_the_scene_is_still(clock: FakeClock) -> None:
+    capture = FrameCapture(lambda: None, fps=10, idle_fps=2, idle_after=2.0, clock=clock)
+    capture.offer(scene(10))
+    assert capture.interval() == pytest.approx(0.1)
+    clock.now += 1.0
+    capture.offer(scene(10))
+    assert capture.interval() == pytest.approx(0.1)
+    clock.now += 2.5
+    capture.offer(scene(10))
+    assert capture.interval() == pytest.approx(0.5)
+
+
+def test_ring_buffer_is_bounded_and_ages_out(clock: FakeClock) -> None:
+    buffer = FrameBuffer(size=3, clock=clock)
+    for value in range(5):
+        buffer.push(scene(value), motion=10.0)
+        clock.now += 1
+    assert [frame.seq for frame in buffer.since(0)] == [3, 4, 5]
+    assert [frame.seq for frame in buffer.since(4)] == [5]
+
+    assert buffer.latest(max_age=2.0) is not None
+    clock.now += 5
+    assert buffer.latest(max_age=2.0) is None
+    buffer.confirm()
+    assert buffer.latest(max_age=2.0).seq == 5
+
+
+def test_motion_detector_compares_thumbnails() -> None:
+    detector = MotionDetector(threshold=3.0, width=16)
+    assert detector.thumbnail(scene(0)).shape == (12, 16)
+    assert detector.score(scene(0)) == float("inf")
+    detector.accept(scene(0))
+    moved = scene(0)
+    moved[:, :32] = 200
+    assert detector.score(moved) == pytest.approx(100.0)
+
+
+def test_thread_captures_until_stopped() -> None:
+    camera = FakeCamera([scene(10), scene(80)])
+    capture = FrameCapture(lambda: camera, fps=200, idle_fps=200)
+    capture.start()
+    capture.start()  # idempotent
+    assert camera.first_read.wait(2)
+    deadline = time.time() + 2
+    while capture.stats["kept"] < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert capture.status()["running"]
+    assert capture.latest().seq == 2
+
+    capture.stop()
+    assert camera.released and not capture.running
+    assert capture.latest() is None
+
+
+class BufferedCamera:
+    """cv2.VideoCapture-like source producing one frame per 1/30 s of the fake clock."""
+
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+        self.produced = 0
+        self.decoded = 0
+        self.properties: Dict[int, float] = {}
+
+    def set(self, prop: int, value: float) -> bool:
+        self.properties[prop] = value
+        return True
+
+    def grab(self) -> bool:
+        self.clock.now += 1 / 30
+        self.produced += 1
+        return True
+
+    def retrieve(self) -> Tuple[bool, "np.ndarray"]:
+        self.decoded += 1
+        return True, scene(self.produced)
+
+    def release(self) -> None:
+        pass
+
+
+def test_grab_drains_the_camera_until_a_frame_is_due(clock: FakeClock) -> None:
+    camera = BufferedCamera(clock)
+    capture = FrameCapture(lambda: camera, fps=5, clock=clock)
+
+    ok, image = capture.next_image(camera, threading.Event(), due=clock.now + 0.19)
+
+    # Every frame produced during the wait was dequeued; only the current one was decoded
+    assert ok and camera.produced == 6 and camera.decoded == 1
+    assert int(image[0, 0, 0]) == camera.produced
+
+
+def test_start_asks_the_camera_for_a_one_frame_buffer(clock: FakeClock) -> None:
+    camera = BufferedCamera(clock)
+    capture = FrameCapture(lambda: camera, clock=clock)
+    capture.start()
+    capture.stop()
+    assert camera.properties == {CAP_PROP_BUFFERSIZE: 1}
+
+
+def test_results_are_reused_for_the_same_frame() -> None:
+    buffer = FrameBuffer()
+    cache = FrameResultCache()
+    calls: List[int] = []
+
+    def compute(frame) -> int:
+        calls.append(frame.seq)
+        return frame.seq * 10
+
+    frame = buffer.push(scene(1), motion=5.0)
+    assert cache.get(frame, compute) == 10
+    assert cache.get(frame, compute) == 10
+    assert cache.get(frame, compute, variant="faces") == 10
+    newer = buffer.push(scene(50), motion=5.0)
+    assert cache.get(newer, compute) == 20
+    assert calls == [1, 1, 2]
+    assert cache.stats == {"hits": 1, "misses": 3}
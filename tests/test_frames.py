@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL.Image")
+
+from src.vision.frames import bgr_to_rgb, frame_to_image
+
+
+def bgr_frame() -> "np.ndarray":
+    frame = np.zeros((4, 6, 3), dtype=np.uint8)
+    frame[..., 0] = 255  # blue in OpenCV order
+    frame[0, 0] = (0, 0, 200)  # one red pixel
+    return frame
+
+
+def test_bgr_to_rgb_copies_without_touching_the_frame() -> None:
+    frame = bgr_frame()
+    rgb = bgr_to_rgb(frame)
+    assert rgb.flags["C_CONTIGUOUS"]
+    assert tuple(rgb[1, 1]) == (0, 0, 255)
+    assert tuple(rgb[0, 0]) == (200, 0, 0)
+    assert tuple(frame[1, 1]) == (255, 0, 0)
+
+
+def test_frame_to_image() -> None:
+    image = frame_to_image(bgr_frame())
+    assert image.size == (6, 4) and image.mode == "RGB"
+    assert image.getpixel((0, 0)) == (200, 0, 0)
+
+
+def test_grayscale_frames_pass_through() -> None:
+    gray = np.full((2, 3), 128, dtype=np.uint8)
+    assert frame_to_image(gray).mode == "L"
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+PIL_Image = pytest.importorskip("PIL.Image")
+
+from src.vision.prepare import (
+    CAMERA,
+    DEFAULT_PROFILES,
+    SCREEN,
+    ImagePreparer,
+    PrepProfile,
+    fit_long_edge,
+    profiles_from_env,
+)
+
+
+def noisy_frame(height: int, width: int, seed: int = 0) -> "np.ndarray":
+    return np.random.default_rng(seed).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+
+def test_fit_long_edge_only_shrinks() -> None:
+    assert fit_long_edge((3840, 2160), 1920) == (1920, 1080)
+    assert fit_long_edge((1080, 1920), 960) == (540, 960)
+    assert fit_long_edge((640, 480), 1024) == (640, 480)
+
+
+def test_camera_frames_are_resized_and_jpeg_encoded() -> None:
+    preparer = ImagePreparer()
+    prepared = preparer.prepare(noisy_frame(1440, 2560), CAMERA)
+
+    assert prepared.mime_type == "image/jpeg"
+    assert prepared.source_size == (2560, 1440) and prepared.size == (1024, 576)
+    decoded = PIL_Image.open(io.BytesIO(prepared.data))
+    assert decoded.format == "JPEG" and decoded.size == (1024, 576)
+    assert prepared.to_part() == {"mime_type": "image/jpeg", "data": prepared.data}
+
+
+def test_screenshots_keep_a_larger_edge_and_report_savings() -> None:
+    preparer = ImagePreparer()
+    screenshot = PIL_Image.new("RGBA", (3840, 2160), (255, 255, 255, 255))
+    prepared = preparer.prepare(screenshot, SCREEN, source_bytes=5_000_000)
+
+    assert prepared.size == (1920, 1080)
+    assert prepared.mime_type in ("image/webp", "image/jpeg")
+    stats = preparer.stats()
+    screen = stats["kinds"][SCREEN]
+    assert screen["images"] == 1 and screen["source_bytes"] == 5_000_000
+    assert screen["bytes_sent"] == len(prepared.data) < 5_000_000
+    assert stats["recent"][0]["bytes"] == len(prepared.data)
+    assert "data" not in stats["recent"][0]
+
+
+def test_quality_steps_down_to_fit_the_byte_budget() -> None:
+    tight = PrepProfile(max_edge=512, format="JPEG", quality=90, min_quality=30, max_bytes=20_000)
+    preparer = ImagePreparer({CAMERA: tight})
+    prepared = preparer.prepare(noisy_frame(512, 512, seed=1), CAMERA)
+    assert prepared.quality < 90
+    assert prepared.quality >= 30
+
+
+def test_profiles_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MAYA_SCREEN_MAX_EDGE", "2560")
+    monkeypatch.setenv("MAYA_CAMERA_MAX_BYTES", "50000")
+    profiles = profiles_from_env()
+    assert profiles[SCREEN].max_edge == 2560
+    assert profiles[CAMERA].max_bytes == 50000
+    assert profiles[CAMERA].max_edge == DEFAULT_PROFILES[CAMERA].max_edge
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+from src.jobs import JobQueue
+
+
+def wait_for(queue: JobQueue, job_id: str, timeout: float = 5.0) -> str:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.get(job_id).status
+        if status in ("succeeded", "failed"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_reports_result_and_failure() -> None:
+    queue = JobQueue(workers=2)
+
+    ok = queue.submit("add", lambda a, b: a + b, 2, 3)
+    bad = queue.submit("boom", lambda: 1 / 0)
+
+    assert wait_for(queue, ok.id) == "succeeded" and queue.get(ok.id).result == 5
+    assert wait_for(queue, bad.id) == "failed" and "division" in queue.get(bad.id).error
+    queue.shutdown()
+
+
+def test_repeated_submissions_coalesce_behind_the_running_job() -> None:
+    queue = JobQueue(workers=4)
+    release = threading.Event()
+    calls: List[str] = []
+
+    def summarize(history: str) -> str:
+        calls.append(history)
+        if history == "v1":
+            release.wait(5)
+        return history
+
+    running = queue.submit("summarize", summarize, "v1", key="s1")
+    while queue.get(running.id).status != "running":
+        time.sleep(0.01)
+    follow_up = queue.submit("summarize", summarize, "v2", key="s1")
+    merged = queue.submit("summarize", summarize, "v3", key="s1")
+    other = queue.submit("summarize", summarize, "x1", key="s2")
+
+    assert merged.id == follow_up.id and merged.coalesced == 1
+    assert wait_for(queue, other.id) == "succeeded"
+    assert queue.get(follow_up.id).status == "queued"
+
+    release.set()
+    assert wait_for(queue, follow_up.id) == "succeeded"
+    assert queue.get(follow_up.id).result == "v3"
+    assert calls == ["v1", "x1", "v3"]
+    queue.shutdown()
+
+
+def test_finished_jobs_are_trimmed() -> None:
+    queue = JobQueue(workers=1, max_finished=2)
+    jobs = [queue.submit("noop", lambda: None) for _ in range(5)]
+    queue.shutdown()
+
+    assert [queue.get(job.id) is not None for job in jobs] == [False, False, False, True, True]
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from src.memory.graph import MemoryGraph, extract_entities
+from src.memory.hybrid import HybridRetriever
+
+
+@dataclass
+class Doc:
+    page_content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class FakeVectorStore:
+    def __init__(self, ranking: List[Doc]) -> None:
+        self.ranking = ranking
+
+    def similarity_search(self, query: str, k: int) -> List[Doc]:
+        return self.ranking[:k]
+
+
+MEMORIES = [
+    Doc("Sarah mentioned that Project Nova ships on 12 May."),
+    Doc("Meeting with Omar Khan from Google about Project Nova on 9 July."),
+    Doc("Lena works at Apple and likes Dune."),
+    Doc("Take the cat to the vet this week."),
+]
+
+
+def test_extract_entities_drops_possessives_and_non_entities() -> None:
+    assert extract_entities("Then Sarah's brother Faiz called on Monday.") == ["Sarah", "Faiz"]
+    assert extract_entities("[MCP Notion search] Query: watchlist") == ["Notion"]
+    assert extract_entities("APPOINTMENTS:") == []
+
+
+def test_two_hop_walk_reaches_the_linked_meeting() -> None:
+    graph = MemoryGraph(max_hops=2)
+    for i, memory in enumerate(MEMORIES):
+        graph.add(str(i), memory.page_content)
+
+    ranked = [doc_id for doc_id, _ in graph.search("who did I meet with about the project Sarah mentioned")]
+    assert ranked[:2] == ["0", "1"]
+    assert "2" not in ranked
+    assert ("Project Nova", 1) in graph.neighbours("Sarah")
+
+
+def test_walk_is_bounded_by_hops_and_nodes() -> None:
+    graph = MemoryGraph(max_hops=1)
+    for i, memory in enumerate(MEMORIES):
+        graph.add(str(i), memory.page_content)
+    assert [doc_id for doc_id, _ in graph.search("what did Sarah mention")] == ["0", "1"]
+
+    chain = MemoryGraph(max_hops=10, max_nodes=3)
+    chain.add("chain", ". ".join(f"Node{i} met Node{i + 1}" for i in range(20)))
+    assert len(chain.walk("node0")) == 3
+
+
+def test_graph_results_join_the_hybrid_fusion_incrementally() -> None:
+    retriever = HybridRetriever(FakeVectorStore([MEMORIES[3]]), MEMORIES[2:], k=2, graph=MemoryGraph())
+    retriever.add_documents(MEMORIES[:2])
+
+    results = retriever.invoke("who did I meet with about the project Sarah mentioned")
+
+    assert MEMORIES[1] in results
+    assert retriever.stats["graph"] == 1
+
+
+def test_removed_chunks_leave_the_graph_and_the_fusion() -> None:
+    graph = MemoryGraph(max_hops=2)
+    retriever = HybridRetriever(FakeVectorStore([]), MEMORIES, k=2, graph=graph)
+
+    retriever.remove_documents([MEMORIES[1]])
+
+    assert graph.neighbours("Omar Khan") == []
+    assert ("Project Nova", 1) in graph.neighbours("Sarah")
+    assert [doc_id for doc_id, _ in graph.search("meeting with Omar Khan")] == []
+    assert MEMORIES[1] not in retriever.invoke("Omar Khan Google meeting")
+
+    retriever.add_documents([MEMORIES[1]])
+    assert MEMORIES[1] in retriever.invoke("Omar Khan Google meeting")
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from src.memory import MemoryIndex
+from src.memory.compression import LexicalCompressor
+
+
+@dataclass
+class Doc:
+    page_content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class FakeRetriever:
+    def __init__(self, vector_store: List[str], documents: List[str]) -> None:
+        self.vector_store = vector_store
+
+    def invoke(self, query: str) -> List[Doc]:
+        return [Doc(text) for text in self.vector_store if query in text]
+
+
+def build_index(corpus: List[str], builds: List[int]) -> MemoryIndex:
+    def build_vector_store(documents: List[str]) -> List[str]:
+        builds.append(len(documents))
+        return list(documents)
+
+    return MemoryIndex(
+        load_documents=lambda: list(corpus),
+        build_vector_store=build_vector_store,
+        build_retriever=FakeRetriever,
+    )
+
+
+def test_index_is_built_once_for_concurrent_sessions() -> None:
+    builds: List[int] = []
+    index = build_index(["dentist on friday", "cat to the vet"], builds)
+
+    results: List[str] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(index.retrieve_context("vet")))
+        for _ in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert builds == [2]
+    assert results == ["cat to the vet"] * 16
+
+
+def test_invalidate_rebuilds_from_current_corpus() -> None:
+    builds: List[int] = []
+    corpus = ["dentist on friday"]
+    index = build_index(corpus, builds)
+
+    assert index.retrieve_context("vet") == ""
+    corpus.append("cat to the vet")
+    index.invalidate()
+
+    assert not index.is_built
+    assert index.retrieve_context("vet") == "cat to the vet"
+    assert builds == [1, 2]
+
+
+def build_ingesting_index(corpus: List[str], builds: List[int]) -> MemoryIndex:
+    def build_vector_store(documents: List[str]) -> List[str]:
+        builds.append(len(documents))
+        return list(documents)
+
+    return MemoryIndex(
+        load_documents=lambda: list(corpus),
+        build_vector_store=build_vector_store,
+        build_retriever=FakeRetriever,
+        split_text=lambda text, metadata: [line for line in text.splitlines() if line],
+        add_documents=lambda vector_store, documents: vector_store.extend(documents),
+    )
+
+
+def test_ingest_makes_new_memory_searchable_without_rebuild() -> None:
+    builds: List[int] = []
+    index = build_ingesting_index(["dentist on friday"], builds)
+    index.warm()
+    version = index.version
+
+    assert index.ingest("Chat Summary:\ncat to the vet") == 2
+    assert index.retrieve_context("vet") == "cat to the vet"
+    assert builds == [1]
+    assert index.version == version + 1
+
+
+def test_ingest_before_first_build_defers_to_build() -> None:
+    builds: List[int] = []
+    corpus = ["dentist on friday"]
+    index = build_ingesting_index(corpus, builds)
+
+    corpus.append("cat to the vet")
+    assert index.ingest("cat to the vet") == 0
+    assert index.retrieve_context("vet") == "cat to the vet"
+    assert builds == [2]
+
+
+def test_retrieved_chunks_are_compressed_in_process() -> None:
+    note = "Appointments this week. I have a dentist appointment on Friday. Buy cat food."
+    index = MemoryIndex(
+        load_documents=lambda: [note],
+        build_vector_store=list,
+        build_retriever=FakeRetriever,
+        compressor=LexicalCompressor(max_sentences=1),
+    )
+
+    assert index.retrieve_context("dentist") == "I have a dentist appointment on Friday."
+
+
+def test_retrieve_survives_invalidate_between_build_and_read() -> None:
+    builds: List[int] = []
+    index = build_index(["cat to the vet"], builds)
+    ensure_built = index._ensure_built
+
+    def build_then_invalidate() -> Any:
+        retriever = ensure_built()
+        index.invalidate()
+        return retriever
+
+    index._ensure_built = build_then_invalidate
+    assert index.retrieve_context("vet") == "cat to the vet"
+
+
+def test_ingest_during_a_build_is_replayed_before_the_swap() -> None:
+    started, release = threading.Event(), threading.Event()
+    corpus = ["dentist on friday"]
+
+    def build_vector_store(documents: List[str]) -> List[str]:
+        started.set()
+        release.wait(timeout=5)
+        return list(documents)
+
+    index = MemoryIndex(
+        load_documents=lambda: list(corpus),
+        build_vector_store=build_vector_store,
+        build_retriever=FakeRetriever,
+        split_text=lambda text, metadata: [text],
+        add_documents=lambda vector_store, documents: vector_store.extend(documents),
+    )
+    warm = threading.Thread(target=index.warm)
+    warm.start()
+    assert started.wait(timeout=5)
+
+    # Persisted after the build loaded the corpus; must not block on the build
+    corpus.append("cat to the vet")
+    assert index.ingest("cat to the vet") == 0
+    release.set()
+    warm.join()
+
+    assert index.retrieve_context("vet") == "cat to the vet"
+
+
+class CountingRetriever(FakeRetriever):
+    """Records how many queries were in flight whenever its local index changed."""
+
+    def __init__(self, vector_store: List[str], documents: List[str]) -> None:
+        super().__init__(vector_store, documents)
+        self.active = 0
+        self.active_during_add: List[int] = []
+        self._count_lock = threading.Lock()
+
+    def invoke(self, query: str) -> List[Doc]:
+        with self._count_lock:
+            self.active += 1
+        time.sleep(0.002)
+        with self._count_lock:
+            self.active -= 1
+        return super().invoke(query)
+
+    def add_documents(self, documents: List[str]) -> None:
+        self.active_during_add.append(self.active)
+
+
+def test_local_index_updates_exclude_concurrent_queries() -> None:
+    index = MemoryIndex(
+        load_documents=lambda: ["dentist on friday"],
+        build_vector_store=list,
+        build_retriever=CountingRetriever,
+        split_text=lambda text, metadata: [text],
+        add_documents=lambda vector_store, documents: vector_store.extend(documents),
+    )
+    index.warm()
+    stop = threading.Event()
+
+    def query() -> None:
+        while not stop.is_set():
+            index.retrieve("vet")
+
+    readers = [threading.Thread(target=query) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        for i in range(10):
+            index.ingest(f"note {i}")
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    assert index._retriever.active_during_add == [0] * 10
+
+
+def test_needs_query_embedding_defers_to_the_retriever() -> None:
+    class LexicalRetriever(FakeRetriever):
+        def needs_embedding(self, query: str) -> bool:
+            return not any(query in text for text in self.vector_store)
+
+    plain = build_index(["cat to the vet"], [])
+    assert plain.needs_query_embedding("vet")
+
+    lexical = MemoryIndex(
+        load_documents=lambda: ["cat to the vet"],
+        build_vector_store=list,
+        build_retriever=LexicalRetriever,
+    )
+    assert not lexical.needs_query_embedding("vet")
+    assert lexical.needs_query_embedding("what's on this week")
+
+
+class RemovingRetriever(FakeRetriever):
+    def __init__(self, vector_store: List[str], documents: List[str]) -> None:
+        super().__init__(vector_store, documents)
+        self.local = set(documents)
+
+    def add_documents(self, documents: List[str]) -> None:
+        self.local.update(documents)
+
+    def remove_documents(self, documents: List[str]) -> None:
+        self.local.difference_update(documents)
+
+
+def test_forget_removes_one_entry_without_a_rebuild() -> None:
+    builds: List[int] = []
+
+    def build_vector_store(documents: List[str]) -> List[str]:
+        builds.append(len(documents))
+        return list(documents)
+
+    index = MemoryIndex(
+        load_documents=lambda: ["dentist on friday", "cat to the vet"],
+        build_vector_store=build_vector_store,
+        build_retriever=RemovingRetriever,
+        split_text=lambda text, metadata: [text],
+        add_documents=lambda vector_store, documents: vector_store.extend(documents),
+        remove_documents=lambda vector_store, documents: [vector_store.remove(d) for d in documents],
+    )
+    index.warm()
+    version = index.version
+
+    assert index.forget("cat to the vet", {"entry_id": 2}) == 1
+    assert index.retrieve_context("vet") == ""
+    assert index._retriever.local == {"dentist on friday"}
+    assert index.is_built and builds == [2]
+    assert index.version == version + 1
+
+
+def test_forget_without_incremental_removal_falls_back_to_a_rebuild() -> None:
+    builds: List[int] = []
+    corpus = ["dentist on friday", "cat to the vet"]
+    index = build_index(corpus, builds)
+    index.warm()
+
+    corpus.remove("cat to the vet")
+    assert index.forget("cat to the vet") == 0
+    assert not index.is_built
+    assert index.retrieve_context("vet") == ""
+    assert builds == [2, 1]
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from src.memory.bm25 import BM25Index
+from src.memory.compression import EmbeddingCompressor, LexicalCompressor, create_compressor
+from src.memory.hybrid import HybridRetriever, reciprocal_rank_fusion
+
+
+@dataclass
+class Doc:
+    page_content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class KeywordEmbeddings:
+    """Two-dimensional embeddings: (mentions a pet, mentions a watchlist)."""
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    @staticmethod
+    def _embed(text: str) -> List[float]:
+        lowered = text.lower()
+        return [float("cat" in lowered or "vet" in lowered), float("watchlist" in lowered)]
+
+
+MEMORY = Doc(
+    "Iron man in my movie watchlist.\nI have to take my cat to the vet this week!\n"
+    "Add aquaman to my watchlist.",
+    {"source": "data.txt"},
+)
+
+
+def test_lexical_compressor_keeps_matching_sentences_in_order() -> None:
+    [compressed] = LexicalCompressor().compress_documents([MEMORY], "what is on my watchlist?")
+
+    assert compressed.page_content == "Iron man in my movie watchlist.\nAdd aquaman to my watchlist."
+    assert compressed.metadata == {"source": "data.txt"}
+
+
+def test_lexical_compressor_falls_back_to_lead_sentences() -> None:
+    [compressed] = LexicalCompressor(max_sentences=1).compress_documents([MEMORY], "hello")
+
+    assert compressed.page_content == "Iron man in my movie watchlist."
+
+
+def test_embedding_compressor_scores_against_query_embedding() -> None:
+    compressor = EmbeddingCompressor(KeywordEmbeddings(), max_sentences=2)
+    [compressed] = compressor.compress_documents([MEMORY], "when is the cat's vet visit")
+
+    assert compressed.page_content == "I have to take my cat to the vet this week!"
+
+
+def test_create_compressor_selects_by_name() -> None:
+    assert create_compressor("none") is None
+    assert isinstance(create_compressor("lexical"), LexicalCompressor)
+    assert isinstance(create_compressor("embedding", embeddings=KeywordEmbeddings()), EmbeddingCompressor)
+    assert create_compressor("llm", llm_factory=lambda: "extractor") == "extractor"
+    assert isinstance(create_compressor("llm"), LexicalCompressor)
+
+
+class FakeVectorStore:
+    def __init__(self, ranking: List[Doc]) -> None:
+        self.ranking = ranking
+        self.queries: List[str] = []
+
+    def similarity_search(self, query: str, k: int) -> List[Doc]:
+        self.queries.append(query)
+        return self.ranking[:k]
+
+
+CHUNKS = [
+    Doc("Friends from high school: Mir and Musaib."),
+    Doc("I have a dentist appointment on 14 March."),
+    Doc("I have an appointment with the HR of Google this week."),
+    Doc("Take the cat to the vet this week."),
+]
+
+
+def test_bm25_ranks_exact_name_first_and_supports_removal() -> None:
+    index = BM25Index()
+    for i, chunk in enumerate(CHUNKS):
+        index.add(str(i), chunk.page_content)
+
+    assert index.search("Musaib")[0][0] == "0"
+    index.remove("0")
+    assert index.search("Musaib") == []
+    assert len(index) == 3
+
+
+def test_reciprocal_rank_fusion_rewards_agreement() -> None:
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]])
+
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "c"]
+
+
+def test_decisive_lexical_hit_skips_vector_search() -> None:
+    store = FakeVectorStore(list(reversed(CHUNKS)))
+    retriever = HybridRetriever(store, CHUNKS, k=1)
+
+    assert not retriever.needs_embedding("dentist 14 March")
+    assert retriever.invoke("dentist 14 March") == [CHUNKS[1]]
+    assert store.queries == []
+    assert retriever.stats == {"lexical_only": 1, "hybrid": 0, "graph": 0}
+
+
+def test_ambiguous_query_fuses_vector_results() -> None:
+    store = FakeVectorStore([CHUNKS[3], CHUNKS[2]])
+    retriever = HybridRetriever(store, CHUNKS, k=2)
+
+    assert retriever.needs_embedding("what appointments do I have this week")
+    results = retriever.invoke("what appointments do I have this week")
+
+    assert store.queries == ["what appointments do I have this week"]
+    assert results[0] == CHUNKS[2]
+    assert retriever.stats["hybrid"] == 1
+
+
+def test_added_documents_are_searchable() -> None:
+    retriever = HybridRetriever(FakeVectorStore([]), CHUNKS[:1], k=1)
+    retriever.add_documents([Doc("Wifi password is hunter2.")])
+
+    assert retriever.invoke("wifi password")[0].page_content == "Wifi password is hunter2."
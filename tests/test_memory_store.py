@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from src.memory.store import MemoryStore
+
+
+def test_append_recent_search_and_delete(tmp_path: Path) -> None:
+    store = MemoryStore(str(tmp_path))
+    first = store.append("Sarah's birthday is on 3 March")
+    store.append("The code for locker 12 is blue-4821")
+    summary = store.append("Chat Summary (2024-05-01 10:00:00):\nWe planned a trip to Goa.", "chat_summary", source="s1")
+
+    assert [entry.id for entry in store.recent(2)] == [summary, first + 1]
+    assert [entry.id for entry in store.recent(5, entry_type="chat_summary")] == [summary]
+    assert store.search("when is sarah's birthday")[0].id == first
+    assert store.get(summary).source == "s1"
+    assert store.has_text("Sarah's birthday is on 3 March")
+
+    assert store.delete(first) is True
+    assert store.delete(first) is False
+    assert not store.has_text("Sarah's birthday is on 3 March")
+    assert store.search("birthday") == []
+    assert len(store) == 2
+
+
+def test_index_is_rebuilt_from_segments(tmp_path: Path) -> None:
+    store = MemoryStore(str(tmp_path), segment_max_bytes=100)
+    ids = [store.append(f"memory number {i} about gardening") for i in range(10)]
+    store.delete(ids[3])
+    store.close()
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".log")]) > 1
+
+    os.remove(tmp_path / "index.db")
+    reopened = MemoryStore(str(tmp_path))
+    assert [entry.id for entry in reopened.entries()] == ids[:3] + ids[4:]
+    assert reopened.append("one more") == ids[-1] + 1
+
+
+def test_uncommitted_log_tail_is_replayed_on_open(tmp_path: Path) -> None:
+    store = MemoryStore(str(tmp_path))
+    store.append("kept")
+    # Simulate a crash between the log write and the index commit
+    store._write_record({"op": "put", "id": 2, "type": "remember", "ts": 0.0, "source": None, "text": "logged"})
+    store._conn.rollback()
+    store._file.write(b'{"op": "pu')
+    store._file.flush()
+    store.close()
+
+    reopened = MemoryStore(str(tmp_path))
+    assert [entry.text for entry in reopened.entries()] == ["kept", "logged"]
+    reopened.append("after the crash")
+    reopened.close()
+    os.remove(tmp_path / "index.db")
+    assert len(MemoryStore(str(tmp_path))) == 3
+
+
+def test_compaction_drops_garbage_and_survives_replay(tmp_path: Path) -> None:
+    store = MemoryStore(str(tmp_path), segment_max_bytes=200)
+    ids = [store.append(f"entry {i} " + "x" * 50) for i in range(20)]
+    for entry_id in ids[:15]:
+        store.delete(entry_id)
+    before = store.stats()
+
+    removed = store.compact()
+    after = store.stats()
+    assert removed > 0 and after["segments"] < before["segments"]
+    assert after["garbage_bytes"] == 0
+    assert [entry.id for entry in store.entries()] == ids[15:]
+
+    store.close()
+    os.remove(tmp_path / "index.db")
+    assert [entry.id for entry in MemoryStore(str(tmp_path)).entries()] == ids[15:]
+
+
+def test_clear_and_legacy_import(tmp_path: Path) -> None:
+    legacy = tmp_path / "data.txt"
+    legacy.write_text("Faiz prefers tea\n\nAPPOINTMENTS:\ndentist on 4 June\n", encoding="utf-8")
+    store = MemoryStore(str(tmp_path / "store"))
+
+    assert store.import_text_file(str(legacy)) == 2
+    assert not legacy.exists()
+    assert [entry.type for entry in store.entries()] == ["remember", "section"]
+
+    store.clear()
+    assert len(store) == 0 and store.recent() == []
+
+
+def test_interrupted_legacy_import_resumes_without_duplicates(tmp_path: Path) -> None:
+    legacy = tmp_path / "data.txt"
+    legacy.write_text("Faiz prefers tea\n\nFaiz prefers tea\n\nAPPOINTMENTS:\ndentist on 4 June\n", encoding="utf-8")
+    store = MemoryStore(str(tmp_path / "store"))
+    # A crash after the first entry was stored, before the file was renamed
+    store.append("Faiz prefers tea", "remember", source="data.txt")
+
+    assert store.import_text_file(str(legacy)) == 2
+    assert [entry.text for entry in store.entries()] == [
+        "Faiz prefers tea", "Faiz prefers tea", "APPOINTMENTS:\ndentist on 4 June",
+    ]
+    assert not legacy.exists()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from src.serving import OutboundBusy, OutboundLimiter
+
+
+def test_calls_beyond_the_service_limit_fail_fast() -> None:
+    limiter = OutboundLimiter({"exa": 1}, acquire_timeout=0.05)
+    release = threading.Event()
+    holder = threading.Thread(target=lambda: limiter.call("exa", release.wait, 5))
+    holder.start()
+    try:
+        with pytest.raises(OutboundBusy):
+            limiter.call("exa", lambda: None)
+        # Other services keep their own slots
+        assert limiter.call("gemini", lambda: "ok") == "ok"
+    finally:
+        release.set()
+        holder.join()
+
+    stats = limiter.stats()
+    assert stats["exa"] == {"limit": 1, "in_flight": 0, "completed": 1, "rejected": 1}
+    assert stats["gemini"]["limit"] == limiter.default_limit
+
+
+def test_slot_is_released_when_call_raises() -> None:
+    limiter = OutboundLimiter({"notion": 1}, acquire_timeout=0.05)
+
+    def fail() -> None:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        limiter.call("notion", fail)
+    assert limiter.call("notion", lambda: 42) == 42
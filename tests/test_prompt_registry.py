@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.prompts import MAYA_SYSTEM, PromptRegistry, prompt_version
+
+
+def test_bundled_maya_prompt_is_versioned() -> None:
+    registry = PromptRegistry()
+    prompt = registry.get(MAYA_SYSTEM)
+
+    assert prompt.text.startswith("You are Maya")
+    assert prompt.text.endswith("Stay aligned with productivity: Notion, Calendar, Slack.")
+    assert prompt.version == prompt_version(prompt.text)
+    assert registry.versions()[MAYA_SYSTEM] == prompt.version
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_realtime_payload_is_serialized_once_per_model_and_voice(tmp_path: Path) -> None:
+    (tmp_path / "maya_system.txt").write_text("Be brief.\n", encoding="utf-8")
+    registry = PromptRegistry(str(tmp_path))
+
+    payload = registry.realtime_payload("gpt-realtime", "marin")
+    assert registry.realtime_payload("gpt-realtime", "marin") is payload
+    assert json.loads(payload) == {
+        "session": {
+            "type": "realtime",
+            "model": "gpt-realtime",
+            "audio": {"output": {"voice": "marin"}},
+            "instructions": "Be brief.",
+        }
+    }
+    assert registry.realtime_session("gpt-realtime", "marin") is registry.realtime_session("gpt-realtime", "marin")
+    assert json.loads(registry.realtime_payload("gpt-realtime", "cedar"))["session"]["audio"]["output"]["voice"] == "cedar"
+    assert registry.stats()["cached_payloads"] == 2
+
+
+def test_reload_picks_up_edits_and_drops_stale_payloads(tmp_path: Path) -> None:
+    path = tmp_path / "maya_system.txt"
+    path.write_text("Version one.", encoding="utf-8")
+    registry = PromptRegistry(str(tmp_path))
+    old_version = registry.get("maya_system").version
+    registry.realtime_payload("gpt-realtime")
+
+    assert registry.reload() == []
+    path.write_text("Version two.", encoding="utf-8")
+    assert registry.reload() == ["maya_system"]
+
+    assert registry.get("maya_system").version != old_version
+    assert registry.stats()["cached_payloads"] == 0
+    assert json.loads(registry.realtime_payload("gpt-realtime"))["session"]["instructions"] == "Version two."
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+from src.vision import ScreenshotWatcher
+
+
+def shot(directory: Path, name: str, mtime: float) -> Path:
+    path = directory / name
+    path.write_bytes(b"png")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def bump_dir_mtime(directory: Path) -> None:
+    # Some filesystems have coarse directory timestamps; make the change visible
+    stat = directory.stat()
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_latest_is_served_from_memory(tmp_path: Path) -> None:
+    shot(tmp_path, "old.png", 1000)
+    newest = shot(tmp_path, "new.jpg", 2000)
+    shot(tmp_path, "notes.txt", 3000)
+    watcher = ScreenshotWatcher(str(tmp_path), use_watchdog=False, autostart=False)
+
+    assert watcher.latest() == str(newest)
+    assert watcher.latest() == str(newest)
+    assert watcher.stats["scans"] == 1 and watcher.stats["lookups"] == 2
+
+
+def test_polling_rescans_only_when_the_directory_changes(tmp_path: Path) -> None:
+    shot(tmp_path, "a.png", 1000)
+    latest = shot(tmp_path, "b.png", 2000)
+    watcher = ScreenshotWatcher(str(tmp_path), use_watchdog=False, autostart=False)
+    watcher.rescan()
+
+    assert watcher.check() is False
+    # Overwritten in place: the directory's mtime stays the same, the latest file is re-stat'ed
+    shot(tmp_path, "b.png", 3000)
+    assert watcher.check() is True
+    assert watcher.status()["latest"] == str(latest) and watcher.status()["latest_mtime"] == 3000
+    assert watcher.stats["scans"] == 1
+
+    newer = shot(tmp_path, "c.png", time.time())
+    bump_dir_mtime(tmp_path)
+    assert watcher.check() is True
+    assert watcher.latest() == str(newer)
+    assert watcher.stats["scans"] == 2
+
+
+def test_deleted_latest_falls_back_to_the_next_newest(tmp_path: Path) -> None:
+    older = shot(tmp_path, "a.png", 1000)
+    newest = shot(tmp_path, "b.png", 2000)
+    watcher = ScreenshotWatcher(str(tmp_path), use_watchdog=False, autostart=False)
+    assert watcher.latest() == str(newest)
+
+    newest.unlink()
+    assert watcher.latest() == str(older)
+    older.unlink()
+    assert watcher.latest() is None
+
+
+def test_capture_and_events_update_the_latest(tmp_path: Path) -> None:
+    directory = tmp_path / "Screenshots"
+    watcher = ScreenshotWatcher(str(directory), use_watchdog=False, autostart=False)
+    assert watcher.latest() is None
+
+    class FakeImage:
+        def save(self, path: str) -> None:
+            Path(path).write_bytes(b"png")
+
+    path = watcher.capture(lambda: FakeImage())
+    assert path == str(directory / "Screenshot.png")
+    assert watcher.latest() == path
+
+    later = shot(directory, "later.png", time.time() + 10)
+    watcher.observe(str(later))
+    assert watcher.latest() == str(later)
+    watcher.observe(str(directory / "ignored.txt"))
+    assert watcher.status()["latest"] == str(later)
+
+
+def test_start_and_stop_polling(tmp_path: Path) -> None:
+    watcher = ScreenshotWatcher(str(tmp_path / "shots"), poll_interval=0.01, use_watchdog=False)
+    watcher.start()
+    try:
+        assert watcher.status()["mode"] == "polling"
+        newest = shot(tmp_path / "shots", "x.png", time.time())
+        bump_dir_mtime(tmp_path / "shots")
+        deadline = time.time() + 2
+        while watcher.status()["latest"] != str(newest) and time.time() < deadline:
+            time.sleep(0.01)
+        assert watcher.status()["latest"] == str(newest)
+    finally:
+        watcher.stop()
+    assert watcher.status()["mode"] == "idle"
+
+
+def test_first_lookup_starts_watching_without_start(tmp_path: Path) -> None:
+    # Under a WSGI server nothing calls start(); the watcher must not go stale
+    shot(tmp_path, "a.png", 1000)
+    watcher = ScreenshotWatcher(str(tmp_path), poll_interval=0.01, use_watchdog=False)
+    try:
+        assert watcher.latest() == str(tmp_path / "a.png")
+        assert watcher.status()["mode"] == "polling"
+
+        newest = shot(tmp_path, "b.png", time.time())
+        bump_dir_mtime(tmp_path)
+        deadline = time.time() + 2
+        while watcher.latest() != str(newest) and time.time() < deadline:
+            time.sleep(0.01)
+        assert watcher.latest() == str(newest)
+    finally:
+        watcher.stop()
+
+    # Stopped for good (e.g. at exit): lookups don't restart it
+    watcher.latest()
+    assert watcher.status()["mode"] == "idle"
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import fnmatch
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+
+from src.sessions import (
+    ConversationContext,
+    RedisSessionBackend,
+    SessionBackend,
+    SessionConflict,
+    SessionStore,
+    SQLiteSessionBackend,
+    create_session_backend,
+)
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of the Redis protocol the backend uses."""
+
+    def __init__(self) -> None:
+        self.hashes: Dict[str, Dict[str, str]] = {}
+        self.ttls: Dict[str, int] = {}
+
+    def hincrby(self, key: str, field: str, amount: int) -> int:
+        value = int(self.hashes.setdefault(key, {}).get(field, "0")) + amount
+        self.hashes[key][field] = str(value)
+        return value
+
+    def hset(self, key: str, field: str, value: str) -> None:
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hget(self, key: str, field: str) -> Optional[str]:
+        return self.hashes.get(key, {}).get(field)
+
+    def hmget(self, key: str, fields: List[str]) -> List[Optional[str]]:
+        return [self.hget(key, field) for field in fields]
+
+    def expire(self, key: str, seconds: int) -> None:
+        self.ttls[key] = seconds
+
+    def delete(self, key: str) -> None:
+        self.hashes.pop(key, None)
+
+    def scan_iter(self, match: str) -> Iterator[str]:
+        return (key for key in list(self.hashes) if fnmatch.fnmatch(key, match))
+
+
+def dump(session: Dict[str, Any]) -> Dict[str, Any]:
+    return {"context": session["context"].to_state(), "mode": session.get("mode", "chat")}
+
+
+def load(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {"context": ConversationContext().load_state(state["context"]), "mode": state["mode"]}
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request: pytest.FixtureRequest, tmp_path: Path) -> SessionBackend:
+    if request.param == "sqlite":
+        return SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+    return RedisSessionBackend(LocalRedis())
+
+
+def test_backend_versions_every_save(backend: SessionBackend) -> None:
+    assert backend.load("s1") is None and not backend.exists("s1")
+
+    assert backend.save("s1", {"mode": "chat"}) == 1
+    assert backend.save("s1", {"mode": "vision"}) == 2
+    assert backend.load("s1") == ({"mode": "vision"}, 2)
+    assert backend.version("s1") == 2 and len(backend) == 1
+
+    backend.delete("s1")
+    assert backend.version("s1") is None
+
+
+def test_conditional_save_is_a_compare_and_swap(backend: SessionBackend) -> None:
+    assert backend.save("s1", {"mode": "chat"}, expected_version=0) == 1
+    with pytest.raises(SessionConflict):
+        backend.save("s1", {"mode": "vision"}, expected_version=0)
+
+    assert backend.save("s1", {"mode": "vision"}, expected_version=1) == 2
+    with pytest.raises(SessionConflict):
+        backend.save("s1", {"mode": "stale"}, expected_version=1)
+    assert backend.load("s1") == ({"mode": "vision"}, 2)
+
+
+def test_workers_sharing_a_backend_see_each_others_turns(backend: SessionBackend) -> None:
+    worker_a = SessionStore(dump, load, backend=backend, write_through=True)
+    worker_b = SessionStore(dump, load, backend=backend, write_through=True)
+
+    worker_a["s1"] = {"context": ConversationContext(), "mode": "chat"}
+    assert "s1" in worker_b
+
+    session = worker_b["s1"]
+    session["context"].add_exchange("[Vision Query] what is this", "A mug.")
+    session["mode"] = "vision"
+    worker_b.save("s1")
+
+    seen_by_a = worker_a["s1"]
+    assert seen_by_a["mode"] == "vision"
+    assert seen_by_a["context"].transcript()[-1]["parts"][0]["text"] == "A mug."
+    assert worker_a.stats["refreshes"] == 1
+
+    del worker_a["s1"]
+    assert "s1" not in worker_b and worker_b.get("s1") is None
+
+
+def add_turn(text: str) -> Any:
+    def change(session: Dict[str, Any]) -> None:
+        session["context"].add_exchange(f"[Chat Query] {text}", f"reply to {text}")
+    return change
+
+
+def user_turns(session: Dict[str, Any]) -> List[str]:
+    return [message["parts"][0]["text"] for message in session["context"].transcript() if message["role"] == "user"]
+
+
+def test_concurrent_turns_from_two_workers_are_both_kept(backend: SessionBackend) -> None:
+    worker_a = SessionStore(dump, load, backend=backend, write_through=True)
+    worker_b = SessionStore(dump, load, backend=backend, write_through=True)
+    worker_a.setdefault("s1", {"context": ConversationContext(), "mode": "chat"})
+    assert worker_b.setdefault("s1", {"context": ConversationContext(), "mode": "vision"})["mode"] == "chat"
+
+    # Worker B's save lands between worker A loading the session and saving its turn
+    real_persist = worker_a._persist
+    interleaved: List[bool] = []
+
+    def persist_after_b(session_id: str, session: Dict[str, Any], expected_version: Optional[int] = None) -> Any:
+        if not interleaved:
+            interleaved.append(True)
+            worker_b.update("s1", add_turn("from b"))
+        return real_persist(session_id, session, expected_version)
+
+    worker_a._persist = persist_after_b  # type: ignore[method-assign]
+    session = worker_a.update("s1", add_turn("from a"))
+
+    assert user_turns(session) == ["[Chat Query] from b", "[Chat Query] from a"]
+    assert user_turns(worker_b["s1"]) == ["[Chat Query] from b", "[Chat Query] from a"]
+    assert worker_a.stats["conflicts"] == 1
+
+
+def test_create_session_backend_validates_the_name(tmp_path: Path) -> None:
+    assert isinstance(create_session_backend("sqlite", sqlite_path=str(tmp_path / "s.db")), SQLiteSessionBackend)
+    with pytest.raises(ValueError):
+        create_session_backend("memcached")
+
+
+def test_session_backend_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        SessionBackend()  # type: ignore[abstract]
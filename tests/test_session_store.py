@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.sessions import ConversationContext, SessionStore, SQLiteSessionBackend
+from tests.harness.clock import FakeClock
+
+
+def dump(session: Dict[str, Any]) -> Dict[str, Any]:
+    return {"context": session["context"].to_state(), "last_response": session.get("last_response")}
+
+
+def load(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {"context": ConversationContext().load_state(state["context"]), "last_response": state["last_response"]}
+
+
+def new_session(text: str) -> Dict[str, Any]:
+    context = ConversationContext()
+    context.add_exchange(f"[Chat Query] {text}", f"reply to {text}")
+    return {"context": context, "last_response": f"reply to {text}"}
+
+
+def test_lru_sessions_spill_and_rehydrate(tmp_path: Path) -> None:
+    store = SessionStore(dump, load, backend=SQLiteSessionBackend(str(tmp_path / "sessions.db")), max_resident=2)
+    store["a"] = new_session("a")
+    store["b"] = new_session("b")
+    assert store.get("a") is not None
+    store["c"] = new_session("c")
+
+    assert len(store) == 2 and list(store) == ["a", "c"]
+    assert "b" in store and "missing" not in store
+
+    rehydrated = store["b"]
+    assert rehydrated["last_response"] == "reply to b"
+    assert rehydrated["context"].transcript()[0]["parts"][0]["text"] == "[Chat Query] b"
+    assert store.metrics() == {
+        "hits": 1, "misses": 1, "not_found": 0, "evictions": 2, "expirations": 0, "refreshes": 0,
+        "conflicts": 0, "resident": 2, "max_resident": 2, "stored": 2, "write_through": False,
+    }
+
+
+def test_idle_sessions_expire_to_the_spill(tmp_path: Path, clock: FakeClock) -> None:
+    store = SessionStore(dump, load, backend=SQLiteSessionBackend(str(tmp_path / "sessions.db")), idle_ttl=60, clock=clock)
+    store["a"] = new_session("a")
+    clock.now = 30
+    store["b"] = new_session("b")
+
+    clock.now = 70
+    assert store.get("b") is not None
+    assert list(store) == ["b"] and store.stats["expirations"] == 1
+    assert store["a"]["context"].messages()[-1]["parts"][0]["text"] == "reply to a"
+
+
+def test_sessions_survive_a_restart_after_flush(tmp_path: Path) -> None:
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(dump, load, backend=SQLiteSessionBackend(path))
+    store["a"] = new_session("a")
+    assert store.flush() == 1
+
+    restarted = SessionStore(dump, load, backend=SQLiteSessionBackend(path))
+    assert "a" in restarted and restarted["a"]["last_response"] == "reply to a"
+
+    del restarted["a"]
+    assert "a" not in restarted
+
+
+def test_without_a_spill_evicted_sessions_are_gone() -> None:
+    store = SessionStore(dump, load, max_resident=1)
+    store["a"] = new_session("a")
+    store["b"] = new_session("b")
+
+    assert "a" not in store and store.get("a") is None
+    assert store.stats["not_found"] == 1
+
+
+class BlockingBackend(SQLiteSessionBackend):
+    """Saves of the session "slow" wait until released."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.saving = threading.Event()
+        self.release = threading.Event()
+
+    def save(self, session_id: str, state: Dict[str, Any], expected_version: Optional[int] = None) -> int:
+        if session_id == "slow":
+            self.saving.set()
+            self.release.wait(5)
+        return super().save(session_id, state, expected_version)
+
+
+def test_a_slow_save_does_not_block_other_sessions(tmp_path: Path) -> None:
+    backend = BlockingBackend(str(tmp_path / "sessions.db"))
+    store = SessionStore(dump, load, backend=backend, write_through=True)
+    store["fast"] = new_session("fast")
+    backend.release.set()
+    store["slow"] = new_session("slow")
+    backend.release.clear()
+
+    saver = threading.Thread(target=store.update, args=("slow", lambda session: session.update(last_response="x")))
+    saver.start()
+    try:
+        assert backend.saving.wait(5)
+        # The store lock is free while "slow" is in backend I/O
+        assert store["fast"]["last_response"] == "reply to fast"
+        store.update("fast", lambda session: session.update(last_response="y"))
+        assert saver.is_alive()
+    finally:
+        backend.release.set()
+        saver.join(5)
+    assert store["slow"]["last_response"] == "x" and store["fast"]["last_response"] == "y"
+
+
+def test_a_session_evicted_mid_spill_is_taken_back_live(tmp_path: Path) -> None:
+    store = SessionStore(dump, load, backend=SQLiteSessionBackend(str(tmp_path / "sessions.db")), max_resident=1)
+    store["a"] = new_session("a")
+    session = store["a"]
+    with store._lock:
+        # Evicted, not yet written out
+        store._sessions.pop("a")
+        store._spilling["a"] = session
+
+    assert store["a"] is session
+    assert store.stats["misses"] == 1 and store._spilling == {}
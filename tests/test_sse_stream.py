@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pytest
+
+from src.serving import OutboundBusy
+from src.serving.sse import event_stream, sse_event
+
+
+def parse_events(body: str) -> List[Tuple[str, Dict[str, Any]]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        event, data = frame.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_sse_event_frames_json() -> None:
+    assert sse_event("token", {"text": "hi"}) == 'event: token\ndata: {"text": "hi"}\n\n'
+
+
+def test_pieces_become_tokens_then_done() -> None:
+    events = parse_events("".join(event_stream(["Hel", "", "lo"], done=lambda: {"response": "Hello"})))
+
+    assert events == [
+        ("token", {"text": "Hel"}),
+        ("token", {"text": "lo"}),
+        ("done", {"response": "Hello"}),
+    ]
+
+
+def test_failure_mid_stream_becomes_an_error_event() -> None:
+    def pieces() -> Iterator[str]:
+        yield "partial"
+        raise RuntimeError("upstream closed")
+
+    events = parse_events("".join(event_stream(pieces(), done=lambda: {})))
+
+    assert events == [("token", {"text": "partial"}), ("error", {"error": "upstream closed"})]
+
+
+def test_busy_before_any_output_reaches_the_caller() -> None:
+    def pieces() -> Iterator[str]:
+        raise OutboundBusy("gemini")
+        yield ""
+
+    with pytest.raises(OutboundBusy):
+        event_stream(pieces(), done=lambda: {})
+
+
+def test_busy_after_output_becomes_an_error_event() -> None:
+    def pieces() -> Iterator[str]:
+        yield "partial"
+        raise OutboundBusy("gemini")
+
+    events = parse_events("".join(event_stream(pieces(), done=lambda: {})))
+    assert events[-1][0] == "error"
+
+
+def test_flask_streams_events_through_the_test_client() -> None:
+    flask = pytest.importorskip("flask")
+    app = flask.Flask(__name__)
+    finished: List[str] = []
+
+    @app.route("/stream", methods=["POST"])
+    def stream() -> Any:
+        def pieces() -> Iterator[str]:
+            for word in flask.request.json["message"].split():
+                yield word + " "
+            finished.append("recorded")
+
+        events = event_stream(pieces(), done=lambda: {"response": "recorded" if finished else ""})
+        return flask.Response(flask.stream_with_context(events), mimetype="text/event-stream")
+
+    response = app.test_client().post("/stream", json={"message": "hello there"})
+
+    assert response.mimetype == "text/event-stream"
+    assert parse_events(response.get_data(as_text=True)) == [
+        ("token", {"text": "hello "}),
+        ("token", {"text": "there "}),
+        ("done", {"response": "recorded"}),
+    ]
+
+
+def test_flask_answers_503_when_the_stream_cannot_start() -> None:
+    flask = pytest.importorskip("flask")
+    app = flask.Flask(__name__)
+
+    @app.errorhandler(OutboundBusy)
+    def busy(e: OutboundBusy) -> Any:
+        return flask.jsonify(error=str(e)), 503, {"Retry-After": "1"}
+
+    @app.route("/stream", methods=["POST"])
+    def stream() -> Any:
+        def pieces() -> Iterator[str]:
+            raise OutboundBusy("gemini")
+            yield ""
+
+        return flask.Response(flask.stream_with_context(event_stream(pieces(), done=dict)), mimetype="text/event-stream")
+
+    response = app.test_client().post("/stream")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"